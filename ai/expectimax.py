@@ -0,0 +1,261 @@
+import random
+import time
+from collections import OrderedDict
+from itertools import product
+import numpy as np
+from game.constants import *
+
+class SearchAborted(Exception):
+    """노드 예산이나 시간 제한에 걸려 진행 중인 반복 심화 단계를 중단할 때 사용합니다."""
+    pass
+
+class ExpectimaxSearch:
+    """고스트 팀을 위한 깊이 제한 expectimax 탐색 (GhostManager가 팀마다 하나를 두고 LookaheadGhost들이 공유).
+
+    한 수(깊이 1)는 고스트들이 한 칸씩 움직이고(최대화 노드) 플레이어가 한 칸 움직이는(확률 노드) 것입니다.
+        - 탐색하는 고스트들(searching)의 모든 동시 이동 조합 중 가치가 가장 큰 것을 고르고,
+          나머지 고스트는 플레이어를 향해 최단 경로(next_hop_table)로 움직인다고 봅니다.
+        - 플레이어 이동 확률은 학습 시스템의 마르코프 예측기(현재 타일, 최근 이동 방향 문맥)에서 가져오고,
+          학습 시스템이 없으면 갈 수 있는 방향 균등 분포입니다.
+    가치는 고스트 입장의 값으로, 잡으면 EXPECTIMAX_CAPTURE_VALUE + 남은 깊이(빨리 잡을수록 큼), 플레이어가 먹은 펠릿만큼 감점,
+    파워 펠릿을 먹으면 탐색을 끝내고 크게 감점하며, 깊이 끝에서는 고스트-플레이어 미로 거리로 평가합니다.
+    실제 이동 속도 차이는 무시하는 단순화입니다.
+
+    상태(플레이어 타일, 마르코프 문맥, 고스트 타일들, 펠릿/파워 펠릿 비트보드)는 Zobrist 해시로 키를 만들고,
+    (해시, 남은 깊이) -> (가치, 하위 노드 수)를 크기 제한이 있는 LRU 전치 테이블에 저장합니다.
+    테이블 값은 같은 상태와 깊이에 대해 항상 같은 값이라 탐색 결과에 영향을 주지 않고 계산만 줄입니다.
+    학습 통계가 바뀌면(플레이어가 새로 이동) 가치가 달라지므로 테이블을 비웁니다.
+
+    반복 심화로 깊이 1부터 max_depth까지 늘려 가며, 노드 예산(node_budget)이나 시간 제한(deadline)에 걸리면
+    마지막으로 끝까지 탐색한 깊이의 결과를 사용합니다. 테이블에서 찾은 값도 그 하위 노드 수만큼 예산을 쓴 것으로 세므로,
+    시간 제한 없이 노드 예산만 쓰면 결과가 테이블 상태와 관계없이 결정적입니다 (헤드리스 시뮬레이션, 리플레이).
+    """
+    def __init__(self, map_manager, learning_system=None, max_depth=EXPECTIMAX_MAX_DEPTH,
+                 node_budget=EXPECTIMAX_NODE_BUDGET, table_size=EXPECTIMAX_TABLE_SIZE):
+        self.map_manager = map_manager
+        self.learning = learning_system
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.table_size = table_size
+        self.table = OrderedDict()
+        self.generation = None
+        self.move_probs = {}
+        self.map_version = None
+        self.root_pellets = None
+        self.root_pellet_key = 0
+        self.nodes = 0
+        self.deadline = None
+        self.next_time_check = 0
+        self.stats = {'searches': 0, 'nodes': 0, 'table_hits': 0, 'evictions': 0, 'aborted': 0, 'depth': 0}
+
+    def load_map(self):
+        """맵(벽 구조)이 바뀌었을 때 인접/거리 테이블과 Zobrist 키를 다시 준비합니다."""
+        map_manager = self.map_manager
+        self.map_version = map_manager.map_version
+        self.adjacency = map_manager.adjacency
+        self.neighbor_table = map_manager.neighbor_table.tolist()
+        self.distances = map_manager.distance_table.tolist()
+        self.next_hops = map_manager.next_hop_table.tolist()
+        bitboards = map_manager.bitboards
+        self.tile_bits = [bitboards.bit(x, y) for x, y in map_manager.walkable_tiles]
+        self.tile_of_bit = {bit: tile for tile, bit in enumerate(self.tile_bits)}
+        tile_count = len(map_manager.walkable_tiles)
+        # 전역 random 상태를 건드리지 않도록 고정 시드의 별도 난수 생성기로 64비트 키를 만듦
+        rng = random.Random(EXPECTIMAX_ZOBRIST_SEED)
+        def keys(count):
+            return [rng.getrandbits(64) for _ in range(count)]
+        self.player_keys = keys(tile_count)
+        self.context_keys = keys(len(DIRECTIONS) ** LEARNING_MARKOV_ORDER)
+        self.pellet_keys = keys(tile_count)
+        self.power_keys = keys(tile_count)
+        self.ghost_keys = []
+        self.rng = rng
+        self.root_pellets = None
+        self.clear()
+
+    def ghost_key(self, slot, tile):
+        while slot >= len(self.ghost_keys):
+            self.ghost_keys.append([self.rng.getrandbits(64) for _ in range(len(self.tile_bits))])
+        return self.ghost_keys[slot][tile]
+
+    def clear(self):
+        """전치 테이블과 플레이어 이동 확률 캐시를 비웁니다 (상태 복원, 학습 통계 변경 시)."""
+        self.table.clear()
+        self.move_probs.clear()
+
+    def pellet_key(self, pellet_bits, power_bits):
+        """남은 펠릿/파워 펠릿 배치의 Zobrist 키 (같은 배치가 이어지는 동안은 다시 계산하지 않음)."""
+        if (pellet_bits, power_bits) != self.root_pellets:
+            key = 0
+            for bits, tile_keys in ((pellet_bits, self.pellet_keys), (power_bits, self.power_keys)):
+                while bits:
+                    low = bits & -bits
+                    key ^= tile_keys[self.tile_of_bit[low]]
+                    bits ^= low
+            self.root_pellets = (pellet_bits, power_bits)
+            self.root_pellet_key = key
+        return self.root_pellet_key
+
+    def player_moves(self, tile, context):
+        """플레이어 상태에서의 (다음 타일, 다음 문맥, 확률) 목록. 확률이 작은 이동은 버리고 다시 정규화합니다."""
+        cached = self.move_probs.get((tile, context))
+        if cached is not None:
+            return cached
+        neighbors = self.neighbor_table[tile]
+        markov = self.learning.markov if self.learning is not None else None
+        if markov is not None:
+            probs = markov.transition_probs(np.array([tile]), np.array([context]))[0].tolist()
+        else:
+            probs = [1.0 if next_tile >= 0 else 0.0 for next_tile in neighbors]
+        moves = [(next_tile, (context * len(DIRECTIONS) + direction) % len(self.context_keys), p)
+                 for direction, (next_tile, p) in enumerate(zip(neighbors, probs))
+                 if next_tile >= 0 and p >= EXPECTIMAX_MIN_PROBABILITY]
+        total = sum(p for _, _, p in moves)
+        if total > 0:
+            moves = [(next_tile, next_context, p / total) for next_tile, next_context, p in moves]
+        else:
+            # 통계상 갈 수 있는 방향이 없으면 (막다른 곳 등) 제자리
+            moves = [(tile, context, 1.0)]
+        self.move_probs[(tile, context)] = moves
+        return moves
+
+    def search(self, player_tile, context, ghost_tiles, searching, pellet_bits, power_bits, deadline=None):
+        """가장 좋은 탐색 고스트들의 동시 이동을 찾습니다.
+
+        ghost_tiles는 모든 고스트의 타일 인덱스 튜플(움직이지 않는 고스트는 -1), searching은 탐색으로 움직일 고스트 번호 목록입니다.
+        searching 순서의 다음 타일 튜플과 끝까지 탐색한 깊이를 반환합니다 (깊이 1도 끝내지 못하면 (None, 0)).
+        """
+        if self.map_version != self.map_manager.map_version:
+            self.load_map()
+        generation = (self.learning.move_count if self.learning is not None else 0)
+        if generation != self.generation:
+            self.generation = generation
+            self.clear()
+        key = self.player_keys[player_tile] ^ self.context_keys[context] ^ self.pellet_key(pellet_bits, power_bits)
+        for slot, tile in enumerate(ghost_tiles):
+            if tile >= 0:
+                key ^= self.ghost_key(slot, tile)
+
+        self.nodes = 0
+        self.deadline = deadline
+        self.next_time_check = 0
+        best_moves, completed = None, 0
+        try:
+            for depth in range(1, self.max_depth + 1):
+                _, moves = self.max_node(player_tile, context, ghost_tiles, searching, pellet_bits, power_bits, depth, key, 0)
+                best_moves, completed = moves, depth
+        except SearchAborted:
+            self.stats['aborted'] += 1
+        self.stats['searches'] += 1
+        self.stats['nodes'] += self.nodes
+        self.stats['depth'] = completed
+        return best_moves, completed
+
+    def check_budget(self):
+        """노드 예산을 넘었거나 시간 제한이 지났으면 SearchAborted를 발생시킵니다 (시계는 노드 32개마다 확인)."""
+        if self.nodes > self.node_budget:
+            raise SearchAborted()
+        if self.deadline is not None and self.nodes >= self.next_time_check:
+            self.next_time_check = self.nodes + 32
+            if time.perf_counter() > self.deadline:
+                raise SearchAborted()
+
+    def max_node(self, player, context, ghosts, searching, pellets, powers, depth, key, ply):
+        """고스트 차례: 탐색 고스트들의 모든 동시 이동 중 최대 기대 가치와 그 이동을 반환합니다."""
+        table_key = (key, depth)
+        entry = self.table.get(table_key)
+        # 루트에서는 이동도 필요하므로 테이블 값만으로 끝내지 않음
+        if entry is not None and ply > 0:
+            self.table.move_to_end(table_key)
+            self.stats['table_hits'] += 1
+            self.nodes += entry[1]
+            self.check_budget()
+            return entry[0], None
+        start_nodes = self.nodes
+        self.nodes += 1
+        self.check_budget()
+
+        # 나머지 고스트: 플레이어를 향한 최단 경로의 다음 칸 (플레이어에게 갈 수 없는 칸이면 -1이므로 제자리)
+        moved = list(ghosts)
+        for slot, tile in enumerate(ghosts):
+            if tile >= 0 and slot not in searching and tile != player:
+                next_tile = self.next_hops[tile][player]
+                if next_tile >= 0:
+                    moved[slot] = next_tile
+        base_key = key
+        for slot, tile in enumerate(ghosts):
+            if moved[slot] != tile:
+                base_key ^= self.ghost_key(slot, tile) ^ self.ghost_key(slot, moved[slot])
+
+        best_value, best_moves = float('-inf'), None
+        for moves in product(*[self.adjacency[ghosts[slot]] for slot in searching]):
+            # 탐색 고스트끼리 같은 칸으로 겹치지 않음 (Ghost.move의 겹침 회피)
+            if len(set(moves)) < len(moves):
+                continue
+            next_ghosts = list(moved)
+            next_key = base_key
+            for slot, tile in zip(searching, moves):
+                next_ghosts[slot] = tile
+                next_key ^= self.ghost_key(slot, ghosts[slot]) ^ self.ghost_key(slot, tile)
+            if player in next_ghosts:
+                value = EXPECTIMAX_CAPTURE_VALUE + depth
+            else:
+                value = self.chance_node(player, context, next_ghosts, searching, pellets, powers, depth, next_key, ply)
+                self.check_budget()
+            if value > best_value:
+                best_value, best_moves = value, moves
+        if best_moves is None:
+            # 탐색 고스트가 움직일 수 없는 경우 (갇힘): 나머지 고스트만 움직이고 평가
+            best_value = self.evaluate(player, moved)
+
+        self.table[table_key] = (best_value, self.nodes - start_nodes)
+        if len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+            self.stats['evictions'] += 1
+        return best_value, best_moves
+
+    def chance_node(self, player, context, ghosts, searching, pellets, powers, depth, key, ply):
+        """플레이어 차례: 학습 통계로 가중한 플레이어 이동들의 기대 가치를 반환합니다."""
+        expected = 0.0
+        key ^= self.player_keys[player] ^ self.context_keys[context]
+        for next_tile, next_context, p in self.player_moves(player, context):
+            # 고스트가 있는 칸으로 들어가면 잡힘
+            if next_tile in ghosts:
+                expected += p * (EXPECTIMAX_CAPTURE_VALUE + depth)
+                continue
+            bit = self.tile_bits[next_tile]
+            if powers & bit:
+                # 파워 펠릿을 먹으면 고스트가 쫓기는 처지가 되므로 여기서 탐색을 끝냄
+                expected += p * -EXPECTIMAX_POWER_PELLET_PENALTY
+                continue
+            value = 0.0
+            next_pellets = pellets
+            next_key = key ^ self.player_keys[next_tile] ^ self.context_keys[next_context]
+            if pellets & bit:
+                value -= PELLET_SCORE
+                next_pellets = pellets & ~bit
+                next_key ^= self.pellet_keys[next_tile]
+            if depth > 1:
+                value += self.max_node(next_tile, next_context, ghosts, searching, next_pellets, powers,
+                                       depth - 1, next_key, ply + 1)[0]
+            else:
+                # 평가한 잎 노드도 예산에 셈
+                self.nodes += 1
+                value += self.evaluate(next_tile, ghosts)
+            expected += p * value
+        return expected
+
+    def evaluate(self, player, ghosts):
+        """깊이 끝의 평가: 가장 가까운 고스트와 모든 고스트의 플레이어까지 미로 거리가 짧을수록 높음."""
+        row = self.distances[player]
+        distances = [row[tile] for tile in ghosts if tile >= 0 and row[tile] >= 0]
+        if not distances:
+            return 0.0
+        return -(EXPECTIMAX_NEAREST_WEIGHT * min(distances) + sum(distances))
+
+    def get_stats(self):
+        """모니터링용 탐색 통계 (탐색 횟수, 누적 노드 수, 테이블 적중/축출, 중단 횟수, 마지막 탐색 깊이, 테이블 크기)"""
+        stats = dict(self.stats)
+        stats['table_size'] = len(self.table)
+        stats['table_capacity'] = self.table_size
+        return stats
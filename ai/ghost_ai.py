@@ -1,15 +1,132 @@
-from ai.pathfinding import a_star
-from ai.ghost_types import create_ghosts
+import time
+from game.constants import *
+from ai.pathfinding import PathFinder
+from ai.expectimax import ExpectimaxSearch
+from ai.ghost_types import create_ghosts, LookaheadGhost, search_team_moves
 
 class GhostManager:
-    def __init__(self, learning_system, map_manager):
+    def __init__(self, learning_system, map_manager, clock=None, spec=None,
+                 update_frequency=AI_UPDATE_FREQUENCY, plan_budget_us=GHOST_PLAN_BUDGET_US):
+        """고스트들의 경로 계획을 프레임에 나눠서 실행하는 스케줄러를 겸합니다.
+
+        고스트 i는 (프레임 + i) % update_frequency == 0인 프레임에만 경로를 계획하고, 그 사이에는 기존 경로(path)를 따라갑니다.
+        상태가 바뀌었거나 경로가 끝났거나 끊긴 고스트는 차례를 기다리지 않고 바로 계획합니다.
+        한 프레임의 계획 시간이 plan_budget_us(마이크로초)를 넘으면 남은 고스트는 다음 프레임으로 미룹니다
+        (매 프레임 최소 한 고스트는 계획). None이면 예산 없이 모두 계획하므로 결과가 실행 시간에 의존하지 않습니다.
+        """
         self.learning_system = learning_system
         self.map_manager = map_manager
-        self.ghosts = create_ghosts(learning_system, map_manager)
+        self.ghosts = create_ghosts(learning_system, map_manager, clock, spec)
+        # 모든 고스트가 공유하는 경로 탐색 엔진 (캐시, 흐름 필드, 증분 계획기 제공)
+        self.pathfinder = PathFinder(map_manager)
+        # 플레이어를 향한 공유 흐름 필드: 같은 타겟을 쫓는 고스트들이 함께 읽습니다.
+        self.flow_field = self.pathfinder.flow_field
+        # 탐색 고스트(LookaheadGhost)들이 공유하는 expectimax 탐색과 전치 테이블
+        self.search = ExpectimaxSearch(map_manager, learning_system)
+        for ghost in self.ghosts:
+            ghost.pathfinder = self.pathfinder
+            ghost.flow_field = self.flow_field
+            if isinstance(ghost, LookaheadGhost):
+                ghost.search = self.search
+                ghost.team = self
+        self.update_frequency = max(1, update_frequency)
+        self.plan_budget_us = plan_budget_us
+        self.frame = 0
+        # 고스트별 마지막 계획 이후 지난 프레임 수 (예산 때문에 미뤄진 고스트는 다음 프레임에 우선 계획)
+        self.plan_age = [0] * len(self.ghosts)
+        self.stats = {'plans': 0, 'forced': 0, 'deferred': 0}
+        # 이번 프레임에 예산 때문에 미룬 고스트 (비트마스크, 리플레이 기록용)
+        self.deferred_mask = 0
+        # 리플레이 재생 시 시간 예산 대신 사용할 미룸 비트마스크 (None이면 시간 예산으로 판단)
+        self.replay_deferred = None
+        # 이번 프레임에 계획할 고스트 번호와 탐색 고스트들의 공동 탐색 결과 (고스트 번호 -> 다음 칸, 탐색할 수 없었으면 None)
+        self.planning = set()
+        self.joint_moves = {}
 
     def update(self, player_pos, map_manager, other_ghosts, player=None):
-        for ghost in self.ghosts:
-            ghost.update(player_pos, map_manager, other_ghosts, player)
+        # 플레이어가 다른 타일로 옮겼을 때만 필드를 다시 계산합니다.
+        self.flow_field.set_target(player_pos)
+        self.frame += 1
+
+        # 상태는 매 프레임 갱신하고, 이번 프레임에 계획할 고스트를 고름
+        # (상태와 재계획 필요 여부는 각 고스트 자신의 위치/경로와 시간에만 의존하므로 미리 정해도 순서대로 처리한 것과 같음)
+        active = []
+        planning = set()
+        for index, ghost in enumerate(self.ghosts):
+            # 리스폰 대기 중이면 움직임 및 상태 업데이트를 건너뛰기
+            if ghost.is_respawning():
+                continue
+            active.append(index)
+            ghost.update_state(player)
+            forced = ghost.needs_replan()
+            if forced or (self.frame + index) % self.update_frequency == 0 or self.plan_age[index] >= self.update_frequency:
+                planning.add(index)
+                self.stats['forced'] += forced
+
+        self.planning = planning
+        self.joint_moves = {}
+
+        # 이번 틱에 학습 예측을 질의할 고스트(계획하는 chase 고스트 중 플레이어와 prediction_radius 이내)의 예측을 한 번에 계산해 메모에 채워 둠
+        if self.learning_system:
+            self.learning_system.get_predictions([(ghost.x, ghost.y) for index, ghost in enumerate(self.ghosts)
+                                                  if index in planning and ghost.mode == 'chase'
+                                                  and abs(ghost.x - player_pos[0]) + abs(ghost.y - player_pos[1]) < ghost.prediction_radius])
+
+        # 고스트 순서대로 계획과 이동 (앞 고스트의 이동이 뒤 고스트의 계획과 회피에 반영됨)
+        start = time.perf_counter()
+        planned = 0
+        self.deferred_mask = 0
+        for index in active:
+            ghost = self.ghosts[index]
+            self.plan_age[index] += 1
+            if index in planning:
+                if self.replay_deferred is not None:
+                    defer = bool(self.replay_deferred >> index & 1)
+                else:
+                    defer = planned and self.plan_budget_us is not None and (time.perf_counter() - start) * 1000000 >= self.plan_budget_us
+                if defer:
+                    # 예산 초과: 다음 프레임으로 미룸. 끊겼거나 상태가 바뀐 경로는 따라가지 않고 멈춤
+                    if ghost.needs_replan():
+                        ghost.path = []
+                    self.stats['deferred'] += 1
+                    self.deferred_mask |= 1 << index
+                else:
+                    # 탐색하는 고스트가 이번 프레임 예산 안에서 멈출 수 있도록 예산이 끝나는 시각을 알려 줌 (리플레이 재생 중에는 제한 없음)
+                    ghost.plan_deadline = (start + self.plan_budget_us / 1000000
+                                           if self.plan_budget_us is not None and self.replay_deferred is None else None)
+                    ghost.plan(player_pos, map_manager, other_ghosts, player)
+                    self.plan_age[index] = 0
+                    planned += 1
+            ghost.move(map_manager, other_ghosts)
+        self.stats['plans'] += planned
+
+    def lookahead_move(self, ghost, player_pos, game_map):
+        """탐색 고스트 ghost가 이번 프레임에 옮길 칸을 공동 탐색 결과에서 꺼냅니다. 탐색할 수 없으면 None.
+
+        이번 프레임에 처음 계획하는 탐색 고스트 차례에, 그 고스트와 이번 프레임에 계획할 차례이면서 아직 움직이지 않은
+        (번호가 더 큰) chase 상태의 탐색 고스트들의 동시 이동을 한 번 탐색합니다. 뒤 고스트들은 다시 탐색하지 않고 자기 몫을 씁니다
+        (예산 때문에 미뤄진 고스트의 몫은 쓰이지 않음).
+        """
+        index = self.ghosts.index(ghost)
+        if index not in self.joint_moves:
+            movers = [i for i, other in enumerate(self.ghosts)
+                      if i == index or (i > index and i in self.planning and isinstance(other, LookaheadGhost) and other.mode == 'chase')]
+            steps, depth = search_team_moves(self.search, self.ghosts, movers, player_pos, game_map, ghost.plan_deadline)
+            for i in movers:
+                self.joint_moves[i] = steps.get(i)
+                self.ghosts[i].search_depth = depth
+        return self.joint_moves[index]
+
+    def capture_state(self):
+        """게임 상태 저장(키프레임)용으로 계획 스케줄과 고스트들의 상태를 복사해서 반환합니다."""
+        return (self.frame, list(self.plan_age), [ghost.capture_state() for ghost in self.ghosts])
+
+    def restore_state(self, state):
+        """capture_state로 저장한 상태로 되돌립니다."""
+        self.frame, plan_age, ghost_states = state
+        self.plan_age = list(plan_age)
+        for ghost, ghost_state in zip(self.ghosts, ghost_states):
+            ghost.restore_state(ghost_state)
 
     def render(self, screen):
         for ghost in self.ghosts:
@@ -18,3 +135,5 @@ class GhostManager:
     def reset(self):
         for ghost in self.ghosts:
             ghost.reset()
+        self.frame = 0
+        self.plan_age = [0] * len(self.ghosts)
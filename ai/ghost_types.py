@@ -1,11 +1,14 @@
 import pygame
-from ai.pathfinding import a_star
+from ai.pathfinding import PathFinder
+from ai.expectimax import ExpectimaxSearch
 from game.constants import *
+from game.clock import RealClock
 import os
-import time
 
 class Ghost:
-    def __init__(self, x, y, color, learning_system):
+    def __init__(self, x, y, color, learning_system, clock=None):
+        # 시간 측정용 시계 (기본값은 실제 시간, 헤드리스 시뮬레이션에서는 SimulationClock 주입)
+        self.clock = clock or RealClock()
         self.init_x, self.init_y = x, y
         self.x, self.y = x, y
         self.color = color
@@ -14,13 +17,30 @@ class Ghost:
         self.path = []
         self.behavior_tree = None
         self.speed = 0.22  # 고스트 이동 딜레이(초)
-        self.last_move_time = time.time()
+        self.last_move_time = self.clock.now()
         self.respawn_delay = 0.5 # 리스폰 후 움직이기까지 대기 시간(초)
         self.respawn_time = 0 # 리스폰 시간 기록
         self.post_respawn_chase_duration = 2.0 # 리스폰 대기 후 플레이어 파워업과 관계없이 chase 상태 유지 시간(초)
         self.post_respawn_end_time = 0 # post_respawn_chase 상태가 끝나는 시간
         self.frightened_speed_multiplier = 0.5 # 파워펠릿 상태 시 속도 배율 (느려짐)
-        # 이미지 로딩
+        self.prediction_radius = 8 # 플레이어가 이 거리(맨해튼) 안에 있으면 학습 예측 위치를 타겟으로 사용
+        # 이미지는 처음 그릴 때 불러옴 (화면 없이 실행하는 헤드리스 모드에서는 불러오지 않음)
+        self.ghost_imgs = None
+        # Behavior Tree는 사용하지 않음
+        self.behavior_tree = None
+        # GhostManager가 공유하는 경로 탐색 엔진과 플레이어 방향 흐름 필드
+        self.pathfinder = None
+        self.flow_field = None
+        # 고스트별 증분 경로 계획기 (첫 경로 탐색 시 맵과 함께 생성)
+        self.planner = None
+        # 현재 상태(update_state)와 마지막으로 경로를 계획할 때의 상태 - 다르면 바로 재계획
+        self.mode = None
+        self.plan_mode = None
+        self.current_speed = self.speed
+        # 이번 프레임의 계획 시간 예산이 끝나는 시각 (time.perf_counter 기준, GhostManager가 설정, None이면 제한 없음)
+        self.plan_deadline = None
+
+    def load_sprites(self):
         self.ghost_imgs = {
             RED: pygame.image.load(os.path.join('assets', 'sprites', 'ghost_red.png')).convert_alpha(),
             PINK: pygame.image.load(os.path.join('assets', 'sprites', 'ghost_pink.png')).convert_alpha(),
@@ -28,100 +48,117 @@ class Ghost:
             ORANGE: pygame.image.load(os.path.join('assets', 'sprites', 'ghost_orange.png')).convert_alpha(),
             'frightened': pygame.image.load(os.path.join('assets', 'sprites', 'ghost_frightened.png')).convert_alpha()
         }
-        # Behavior Tree는 사용하지 않음
-        self.behavior_tree = None
 
     def update(self, player_pos, game_map, other_ghosts, player=None):
-        current_time = time.time()
+        """상태 갱신, 경로 계획, 이동을 한 번에 처리합니다 (스케줄러 없이 매 프레임 계획하는 단독 사용)."""
         # 리스폰 대기 중이면 움직임 및 상태 업데이트를 건너뛰기
-        if current_time - self.respawn_time < self.respawn_delay:
+        if self.is_respawning():
             return
+        self.update_state(player)
+        self.plan(player_pos, game_map, other_ghosts, player)
+        self.move(game_map, other_ghosts)
 
-        # 플레이어와 고스트 간의 거리 계산 (맨해튼 거리)
-        distance_to_player = abs(self.x - player_pos[0]) + abs(self.y - player_pos[1])
+    def is_respawning(self):
+        """리스폰 대기 중인지 확인합니다."""
+        return self.clock.now() - self.respawn_time < self.respawn_delay
 
+    def update_state(self, player=None):
+        """시간과 플레이어 파워업 여부로 상태(mode)와 이동 속도를 정합니다. 계획 주기와 관계없이 매 프레임 호출합니다.
+
+        mode는 'post_respawn'(리스폰 직후 강제 chase), 'frightened', 'chase' 중 하나입니다.
+        """
         # 리스폰 대기 시간은 끝났지만 post_respawn_chase_duration 시간 동안은 강제로 chase 상태 유지
         # 이 시간 동안은 플레이어 파워업 상태와 관계없이 chase 상태입니다.
-        if current_time < self.post_respawn_end_time:
-             self.state = 'chase'
-             current_speed = self.speed # 일반 속도
-             # 리스폰 직후에는 플레이어 현재 위치 추격
-             target_pos = player_pos 
-
+        if self.clock.now() < self.post_respawn_end_time:
+            self.state = 'chase'
+            self.mode = 'post_respawn'
+            self.current_speed = self.speed # 일반 속도
+        # NOTE: player 객체가 None이 아닐 때만 player 상태를 확인합니다.
+        elif player and player.is_powered_up():
+            # 플레이어가 파워업 상태이면 모든 고스트는 frightened 상태가 됩니다.
+            self.state = 'frightened'
+            self.mode = 'frightened'
+            self.current_speed = self.speed / self.frightened_speed_multiplier # frightened 상태시 더 느리게
         else:
-            # post_respawn_chase_duration 시간이 끝난 후에는 플레이어 파워업 상태에 따라 상태 전환 및 움직임 결정
-            # NOTE: player 객체가 None이 아닐 때만 player 상태를 확인합니다.
-            if player and player.is_powered_up():
-                # 플레이어가 파워업 상태이면 모든 고스트는 frightened 상태가 됩니다.
-                self.state = 'frightened'
-                current_speed = self.speed / self.frightened_speed_multiplier # frightened 상태시 더 느리게
-                # 파워펠릿 상태일 때는 플레이어로부터 멀어지는 방향으로 이동 (가장 먼 인접 타일 선택)
-                valid_adjacent_tiles = game_map.get_valid_adjacent_tiles(self.x, self.y)
-                best_move = None
-                max_dist = -1
-                current_dist = abs(self.x - player_pos[0]) + abs(self.y - player_pos[1])
-                max_dist = current_dist
-
-                for next_tile in valid_adjacent_tiles:
-                     next_x, next_y = next_tile
-                     dist_from_player = abs(next_x - player_pos[0]) + abs(next_y - player_pos[1])
-                     if dist_from_player > max_dist:
-                          max_dist = dist_from_player
-                          best_move = (next_x, next_y)
-                if best_move:
-                     self.path = [best_move] # 도망 방향으로 1칸 이동
-                else:
-                     self.path = [] # 이동 가능한 방향이 없으면 멈춤
-
+            # 플레이어가 파워업 상태가 아니거나 player 객체가 없으면 chase 상태
+            self.state = 'chase'
+            self.mode = 'chase'
+            self.current_speed = self.speed # 일반 속도
+
+    def needs_replan(self):
+        """계획 주기를 기다리지 않고 바로 경로를 다시 계획해야 하는지 확인합니다.
+
+        마지막 계획 이후 상태(mode)가 바뀌었거나, 경로를 다 따라갔거나, 비켜나면서 경로가 끊긴 경우입니다.
+        """
+        if self.mode != self.plan_mode or not self.path:
+            return True
+        next_x, next_y = self.path[0]
+        return abs(next_x - self.x) + abs(next_y - self.y) != 1
+
+    def plan(self, player_pos, game_map, other_ghosts, player=None):
+        """현재 상태(update_state로 정한 mode)에 맞게 타겟을 정하고 self.path를 다시 계획합니다."""
+        self.plan_mode = self.mode
+        if self.mode == 'frightened':
+            # 파워펠릿 상태일 때는 플레이어로부터 멀어지는 방향으로 이동 (가장 먼 인접 타일 선택)
+            valid_adjacent_tiles = game_map.get_valid_adjacent_tiles(self.x, self.y)
+            best_move = None
+            max_dist = abs(self.x - player_pos[0]) + abs(self.y - player_pos[1])
+
+            for next_tile in valid_adjacent_tiles:
+                 next_x, next_y = next_tile
+                 dist_from_player = abs(next_x - player_pos[0]) + abs(next_y - player_pos[1])
+                 if dist_from_player > max_dist:
+                      max_dist = dist_from_player
+                      best_move = (next_x, next_y)
+            if best_move:
+                 self.path = [best_move] # 도망 방향으로 1칸 이동
             else:
-                 # 플레이어가 파워업 상태가 아니거나 player 객체가 없으면 frightened 상태에서 벗어납니다.
-                 if self.state == 'frightened':
-                     self.state = 'chase' # frightened 상태였다면 chase로 복귀
-
-                 self.state = 'chase' # 플레이어 파워업 상태가 아니면 chase 상태
-                 current_speed = self.speed # 일반 속도
-                 
-                 # ----- 고스트 타입별 기본 타겟 설정 로직 (일반 chase 상태일 때) -----
-                 # 각 고스트 타입의 get_chase_target 메소드를 호출하여 기본 타겟을 가져옵니다.
-                 target_pos = self.get_chase_target(player_pos, game_map, other_ghosts, player)
-                 # -------------------------------------------------------
-
-                 # 거리 기반 학습 예측 활용 또는 기본 타겟 추격
-                 # 학습 단계 0부터, 8타일 이내 가까운 거리에서 학습 예측 사용
-                 distance_to_player = abs(self.x - player_pos[0]) + abs(self.y - player_pos[1]) # 플레이어와 고스트 간의 거리 계산
-                 if self.learning and self.learning.learning_phase >= 0 and distance_to_player < 8:
-                      # 가까우면 학습 예측 위치를 최종 타겟으로 사용
-                      pred = self.learning.get_prediction((self.x, self.y), [g for g in other_ghosts if g != self])
-                      if pred != (self.x, self.y) and game_map.is_valid_move(pred[0], pred[1]):
-                           final_target = pred
-                           # TODO: 고스트 타입별로 예측 위치 활용 방식을 다르게 적용
-                           pass # 현재는 예측 위치를 바로 final_target으로 사용
-                      else:
-                           # 예측 실패 또는 유효하지 않은 예측 시 기본 타겟 사용
-                           final_target = target_pos # get_chase_target 결과 사용
-                 else: # 멀리 있을 때 또는 학습 단계 낮을 때: 기본 타겟 추격
-                      final_target = target_pos # get_chase_target 결과 사용
-
-                 # 최종 타겟으로 A* 경로 탐색
-                 # 최종 타겟이 현재 위치와 같으면 A* 호출 방지 (경로 항상 비어있음)
-                 if final_target != (self.x, self.y):
-                     # a_star 함수 호출 결과를 self.path에 할당
-                     # 혹시 a_star가 예상치 못한 값을 반환할 경우를 대비하여 할당 전 검사 또는 할당 후 검사 필요
-                     # 현재 a_star는 빈 리스트 [] 또는 타일 튜플의 리스트 [(x1, y1), (x2, y2), ...]를 반환한다고 가정
-                     calculated_path = a_star((self.x, self.y), final_target, game_map.current_map)
-                     # 계산된 경로가 유효한 리스트인지 확인
-                     if isinstance(calculated_path, list):
-                          self.path = calculated_path
-                     else:
-                          # 예상치 못한 타입이 할당된 경우 경로를 비웁니다.
-                          print(f"Warning: a_star returned unexpected type {type(calculated_path)} for target {final_target}. Path cleared.")
-                          self.path = []
+                 self.path = [] # 이동 가능한 방향이 없으면 멈춤
+
+        elif self.mode == 'chase':
+             # ----- 고스트 타입별 기본 타겟 설정 로직 (일반 chase 상태일 때) -----
+             # 각 고스트 타입의 get_chase_target 메소드를 호출하여 기본 타겟을 가져옵니다.
+             target_pos = self.get_chase_target(player_pos, game_map, other_ghosts, player)
+             # -------------------------------------------------------
+
+             # 거리 기반 학습 예측 활용 또는 기본 타겟 추격
+             # 학습 단계 0부터, prediction_radius(기본 8타일) 이내 가까운 거리에서 학습 예측 사용
+             distance_to_player = abs(self.x - player_pos[0]) + abs(self.y - player_pos[1]) # 플레이어와 고스트 간의 거리 계산
+             if self.learning and self.learning.learning_phase >= 0 and distance_to_player < self.prediction_radius:
+                  # 가까우면 학습 예측 위치를 최종 타겟으로 사용
+                  pred = self.learning.get_prediction((self.x, self.y), [g for g in other_ghosts if g != self])
+                  if pred != (self.x, self.y) and game_map.is_valid_move(pred[0], pred[1]):
+                       final_target = tuple(pred) # 저장된 학습 데이터의 위치는 리스트일 수 있음
+                       # TODO: 고스트 타입별로 예측 위치 활용 방식을 다르게 적용
+                       pass # 현재는 예측 위치를 바로 final_target으로 사용
+                  else:
+                       # 예측 실패 또는 유효하지 않은 예측 시 기본 타겟 사용
+                       final_target = target_pos # get_chase_target 결과 사용
+             else: # 멀리 있을 때 또는 학습 단계 낮을 때: 기본 타겟 추격
+                  final_target = target_pos # get_chase_target 결과 사용
+
+             # 최종 타겟으로 경로 탐색
+             # 최종 타겟이 현재 위치와 같으면 탐색하지 않음 (경로 항상 비어있음)
+             if final_target != (self.x, self.y):
+                 # 모든 경우 빈 리스트 [] 또는 타일 튜플의 리스트 [(x1, y1), (x2, y2), ...]를 반환
+                 if self.is_target_on_path(final_target):
+                     # 타겟이 현재 경로 위에 그대로 있으면 재계획 없이 타겟까지만 남깁니다.
+                     self.path = self.path[:self.path.index(final_target) + 1]
+                 elif self.flow_field is not None and self.flow_field.target == final_target:
+                     # 플레이어를 직접 쫓는 경우 이번 틱의 공유 흐름 필드를 읽기만 합니다.
+                     self.path = self.flow_field.get_path((self.x, self.y))
                  else:
-                      self.path = []
-
+                     self.path = self.plan_path(final_target, game_map, other_ghosts)
+             else:
+                  self.path = []
+        # post_respawn: 리스폰 직후에는 경로를 새로 만들지 않음 (리셋 때 비워진 경로 유지)
+
+    def move(self, game_map, other_ghosts):
+        """현재 경로(self.path)의 첫 칸으로 이동합니다. 계획하지 않은 프레임에도 이전 경로를 따라갑니다."""
+        current_time = self.clock.now()
         # 이동 처리: 결정된 path의 첫 번째 칸으로 이동
         # post_respawn_chase 상태에서도 이 이동 로직을 사용합니다.
-        if current_time - self.last_move_time >= current_speed: # 조정된 속도 적용
+        if current_time - self.last_move_time >= self.current_speed: # 조정된 속도 적용
             # self.path가 리스트이고 비어있지 않은지 다시 확인
             if isinstance(self.path, list) and self.path:
                 next_tile = self.path[0]
@@ -159,22 +196,45 @@ class Ghost:
                         # TODO: A* 경로와 일치하는 대안 타일을 우선 선택하는 등 로직 개선 가능
                         chosen_alternative = valid_alternatives[0]
                         self.x, self.y = chosen_alternative
-                        # 대안 경로로 이동했으므로 현재 경로(self.path)는 재계산이 필요할 수 있으나,
-                        # 다음 업데이트 주기에서 새로운 경로를 찾을 것이므로 여기서는 그대로 둡니다.
-                        # self.path = [] # 또는 경로를 비우는 것도 고려 가능
+                        # 대안 경로로 이동해 현재 경로(self.path)가 끊겼으므로 다음 프레임에 needs_replan()이 재계획을 요구합니다.
                     # else: 대안 경로도 없으면 현재 위치에 머뭄 (이전과 동일하게 멈춤)
             # else: pathfinding 실패 또는 이동 가능한 방향 없으면 현재 위치 유지 (멈춤)
             self.last_move_time = current_time
 
+    def is_target_on_path(self, target):
+        """현재 경로가 여전히 이어져 있고 타겟이 그 위에 있는지 확인합니다."""
+        if not self.path or target not in self.path:
+            return False
+        # 대안 타일로 비켜난 경우 등 경로 첫 칸이 인접하지 않으면 경로가 끊긴 것
+        next_x, next_y = self.path[0]
+        return abs(next_x - self.x) + abs(next_y - self.y) == 1
+
+    def plan_path(self, target, game_map, other_ghosts):
+        """다른 고스트가 서 있는 타일을 막힌 칸으로 보고 증분 계획기로 경로를 구합니다."""
+        if self.pathfinder is None or self.pathfinder.map_manager is not game_map:
+            # GhostManager 밖에서 단독으로 쓰이는 경우 자체 경로 탐색 엔진을 만듭니다.
+            self.pathfinder = PathFinder(game_map)
+            self.planner = None
+        if self.planner is None:
+            self.planner = self.pathfinder.create_planner()
+        blocked = [(g.x, g.y) for g in other_ghosts if g != self]
+        path = self.planner.plan((self.x, self.y), target, blocked)
+        if not path:
+            # 다른 고스트에 완전히 막혔으면 막힘을 무시한 (캐시된) 최단 경로를 사용 (이동 시 회피 로직이 처리)
+            path = self.pathfinder.a_star((self.x, self.y), target)[1:]
+        return path
+
     def render(self, screen):
         center_x = self.x * TILE_SIZE + TILE_SIZE // 2
         center_y = self.y * TILE_SIZE + TILE_SIZE // 2
         # 리스폰 대기 중이거나 frightened 상태일 때 이미지를 다르게 표시
         # 리스폰 대기 중에는 투명하게 또는 다르게 표시 가능
-        if time.time() - self.respawn_time < self.respawn_delay:
+        if self.clock.now() - self.respawn_time < self.respawn_delay:
              # 리스폰 중에는 안 보이게 처리 (또는 다른 이미지/알파 값 적용)
              return
 
+        if self.ghost_imgs is None:
+            self.load_sprites()
         if self.state == 'frightened':
             img = self.ghost_imgs['frightened']
         else:
@@ -186,12 +246,31 @@ class Ghost:
         self.x, self.y = self.init_x, self.init_y
         self.state = "chase" # 리셋되면 기본 chase 상태
         self.path = []
-        self.last_move_time = time.time()
-        self.respawn_time = time.time() # 리스폰 시간 기록 (리셋 시 바로 리스폰 대기 시작)
+        self.plan_mode = None
+        self.last_move_time = self.clock.now()
+        self.respawn_time = self.clock.now() # 리스폰 시간 기록 (리셋 시 바로 리스폰 대기 시작)
         self.post_respawn_end_time = self.respawn_time + self.respawn_delay + self.post_respawn_chase_duration # 리스폰 대기 + 추가 chase 시간 설정
         # Behavior Tree는 사용하지 않으므로 관련 코드 제거 또는 주석 처리
         self.behavior_tree = None # Behavior Tree 사용 안 함
 
+    def capture_state(self):
+        """게임 상태 저장(키프레임)용으로 위치, 상태, 경로, 타이머, 증분 계획기 상태를 복사해서 반환합니다."""
+        return (self.x, self.y, self.state, self.mode, self.plan_mode, self.current_speed, list(self.path),
+                self.last_move_time, self.respawn_time, self.post_respawn_end_time,
+                self.planner.capture_state() if self.planner is not None else None)
+
+    def restore_state(self, state):
+        """capture_state로 저장한 상태로 되돌립니다."""
+        (self.x, self.y, self.state, self.mode, self.plan_mode, self.current_speed, path,
+         self.last_move_time, self.respawn_time, self.post_respawn_end_time, planner_state) = state
+        self.path = list(path)
+        if planner_state is None:
+            self.planner = None
+        else:
+            if self.planner is None:
+                self.planner = self.pathfinder.create_planner()
+            self.planner.restore_state(planner_state)
+
     def get_chase_target(self, player_pos, game_map, other_ghosts, player=None):
         """일반 chase 상태일 때 고스트 타입별 기본 타겟 위치를 결정합니다."""
         # 기본적으로 플레이어 현재 위치를 타겟으로 합니다.
@@ -269,7 +348,104 @@ class PredictiveGhost(Ghost):
         # update 함수 내에서 이 기본 타겟과 학습 예측 결과를 조합하여 최종 타겟을 결정합니다.
         return player_pos
 
-def create_ghosts(learning_system, map_manager):
+class LookaheadGhost(Ghost):
+    """chase 상태에서 expectimax 탐색(ExpectimaxSearch)으로 다음 칸을 고르는 고스트.
+
+    GhostManager 안에서는 팀이 탐색 하나와 전치 테이블을 공유합니다. 한 프레임에 계획하는 chase 상태의 LookaheadGhost들의
+    동시 이동을 처음 계획하는 고스트 차례에 한 번만 탐색하고, 각 고스트는 그 공동 결과에서 자기 몫을 사용합니다 (GhostManager.lookahead_move).
+    플레이어 이동은 학습 통계로 가중합니다. 고른 첫 칸 뒤로는 플레이어까지의 최단 경로를 이어 붙여 계획 사이에도 따라갑니다.
+    탐색은 GhostManager의 프레임 계획 예산(plan_deadline)과 노드 예산 안에서 반복 심화로 진행하고,
+    탐색할 수 없으면(맵 밖 등) 일반 고스트처럼 플레이어를 쫓습니다. frightened, 리스폰 직후 상태는 기본 동작과 같습니다.
+    시간 제한은 라이브 플레이에서만 적용되므로, 이 고스트가 있는 라이브 리플레이는 탐색 깊이가 달라져 정확히 재현되지 않을 수 있습니다
+    (헤드리스 실행과 그 리플레이는 노드 예산만 쓰므로 결정적).
+    """
+    def __init__(self, x, y, color, learning_system, clock=None):
+        super().__init__(x, y, color, learning_system, clock)
+        self.search = None
+        self.team = None # 공동 탐색을 맡는 GhostManager (없으면 단독 사용으로 보고 자기 탐색을 만듦)
+        self.search_depth = 0 # 마지막 탐색에서 끝까지 탐색한 깊이
+
+    def plan(self, player_pos, game_map, other_ghosts, player=None):
+        step = self.plan_lookahead(player_pos, game_map, other_ghosts) if self.mode == 'chase' else None
+        if step is None:
+            super().plan(player_pos, game_map, other_ghosts, player)
+            return
+        self.plan_mode = self.mode
+        self.path = [step] + game_map.get_table_path(step, tuple(player_pos))
+
+    def plan_lookahead(self, player_pos, game_map, other_ghosts):
+        """탐색으로 이번에 옮길 칸을 고릅니다. 탐색할 수 없으면 None."""
+        if self.team is not None:
+            return self.team.lookahead_move(self, player_pos, game_map)
+        if self.search is None or self.search.map_manager is not game_map:
+            self.search = ExpectimaxSearch(game_map, self.learning)
+        ghosts = list(other_ghosts) if self in other_ghosts else list(other_ghosts) + [self]
+        movers = [i for i, ghost in enumerate(ghosts) if isinstance(ghost, LookaheadGhost) and ghost.mode == 'chase']
+        steps, self.search_depth = search_team_moves(self.search, ghosts, movers, player_pos, game_map, self.plan_deadline)
+        return steps.get(ghosts.index(self))
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        # 되돌린 상태의 학습 통계가 같은 이동 횟수에서도 다를 수 있으므로 전치 테이블을 비움
+        if self.search is not None:
+            self.search.clear()
+
+def search_team_moves(search, ghosts, movers, player_pos, game_map, deadline=None):
+    """ghosts(팀 전체) 중 movers(고스트 번호 목록)의 동시 이동을 한 번 탐색합니다.
+
+    {고스트 번호: 다음 칸 좌표}와 끝까지 탐색한 깊이를 반환합니다. 리스폰 대기 중인 고스트는 빠지고, 탐색할 수 없으면 빈 딕셔너리입니다.
+    """
+    tiles = tuple(-1 if ghost.is_respawning() else game_map.get_tile_index(ghost.x, ghost.y) for ghost in ghosts)
+    searching = [i for i in movers if tiles[i] >= 0]
+    player_tile = game_map.get_tile_index(player_pos[0], player_pos[1])
+    if player_tile < 0 or not searching:
+        return {}, 0
+    markov = search.learning.markov if search.learning else None
+    context = markov.context if markov is not None else 0
+    moves, depth = search.search(player_tile, context, tiles, searching,
+                                 game_map.pellet_bits, game_map.power_pellet_bits, deadline)
+    if moves is None:
+        return {}, depth
+    return {i: game_map.walkable_tiles[tile] for i, tile in zip(searching, moves)}, depth
+
+# 고스트 타입 이름(GHOST_* 상수) -> 클래스
+GHOST_TYPES = {
+    GHOST_AGGRESSIVE: AggressiveGhost,
+    GHOST_AMBUSH: AmbushGhost,
+    GHOST_COOPERATIVE: CooperativeGhost,
+    GHOST_PREDICTIVE: PredictiveGhost,
+    GHOST_LOOKAHEAD: LookaheadGhost,
+}
+
+# 고스트 구성에서 바꿀 수 있는 조정값 (Ghost 속성 이름)
+GHOST_TUNABLES = ('speed', 'frightened_speed_multiplier', 'prediction_radius')
+
+# 기본 고스트 구성 (스폰 위치 순서대로)
+DEFAULT_GHOST_SPEC = [GHOST_AGGRESSIVE, GHOST_AMBUSH, GHOST_COOPERATIVE, GHOST_PREDICTIVE]
+
+def normalize_ghost_spec(spec=None):
+    """고스트 구성을 {'type': 타입 이름, 조정값...} 딕셔너리 목록으로 바꿉니다 (생략하면 DEFAULT_GHOST_SPEC).
+
+    GHOST_TYPES에 없는 타입이나 GHOST_TUNABLES에 없는 조정값이 있으면 ValueError를 발생시킵니다.
+    """
+    entries = []
+    for entry in spec or DEFAULT_GHOST_SPEC:
+        entry = {'type': entry} if isinstance(entry, str) else dict(entry)
+        if entry.get('type') not in GHOST_TYPES:
+            raise ValueError(f"알 수 없는 고스트 타입: {entry.get('type')}")
+        unknown = [name for name in entry if name != 'type' and name not in GHOST_TUNABLES]
+        if unknown:
+            raise ValueError(f"알 수 없는 고스트 조정값: {', '.join(unknown)}")
+        entries.append(entry)
+    return entries
+
+def create_ghosts(learning_system, map_manager, clock=None, spec=None):
+    """고스트 구성(spec)대로 고스트들을 만듭니다.
+
+    spec의 각 항목은 GHOST_* 타입 이름 또는 {'type': 타입 이름, 조정값...} 딕셔너리입니다 (조정값은 GHOST_TUNABLES).
+    생략하면 DEFAULT_GHOST_SPEC을 사용합니다. 색은 GHOST_COLORS 순서로 돌아가며 정해집니다.
+    """
+    spec = normalize_ghost_spec(spec)
     # map_manager에서 고스트 스폰 위치를 가져옴
     spawn_positions = map_manager.get_spawn_positions().get('ghosts', [])
     # 스폰 위치가 4개 미만이면 기본값 추가 (혹시 맵 파일에 스폰 위치가 부족할 경우 대비)
@@ -289,12 +465,13 @@ def create_ghosts(learning_system, map_manager):
                    spawn_positions.append(new_pos)
                    print(f"Warning: Not enough ghost spawn points in map. Added alternative default spawn point: {new_pos}") # 로그 추가
 
-    ghosts = [
-        AggressiveGhost(*spawn_positions[0], RED, learning_system),
-        AmbushGhost(*spawn_positions[1], PINK, learning_system),
-        CooperativeGhost(*spawn_positions[2], CYAN, learning_system),
-        PredictiveGhost(*spawn_positions[3], ORANGE, learning_system),
-    ]
+    ghosts = []
+    for i, entry in enumerate(spec):
+        ghost = GHOST_TYPES[entry['type']](*spawn_positions[i % len(spawn_positions)], GHOST_COLORS[i % len(GHOST_COLORS)], learning_system, clock)
+        for name in GHOST_TUNABLES:
+            if name in entry:
+                setattr(ghost, name, entry[name])
+        ghosts.append(ghost)
     # Behavior Tree는 사용하지 않으므로 관련 코드 제거 또는 주석 처리
     # try:
     #     pass # Behavior Tree 사용 안 함
@@ -1,39 +1,489 @@
-from collections import deque, defaultdict
+from collections import deque
 import pygame
 import time
+import mmap
+import os
+import queue
+import struct
+import threading
+import numpy as np
 from game.constants import *
+from ai.markov import MarkovPredictor
 import json # json 모듈 추가
 # from game.map_manager import MapManager # 순환 참조 방지
 
+# ----- 학습 데이터 바이너리(열 지향) 형식 -----
+# [헤더 12바이트] 매직 b'PMLD', 버전(uint16), 열 개수(uint16), 메타 JSON 길이(uint32)
+# [메타 JSON] move_count 등 스칼라 값
+# [열 목록] 열마다 이름(16바이트), dtype(8바이트), 원소 수(uint64), 파일 내 오프셋(uint64)
+# [데이터] 열별로 8바이트 정렬된 리틀엔디언 배열 - mmap 후 np.frombuffer로 복사 없이 읽을 수 있음
+LEARNING_FILE_MAGIC = b'PMLD'
+LEARNING_FILE_VERSION = 1
+LEARNING_FILE_HEADER = struct.Struct('<4sHHI')
+LEARNING_FILE_COLUMN = struct.Struct('<16s8sQQ')
+
+# 방향 문자열 <-> 정수 코드 (-1은 값 없음)
+DIRECTION_NAMES = list(DIRECTIONS)
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTION_NAMES)}
+
+# move_data 플래그 비트
+MOVE_HAS_CORNER = 1
+MOVE_IS_CORNER = 2
+MOVE_HAS_SCORE = 4
+MOVE_HAS_GHOSTS = 8
+
+# ----- 학습 저널 (추가 전용, 길이 접두) -----
+# 레코드 = 길이(uint16) + 내용. 내용의 첫 바이트가 레코드 종류이며 모든 레코드는 증가하는 순번을 가집니다.
+# 스냅샷에는 마지막으로 반영된 순번이 저장되므로 그 이후 레코드만 다시 적용합니다.
+JOURNAL_LENGTH = struct.Struct('<H')
+JOURNAL_MOVE = 1
+JOURNAL_PELLET_TIMING = 2
+JOURNAL_MOVE_RECORD = struct.Struct('<BQhhhhbbBbi')
+JOURNAL_PELLET_RECORD = struct.Struct('<BQd')
+
+# ----- 학습 기록 로그 (리플레이의 시작 학습 상태용) -----
+# [헤더 16바이트] 매직 b'PMLL', 기준 스냅샷 길이(uint32), 마지막으로 이어 쓴 레코드 순번(uint64)
+# [기준 스냅샷] 바이너리 학습 파일 내용 (로그를 시작할 때의 상태)
+# [저널 레코드들] 그 뒤로 저널에 추가된 레코드를 같은 형식으로 이어 씀
+# 기준 스냅샷에 레코드를 순번 N까지 적용하면 journal_seq가 N이던 때의 학습 상태가 되므로, 리플레이는 스냅샷 대신
+# (로그 경로, journal_seq)만 저장합니다. 로그는 학습 데이터 파일마다 하나이며 다음 실행에서 불러온 상태의 journal_seq가
+# 헤더의 마지막 순번과 같으면 이어 쓰므로, 기준 스냅샷은 학습 데이터를 처음부터 다시 시작할 때만 새로 씁니다.
+LEARNING_LOG_MAGIC = b'PMLL'
+LEARNING_LOG_HEADER = struct.Struct('<4sIQ')
+LEARNING_LOG_TAIL = struct.Struct('<Q')
+
+def move_flags(move):
+    """이동 기록의 선택 항목(코너 여부, 점수, 고스트 밀집도) 존재/값을 비트 플래그로 만듭니다."""
+    md = move.get('move_data', {})
+    flag = 0
+    if 'is_corner' in md:
+        flag |= MOVE_HAS_CORNER
+        if md['is_corner']:
+            flag |= MOVE_IS_CORNER
+    if 'score' in md:
+        flag |= MOVE_HAS_SCORE
+    if 'nearby_ghosts' in move:
+        flag |= MOVE_HAS_GHOSTS
+    return flag
+
+def decode_move(prev_x, prev_y, cur_x, cur_y, direction, next_direction, flags, nearby_ghosts, score):
+    """정수 필드들로부터 이동 기록 딕셔너리를 복원합니다 (위치는 튜플)."""
+    move_data = {}
+    if direction >= 0:
+        move_data['direction'] = DIRECTION_NAMES[direction]
+    if next_direction >= 0:
+        move_data['next_direction'] = DIRECTION_NAMES[next_direction]
+    if flags & MOVE_HAS_CORNER:
+        move_data['is_corner'] = bool(flags & MOVE_IS_CORNER)
+    if flags & MOVE_HAS_SCORE:
+        move_data['score'] = score
+    move = {'prev_pos': (prev_x, prev_y), 'current_pos': (cur_x, cur_y), 'move_data': move_data}
+    if flags & MOVE_HAS_GHOSTS:
+        move['nearby_ghosts'] = nearby_ghosts
+    return move
+
+def encode_journal_move(seq, move):
+    """이동 기록 하나를 길이 접두 저널 레코드로 만듭니다."""
+    md = move['move_data']
+    payload = JOURNAL_MOVE_RECORD.pack(
+        JOURNAL_MOVE, seq, move['prev_pos'][0], move['prev_pos'][1], move['current_pos'][0], move['current_pos'][1],
+        DIRECTION_CODES.get(md.get('direction'), -1), DIRECTION_CODES.get(md.get('next_direction'), -1),
+        move_flags(move), move.get('nearby_ghosts', 0), md.get('score', 0))
+    return JOURNAL_LENGTH.pack(len(payload)) + payload
+
+def encode_journal_pellet_timing(seq, timing):
+    """파워 펠릿 획득 간격 기록을 길이 접두 저널 레코드로 만듭니다."""
+    payload = JOURNAL_PELLET_RECORD.pack(JOURNAL_PELLET_TIMING, seq, timing)
+    return JOURNAL_LENGTH.pack(len(payload)) + payload
+
+def read_learning_journal(filepath):
+    """저널 파일의 (종류, 순번, 값) 레코드들을 순서대로 반환합니다.
+
+    충돌로 마지막 레코드가 잘려 있으면 그 앞까지만 읽습니다.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            buffer = f.read()
+    except FileNotFoundError:
+        return []
+    return parse_learning_journal(buffer)
+
+def parse_learning_journal(buffer, position=0):
+    """buffer[position:]의 저널 레코드들을 (종류, 순번, 값) 목록으로 읽습니다 (잘린 마지막 레코드는 무시)."""
+    records = []
+    while position + JOURNAL_LENGTH.size <= len(buffer):
+        (length,) = JOURNAL_LENGTH.unpack_from(buffer, position)
+        payload = buffer[position + JOURNAL_LENGTH.size:position + JOURNAL_LENGTH.size + length]
+        if length == 0 or len(payload) < length:
+            break
+        position += JOURNAL_LENGTH.size + length
+        if payload[0] == JOURNAL_MOVE and length == JOURNAL_MOVE_RECORD.size:
+            fields = JOURNAL_MOVE_RECORD.unpack(payload)
+            records.append((JOURNAL_MOVE, fields[1], decode_move(*fields[2:])))
+        elif payload[0] == JOURNAL_PELLET_TIMING and length == JOURNAL_PELLET_RECORD.size:
+            _, seq, timing = JOURNAL_PELLET_RECORD.unpack(payload)
+            records.append((JOURNAL_PELLET_TIMING, seq, timing))
+    return records
+
+def encode_learning_columns(data):
+    """학습 상태 딕셔너리를 (메타, {열 이름: numpy 배열}) 형태로 변환합니다."""
+    history = data.get('move_history', [])
+    move_data = [move.get('move_data', {}) for move in history]
+    flags = [move_flags(move) for move in history]
+    columns = {
+        'prev_x': np.array([m['prev_pos'][0] for m in history], dtype='<i2'),
+        'prev_y': np.array([m['prev_pos'][1] for m in history], dtype='<i2'),
+        'cur_x': np.array([m['current_pos'][0] for m in history], dtype='<i2'),
+        'cur_y': np.array([m['current_pos'][1] for m in history], dtype='<i2'),
+        'direction': np.array([DIRECTION_CODES.get(md.get('direction'), -1) for md in move_data], dtype='<i1'),
+        'next_direction': np.array([DIRECTION_CODES.get(md.get('next_direction'), -1) for md in move_data], dtype='<i1'),
+        'flags': np.array(flags, dtype='<u1'),
+        'nearby_ghosts': np.array([m.get('nearby_ghosts', 0) for m in history], dtype='<i1'),
+        'score': np.array([md.get('score', 0) for md in move_data], dtype='<i4'),
+        'pellet_timing': np.array(list(data.get('power_pellet_timing', [])), dtype='<f8'),
+        'milestone_move': np.array([m[0] for m in data.get('score_milestones', [])], dtype='<i8'),
+        'milestone_score': np.array([m[1] for m in data.get('score_milestones', [])], dtype='<i4'),
+    }
+    stats = data.get('transition_stats', {})
+    for prefix, key in (('t', 'all'), ('c', 'corner')):
+        rows = np.array(stats.get(key, []), dtype='<f8').reshape(-1, 6)
+        columns[prefix + '_prev_x'] = rows[:, 0].astype('<i2')
+        columns[prefix + '_prev_y'] = rows[:, 1].astype('<i2')
+        columns[prefix + '_next_x'] = rows[:, 2].astype('<i2')
+        columns[prefix + '_next_y'] = rows[:, 3].astype('<i2')
+        columns[prefix + '_count'] = rows[:, 4].copy()
+        columns[prefix + '_dense'] = rows[:, 5].copy()
+    meta = {
+        'move_count': data.get('move_count', 0),
+        'learning_phase': data.get('learning_phase', 0),
+        'corner_count': data.get('corner_count', 0),
+        'decay_weight': stats.get('decay_weight', 1.0),
+        'journal_seq': data.get('journal_seq', 0),
+        'LEARNING_PHASE_THRESHOLDS': data.get('LEARNING_PHASE_THRESHOLDS'),
+    }
+    markov = data.get('markov_stats')
+    if markov:
+        # 마르코프 카운트는 0이 아닌 칸의 (평탄화 인덱스, 값)으로 저장
+        columns['m_index'] = np.array(markov['index'], dtype='<i4')
+        columns['m_count'] = np.array(markov['count'], dtype='<f8')
+        meta['markov'] = {key: markov[key] for key in ('order', 'shape', 'tile', 'context')}
+    return meta, columns
+
+def decode_learning_columns(meta, columns):
+    """encode_learning_columns의 역변환 - 위치는 튜플로 복원됩니다."""
+    prev_x, prev_y = columns['prev_x'].tolist(), columns['prev_y'].tolist()
+    cur_x, cur_y = columns['cur_x'].tolist(), columns['cur_y'].tolist()
+    directions, next_directions = columns['direction'].tolist(), columns['next_direction'].tolist()
+    flags, nearby_ghosts, scores = columns['flags'].tolist(), columns['nearby_ghosts'].tolist(), columns['score'].tolist()
+    history = [decode_move(*fields) for fields in zip(prev_x, prev_y, cur_x, cur_y, directions, next_directions, flags, nearby_ghosts, scores)]
+    stats = {'decay_weight': meta.get('decay_weight', 1.0)}
+    for prefix, key in (('t', 'all'), ('c', 'corner')):
+        stats[key] = [list(row) for row in zip(
+            columns[prefix + '_prev_x'].tolist(), columns[prefix + '_prev_y'].tolist(),
+            columns[prefix + '_next_x'].tolist(), columns[prefix + '_next_y'].tolist(),
+            columns[prefix + '_count'].tolist(), columns[prefix + '_dense'].tolist())]
+    data = {
+        'move_count': meta.get('move_count', 0),
+        'learning_phase': meta.get('learning_phase', 0),
+        'move_history': history,
+        'corner_count': meta.get('corner_count', 0),
+        'power_pellet_timing': columns['pellet_timing'].tolist(),
+        'score_milestones': list(zip(columns['milestone_move'].tolist(), columns['milestone_score'].tolist())),
+        'transition_stats': stats,
+        'journal_seq': meta.get('journal_seq', 0),
+    }
+    if meta.get('LEARNING_PHASE_THRESHOLDS') is not None:
+        data['LEARNING_PHASE_THRESHOLDS'] = meta['LEARNING_PHASE_THRESHOLDS']
+    if meta.get('markov') is not None and 'm_index' in columns:
+        data['markov_stats'] = dict(meta['markov'], index=columns['m_index'].tolist(), count=columns['m_count'].tolist())
+    return data
+
+def pack_learning_file(meta, columns):
+    """메타와 열 배열들을 바이너리 학습 파일 내용(bytes)으로 만듭니다."""
+    meta_bytes = json.dumps(meta).encode('utf-8')
+    offset = LEARNING_FILE_HEADER.size + len(meta_bytes) + LEARNING_FILE_COLUMN.size * len(columns)
+    directory = []
+    chunks = []
+    for name, array in columns.items():
+        padding = -offset % 8
+        chunks.append(b'\0' * padding)
+        offset += padding
+        directory.append(LEARNING_FILE_COLUMN.pack(name.encode('ascii'), array.dtype.str.encode('ascii'), len(array), offset))
+        raw = np.ascontiguousarray(array).tobytes()
+        chunks.append(raw)
+        offset += len(raw)
+    header = LEARNING_FILE_HEADER.pack(LEARNING_FILE_MAGIC, LEARNING_FILE_VERSION, len(columns), len(meta_bytes))
+    return b''.join([header, meta_bytes] + directory + chunks)
+
+def unpack_learning_file(buffer):
+    """바이너리 학습 파일 내용(bytes 또는 mmap)에서 (메타, {열 이름: numpy 배열})을 읽습니다.
+
+    배열들은 buffer를 복사 없이 가리키는 읽기 전용 뷰입니다.
+    """
+    magic, version, column_count, meta_length = LEARNING_FILE_HEADER.unpack_from(buffer, 0)
+    if magic != LEARNING_FILE_MAGIC:
+        raise ValueError("학습 데이터 바이너리 파일이 아닙니다.")
+    if version > LEARNING_FILE_VERSION:
+        raise ValueError(f"지원하지 않는 학습 데이터 파일 버전입니다: {version}")
+    position = LEARNING_FILE_HEADER.size
+    meta = json.loads(bytes(buffer[position:position + meta_length]).decode('utf-8'))
+    position += meta_length
+    columns = {}
+    for _ in range(column_count):
+        name, dtype, count, offset = LEARNING_FILE_COLUMN.unpack_from(buffer, position)
+        position += LEARNING_FILE_COLUMN.size
+        dtype = np.dtype(dtype.rstrip(b'\0').decode('ascii'))
+        name = name.rstrip(b'\0').decode('ascii')
+        columns[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset) if count else np.empty(0, dtype=dtype)
+    return meta, columns
+
+def write_learning_file(filepath, data):
+    """학습 상태 딕셔너리를 바이너리 열 지향 형식으로 저장합니다.
+
+    임시 파일에 쓰고 디스크에 반영한 뒤 이름을 바꾸므로, 도중에 충돌해도 기존 파일이 깨지지 않습니다.
+    """
+    temp_path = filepath + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(pack_learning_file(*encode_learning_columns(data)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, filepath)
+
+def read_learning_file(filepath):
+    """바이너리 학습 파일을 mmap으로 열어 학습 상태 딕셔너리로 읽습니다."""
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            meta, columns = unpack_learning_file(buffer)
+            data = decode_learning_columns(meta, columns)
+            # 열 뷰가 mmap을 참조하므로 닫기 전에 모두 해제
+            del columns
+    return data
+
+def is_learning_binary_file(filepath):
+    """파일이 바이너리 학습 데이터 형식인지 매직 바이트로 확인합니다."""
+    with open(filepath, 'rb') as f:
+        return f.read(len(LEARNING_FILE_MAGIC)) == LEARNING_FILE_MAGIC
+
+def read_learning_log(filepath):
+    """학습 기록 로그를 읽어 (기준 학습 상태 딕셔너리, 저널 레코드 목록)을 반환합니다."""
+    with open(filepath, 'rb') as f:
+        buffer = f.read()
+    if len(buffer) < LEARNING_LOG_HEADER.size:
+        raise ValueError("학습 기록 로그 파일이 아닙니다.")
+    magic, snapshot_length, _ = LEARNING_LOG_HEADER.unpack_from(buffer, 0)
+    if magic != LEARNING_LOG_MAGIC or len(buffer) < LEARNING_LOG_HEADER.size + snapshot_length:
+        raise ValueError("학습 기록 로그 파일이 아니거나 기준 스냅샷이 잘렸습니다.")
+    end = LEARNING_LOG_HEADER.size + snapshot_length
+    state = decode_learning_columns(*unpack_learning_file(buffer[LEARNING_LOG_HEADER.size:end]))
+    return state, parse_learning_journal(buffer, end)
+
+def read_learning_log_tail(filepath):
+    """학습 기록 로그 헤더의 마지막 레코드 순번. 로그가 없거나 읽을 수 없으면 None."""
+    try:
+        with open(filepath, 'rb') as f:
+            header = f.read(LEARNING_LOG_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < LEARNING_LOG_HEADER.size:
+        return None
+    magic, _, tail_seq = LEARNING_LOG_HEADER.unpack(header)
+    return tail_seq if magic == LEARNING_LOG_MAGIC else None
+
+class LearningPersistenceWorker:
+    """학습 데이터 저장(저널 추가, 스냅샷 직렬화/쓰기)을 게임 스레드 밖에서 처리하는 작업 스레드.
+
+    작업은 크기가 제한된 큐로 받아 들어온 순서대로 처리하므로, 스냅샷 이전의 저널 기록은
+    항상 스냅샷보다 먼저 쓰이고 스냅샷 이후의 기록은 저널을 비운 뒤에 쓰입니다.
+    게임 스레드는 큐가 가득 차도 기다리지 않습니다: 저널 레코드는 호출한 쪽이 버퍼에 두었다가 다시 넘기고,
+    스냅샷은 건너뜁니다 (저널이 남아 있으므로 잃는 데이터는 없음). 같은 파일의 스냅샷이 아직 처리되지 않았으면
+    새 상태로 바꿔치기만 해서 지나간 스냅샷을 쓰지 않습니다.
+    여러 PlayerLearningSystem이 하나의 작업 스레드를 함께 쓸 수 있습니다.
+    """
+    def __init__(self, queue_size=LEARNING_PERSISTENCE_QUEUE_SIZE):
+        self.tasks = queue.Queue(maxsize=queue_size)
+        # 대기 중인 스냅샷 {data_file: (journal_file, 저장할 상태, 상태 -> 딕셔너리 변환 함수)}
+        self.pending_snapshots = {}
+        # 저널 파일(학습 기록 로그는 로그 파일)별 아직 끝나지 않은 작업 수 (프로필 하나의 작업만 기다리는 flush용)
+        self.pending_counts = {}
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name='learning-persistence', daemon=True)
+        self.thread.start()
+
+    def submit(self, journal_file, task, block):
+        """작업을 큐에 넣습니다. block이 False이고 큐가 가득 찼으면 넣지 않고 False를 반환합니다."""
+        with self.condition:
+            self.pending_counts[journal_file] = self.pending_counts.get(journal_file, 0) + 1
+        try:
+            self.tasks.put(task, block=block)
+        except queue.Full:
+            self.task_finished(journal_file)
+            return False
+        return True
+
+    def task_finished(self, journal_file):
+        with self.condition:
+            self.pending_counts[journal_file] -= 1
+            if not self.pending_counts[journal_file]:
+                del self.pending_counts[journal_file]
+                self.condition.notify_all()
+
+    def append_journal(self, journal_file, records, block=False, log_file=None, last_seq=0):
+        """저널 파일 끝에 레코드 묶음(bytes)을 추가하도록 예약합니다. 큐가 가득 차서 넣지 못했으면 False.
+
+        log_file을 주면 같은 레코드를 학습 기록 로그 끝에도 추가하고 헤더의 마지막 순번을 last_seq로 바꿉니다.
+        """
+        return self.submit(journal_file, ('journal', journal_file, records, log_file, last_seq), block)
+
+    def write_snapshot(self, data_file, journal_file, state, export=None):
+        """상태를 스냅샷으로 쓰고 저널을 비우도록 예약합니다. 예약했으면(또는 대기 중인 스냅샷을 바꿨으면) True.
+
+        export를 주면 작업 스레드에서 export(state)로 저장할 딕셔너리를 만듭니다 (직렬화를 게임 스레드 밖에서).
+        """
+        with self.condition:
+            if data_file in self.pending_snapshots:
+                self.pending_snapshots[data_file] = (journal_file, state, export)
+                return True
+            self.pending_snapshots[data_file] = (journal_file, state, export)
+        if self.submit(journal_file, ('snapshot', data_file), block=False):
+            return True
+        with self.condition:
+            del self.pending_snapshots[data_file]
+        return False
+
+    def start_log(self, log_file, state, export):
+        """export(state)를 기준 스냅샷으로 하는 학습 기록 로그를 새로 쓰도록 예약합니다.
+
+        한 번뿐인 쓰기라서 큐가 가득 차 있으면 자리가 날 때까지 기다립니다. 끝날 때까지 기다리려면 flush(log_file).
+        """
+        self.submit(log_file, ('log', log_file, state, export), block=True)
+
+    def flush(self, journal_file=None):
+        """예약된 작업이 끝날 때까지 기다립니다. journal_file을 주면 그 파일의 작업만 기다립니다."""
+        if journal_file is None:
+            self.tasks.join()
+            return
+        with self.condition:
+            self.condition.wait_for(lambda: journal_file not in self.pending_counts)
+
+    def stop(self):
+        """남은 작업을 마치고 작업 스레드를 종료합니다."""
+        self.tasks.put(('stop',))
+        self.thread.join()
+
+    def run(self):
+        while True:
+            task = self.tasks.get()
+            journal_file = None
+            try:
+                if task[0] == 'stop':
+                    return
+                elif task[0] == 'journal':
+                    _, journal_file, records, log_file, last_seq = task
+                    with open(journal_file, 'ab') as f:
+                        f.write(records)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    if log_file:
+                        # 로그는 리플레이용이므로 fsync하지 않음. 레코드를 쓴 뒤에 헤더의 마지막 순번을 갱신
+                        with open(log_file, 'r+b') as f:
+                            f.seek(0, os.SEEK_END)
+                            f.write(records)
+                            f.seek(LEARNING_LOG_HEADER.size - LEARNING_LOG_TAIL.size)
+                            f.write(LEARNING_LOG_TAIL.pack(last_seq))
+                elif task[0] == 'snapshot':
+                    with self.condition:
+                        journal_file, state, export = self.pending_snapshots.pop(task[1])
+                    write_learning_file(task[1], export(state) if export is not None else state)
+                    # 스냅샷에 journal_seq가 함께 저장되므로 여기서 충돌해도 저널 재적용 시 중복되지 않음
+                    open(journal_file, 'wb').close()
+                elif task[0] == 'log':
+                    _, journal_file, state, export = task
+                    data = export(state)
+                    snapshot = pack_learning_file(*encode_learning_columns(data))
+                    with open(journal_file, 'wb') as f:
+                        f.write(LEARNING_LOG_HEADER.pack(LEARNING_LOG_MAGIC, len(snapshot), data['journal_seq']) + snapshot)
+            except Exception as e:
+                print(f"학습 데이터 저장 중 오류 발생: {e}")
+            finally:
+                if journal_file is not None:
+                    self.task_finished(journal_file)
+                self.tasks.task_done()
+
 class PlayerLearningSystem:
-    def __init__(self):
+    def __init__(self, map_manager=None, memory_size=LEARNING_MEMORY_SIZE, decay=LEARNING_DECAY,
+                 data_file=LEARNING_DATA_FILE, legacy_file=LEGACY_LEARNING_DATA_FILE,
+                 pretrained_file=LEARNING_PRETRAINED_FILE, persistence_worker=None):
+        # 최근 이동 기록은 memory_size개만 보관하고, 장기 학습은 감쇠 누적 통계(전이 인덱스)로 유지
+        self.memory_size = memory_size
+        self.decay = decay
+        # 스냅샷 파일과 그 이후 이동을 이어 쓰는 저널 파일
+        self.data_file = data_file
+        self.legacy_file = legacy_file
+        # 저장된 학습 데이터가 없는 새 플레이어의 시작점 (오프라인 학습 결과)
+        self.pretrained_file = pretrained_file
+        self.journal_file = data_file + '.journal'
+        self.journal_buffer = []
+        # 저널 레코드를 함께 이어 쓰는 학습 기록 로그 (start_learning_log, 없으면 None)
+        self.learning_log_file = None
+        # 저장 작업 스레드 (지정하지 않으면 전용 스레드를 만들고 close()에서 종료)
+        self.owns_persistence = persistence_worker is None
+        self.persistence = persistence_worker or LearningPersistenceWorker()
+        # 학습 단계 2 이상에서 쓰는 k차 마르코프 예측기 (맵 크기로 배열을 잡으므로 맵이 있을 때만)
+        self.markov = MarkovPredictor(map_manager) if map_manager is not None else None
+        # 틱 단위 예측 메모: 다음 이동이 기록되기 전까지 같은 질의는 다시 계산하지 않음
+        self.prediction_memo = {}
+        # 학습 상태를 저장된 상태(capture_state)와 공유 중이면 True - 바꾸기 전에 복사 (copy-on-write)
+        self.state_shared = False
         self.reset_learning_data() # 초기화 함수 호출
 
     def reset_learning_data(self):
-        """매 게임 시작 시 학습 데이터를 초기 상태로 리셋합니다. 초기 학습 데이터를 포함시킬 수 있습니다."""
-        # 저장된 학습 데이터 파일 경로
-        save_file = 'learning_data.json'
+        """저장된 스냅샷과 저널로 학습 데이터를 복원합니다. 없으면 사전 학습 모델이나 초기 학습 데이터로 시작합니다."""
+        # 저장된 학습 데이터 파일 경로 (바이너리 형식, 없으면 이전 JSON 파일에서 변환)
+        save_file = self.data_file
+        self.unshare_state()
+        # 아직 기록되지 않은 저널 레코드를 먼저 내보내 다시 불러올 때 빠지지 않도록 함
+        self.flush_journal(block=True)
+        self.persistence.flush(self.journal_file)
+        self.journal_seq = 0
+        migrated = False
 
         # 저장된 데이터 로드 시도
         if self.load_learning_data(save_file):
             print(f"학습 데이터를 '{save_file}'에서 불러왔습니다.")
-            # 로드 성공 시 추가 초기화 없이 바로 시작
             # learning_phase 등은 로드된 데이터에 포함됩니다.
-            return
+        elif not os.path.exists(save_file) and self.legacy_file and self.load_learning_data(self.legacy_file):
+            print(f"이전 형식의 학습 데이터 '{self.legacy_file}'를 '{save_file}'로 변환합니다.")
+            migrated = True
+        elif not os.path.exists(save_file) and self.pretrained_file and self.load_learning_data(self.pretrained_file):
+            print(f"사전 학습 모델 '{self.pretrained_file}'로 학습을 시작합니다.")
+        else:
+            # 로드 실패 또는 파일이 없을 경우 기본 초기화
+            print("저장된 학습 데이터 파일을 찾을 수 없거나 로드에 실패하여 기본 학습 데이터로 시작합니다.")
+            self.init_default_learning_data()
+
+        # 마지막 스냅샷 이후 저널에 남은 기록을 다시 적용 (비정상 종료 복구)
+        replayed = self.replay_journal()
+        if replayed:
+            print(f"학습 저널에서 {replayed}개의 기록을 복구했습니다.")
+        # 변환 스냅샷은 저널을 비우므로 저널을 다시 적용한 뒤에 저장 (먼저 저장하면 남은 기록을 잃음)
+        if migrated:
+            self.save_snapshot()
 
-        # 로드 실패 또는 파일이 없을 경우 기본 초기화
-        print("저장된 학습 데이터 파일을 찾을 수 없거나 로드에 실패하여 기본 학습 데이터로 시작합니다.")
+    def init_default_learning_data(self):
+        """저장된 데이터가 없을 때의 기본 학습 데이터로 초기화합니다."""
+        self.learning_log_file = None
+        self.prediction_memo.clear()
         self.move_count = 0
         # 게임 시작 시 학습 단계 1부터 시작하여 초기 학습 효과를 부여
         self.learning_phase = 1 
-        self.move_history = []
+        self.move_history = deque(maxlen=self.memory_size)
         self.corner_count = 0
-        self.power_pellet_timing = [] # 파워 펠릿 획득 시점 기록 (타임스탬프 또는 이전 펠릿/파워펠릿 획득까지의 시간)
-        self.score_milestones = [] # 특정 점수 도달 시간 기록
+        self.power_pellet_timing = deque(maxlen=self.memory_size) # 파워 펠릿 획득 시점 기록 (타임스탬프 또는 이전 펠릿/파워펠릿 획득까지의 시간)
+        self.score_milestones = deque(maxlen=self.memory_size) # 특정 점수 도달 시간 기록
 
         # 학습 단계 변화 기준 (이동 횟수 기준)
         # 이 값은 초기화 시 변경되지 않고 고정됩니다.
-        self.LEARNING_PHASE_THRESHOLDS = [0, 5, 15, 30, 50, 100, 200, 500, 1000, 2000, 5000, 10000] # 학습 단계 대폭 확장
+        self.LEARNING_PHASE_THRESHOLDS = list(LEARNING_PHASE_THRESHOLDS) # 학습 단계 대폭 확장
 
         # 초기 학습 데이터 추가 (선택 사항)
         # 몇 가지 더미 이동 데이터를 추가하여 초기 예측에 영향을 줍니다.
@@ -46,11 +496,10 @@ class PlayerLearningSystem:
         ]
         self.move_history.extend(initial_moves)
         self.move_count += len(initial_moves) # 초기 이동 횟수 반영
+        self.rebuild_transition_index()
         # 초기 데이터에 따라 learning_phase를 다시 계산할 수도 있지만, 여기서는 1로 고정했습니다.
 
     def analyze_player_move(self, prev_pos, current_pos, move_data, ghost_positions=None):
-        self.move_count += 1
-        
         # 플레이어 현재 위치 주변 고스트 밀집도 계산
         nearby_ghost_count = 0
         if ghost_positions:
@@ -68,8 +517,23 @@ class PlayerLearningSystem:
             'nearby_ghosts': nearby_ghost_count # 밀집도 정보 추가
         }
 
+        self.apply_move_record(move_record)
+        self.journal_seq += 1
+        self.append_journal(encode_journal_move(self.journal_seq, move_record))
+        # 일정 이동마다 전체 상태를 압축 스냅샷으로 저장하고 저널을 비움
+        if self.move_count % LEARNING_SNAPSHOT_INTERVAL == 0:
+            self.save_snapshot()
+
+    def apply_move_record(self, move_record):
+        """이동 기록 하나를 학습 상태에 반영합니다 (저널 재적용 시에도 사용)."""
+        self.unshare_state()
+        self.prediction_memo.clear()
+        self.move_count += 1
         self.move_history.append(move_record)
+        self.index_move(move_record)
+        self.advance_decay()
 
+        move_data = move_record['move_data']
         # 코너링 습관 기록
         if move_data.get('is_corner'):
             self.corner_count += 1
@@ -80,44 +544,127 @@ class PlayerLearningSystem:
             if self.move_count >= threshold:
                 self.learning_phase = i
 
-    def get_prediction(self, current_pos, ghost_positions):
+    def index_move(self, move):
+        """이동 기록 하나를 이전 위치별 다음 위치 카운트 인덱스에 반영합니다.
+
+        transition_index[prev_pos][next_pos] = [횟수, 고스트 밀집 시 횟수] (모든 이동)
+        corner_transition_index는 같은 형식으로 코너링 이동만 모읍니다.
+        횟수는 지수 감쇠되며, 매번 모든 값을 곱하는 대신 새 기록의 가중치(decay_weight)를 키웁니다.
+        """
+        dense = 1 if move.get('nearby_ghosts', 0) >= 2 else 0
+        # JSON에서 불러온 위치는 리스트이므로 튜플로 맞춰서 키로 사용
+        prev_pos, next_pos = tuple(move['prev_pos']), tuple(move['current_pos'])
+        self.transition_index.setdefault(prev_pos, {}).setdefault(next_pos, [0.0, 0.0])[dense] += self.decay_weight
+        if move['move_data'].get('is_corner'):
+            self.corner_transition_index.setdefault(prev_pos, {}).setdefault(next_pos, [0.0, 0.0])[dense] += self.decay_weight
+        if self.markov is not None:
+            self.markov.update(prev_pos, next_pos, self.decay_weight, DIRECTION_CODES.get(move['move_data'].get('direction'), -1))
+
+    def advance_decay(self):
+        """이동 1회만큼 기존 통계를 감쇠시킵니다 (새 기록 가중치를 1/decay배)."""
+        self.decay_weight /= self.decay
+        if self.decay_weight > 1e6:
+            # 가중치가 너무 커지기 전에 전체 통계를 한 번 나눠서 1로 되돌림
+            for index in (self.transition_index, self.corner_transition_index):
+                for next_counts in index.values():
+                    for counts in next_counts.values():
+                        counts[0] /= self.decay_weight
+                        counts[1] /= self.decay_weight
+            if self.markov is not None:
+                self.markov.scale(1.0 / self.decay_weight)
+            self.decay_weight = 1.0
+
+    def rebuild_transition_index(self, moves=None):
+        """이동 기록(기본값: move_history)으로 전이 인덱스를 다시 만듭니다 (불러오기/초기화 시 한 번)."""
+        self.unshare_state()
+        self.transition_index = {}
+        self.corner_transition_index = {}
+        self.decay_weight = 1.0
+        if self.markov is not None:
+            self.markov.reset()
+        for move in (self.move_history if moves is None else moves):
+            self.index_move(move)
+            self.advance_decay()
+
+    def export_transition_stats(self, decay_weight=None, transition_index=None, corner_transition_index=None):
+        """감쇠 누적 통계를 JSON으로 저장 가능한 형태로 변환합니다 (인자를 주면 capture_state로 저장한 통계를 변환)."""
+        def flatten(index):
+            return [[p[0], p[1], n[0], n[1], c[0], c[1]] for p, next_counts in index.items() for n, c in next_counts.items()]
+        if transition_index is None:
+            decay_weight, transition_index, corner_transition_index = (
+                self.decay_weight, self.transition_index, self.corner_transition_index)
+        return {
+            'decay_weight': decay_weight,
+            'all': flatten(transition_index),
+            'corner': flatten(corner_transition_index),
+        }
+
+    def import_transition_stats(self, stats):
+        """export_transition_stats 형식의 통계를 전이 인덱스로 복원합니다."""
+        def unflatten(rows):
+            index = {}
+            for px, py, nx, ny, count, dense_count in rows:
+                index.setdefault((px, py), {})[(nx, ny)] = [count, dense_count]
+            return index
+        self.decay_weight = stats.get('decay_weight', 1.0)
+        self.transition_index = unflatten(stats.get('all', []))
+        self.corner_transition_index = unflatten(stats.get('corner', []))
+
+    def rebuild_markov(self):
+        """마르코프 통계가 저장되지 않은 데이터를 불러왔을 때 move_history로 다시 학습합니다.
+
+        전이 인덱스와 같은 감쇠 가중치 척도가 되도록 가장 최근 이동에 decay_weight * decay를 줍니다.
+        """
+        self.markov.reset()
+        weight = self.decay_weight * self.decay ** len(self.move_history)
+        for move in self.move_history:
+            self.markov.update(move['prev_pos'], move['current_pos'], weight,
+                               DIRECTION_CODES.get(move['move_data'].get('direction'), -1))
+            weight /= self.decay
+
+    def best_indexed_move(self, index, current_pos):
+        """인덱스에서 점수가 가장 높은 다음 위치를 반환합니다. 기록이 없으면 current_pos."""
+        next_counts = index.get(tuple(current_pos))
+        if not next_counts:
+            return current_pos
+        # 고스트 밀집도가 2 이상인 이동 패턴은 낮은 점수(0.2배) - 밀집 지역 회피 학습 가중치 낮춤
+        move_scores = {next_pos: counts[0] + 0.2 * counts[1] for next_pos, counts in next_counts.items()}
+        return max(move_scores, key=move_scores.get)
+
+    def get_prediction(self, current_pos, ghost_positions=None):
+        """플레이어의 다음 위치를 예측합니다.
+
+        결과는 학습 상태와 current_pos에만 의존하므로, 같은 틱에 여러 고스트가 같은 질의를 하면
+        메모에 저장된 값을 돌려줍니다. 메모는 analyze_player_move(이동 기록)에서 비워집니다.
+        """
+        # 단계 2 이상은 플레이어의 마지막 상태로만 예측하므로 질의 위치와 무관하게 하나만 저장
+        key = tuple(current_pos) if self.learning_phase < 2 else None
+        if key not in self.prediction_memo:
+            self.prediction_memo[key] = self.compute_prediction(current_pos)
+        return self.prediction_memo[key]
+
+    def get_predictions(self, positions):
+        """여러 질의 위치(예: 모든 고스트 위치)의 예측을 한 번에 계산해 같은 순서의 리스트로 반환합니다.
+
+        겹치는 위치는 한 번만 계산되고 결과는 메모에 남아, 같은 틱의 get_prediction 호출이 그대로 사용합니다.
+        """
+        return [self.get_prediction(position) for position in positions]
+
+    def compute_prediction(self, current_pos):
         # phase에 따라 예측 방식 다르게
         if self.learning_phase == 0:
             # 가장 많이 이동한 방향 (고스트 밀집도 고려)
-            moves = []
-            move_scores = defaultdict(float)
-            for move in self.move_history:
-                if move['prev_pos'] == current_pos:
-                    next_pos = move['current_pos']
-                    # 고스트 밀집도가 2 이상인 경우 해당 이동 패턴에 낮은 점수 부여
-                    score_multiplier = 1.0
-                    if move.get('nearby_ghosts', 0) >= 2:
-                        score_multiplier = 0.2 # 밀집 지역 회피 학습 가중치 낮춤
-                    move_scores[next_pos] += 1.0 * score_multiplier # 횟수에 score_multiplier 반영
-
-            if move_scores:
-                # 점수가 가장 높은 타일 반환
-                return max(move_scores, key=move_scores.get)
-            return current_pos
+            return self.best_indexed_move(self.transition_index, current_pos)
         elif self.learning_phase == 1:
             # 코너링 선호 반영 (고스트 밀집도 고려)
-            corner_moves = []
-            corner_move_scores = defaultdict(float)
-            for move in self.move_history:
-                if move['prev_pos'] == current_pos and move['move_data'].get('is_corner'):
-                    next_pos = move['current_pos']
-                    # 고스트 밀집도가 2 이상인 경우 해당 코너링 패턴에 낮은 점수 부여
-                    score_multiplier = 1.0
-                    if move.get('nearby_ghosts', 0) >= 2:
-                        score_multiplier = 0.2
-                    corner_move_scores[next_pos] += 1.0 * score_multiplier
-
-            if corner_move_scores:
-                # 점수가 가장 높은 코너링 타일 반환
-                return max(corner_move_scores, key=corner_move_scores.get)
-            return current_pos
+            return self.best_indexed_move(self.corner_transition_index, current_pos)
         elif self.learning_phase >= 2:
-            # 최근 이동 경로 기반 예측 (패턴 인식) - 여기서는 밀집도 직접 반영은 복잡
+            # (현재 타일, 최근 이동 방향) 문맥의 k차 마르코프 통계로 몇 칸 앞 위치 예측
+            if self.markov is not None:
+                predicted = self.markov.most_likely_position(LEARNING_MARKOV_LOOKAHEAD)
+                if predicted is not None:
+                    return predicted
+            # 맵이 연결되지 않은 경우: 최근 이동 경로 기반 예측 (패턴 인식) - 여기서는 밀집도 직접 반영은 복잡
             # 간단하게, 최근 이동이 고스트 밀집 지역 회피였다면 그 방향 선호
             if self.move_history:
                 last_move = self.move_history[-1]
@@ -131,21 +678,216 @@ class PlayerLearningSystem:
             return current_pos
         return current_pos
 
-    def save_learning_data(self, filepath):
-        """현재 학습 데이터를 지정된 파일에 JSON 형식으로 저장합니다."""
+    def get_prediction_distribution(self, steps=1):
+        """steps칸 뒤 플레이어 위치의 확률 분포 (map_manager.walkable_tiles 순서 배열). 맵이 없으면 None."""
+        if self.markov is None:
+            return None
+        return self.markov.predict_ahead(steps)
+
+    def record_power_pellet_timing(self, timing):
+        """파워 펠릿 획득 간격을 기록하고 저널에 남깁니다."""
+        self.unshare_state()
+        self.power_pellet_timing.append(timing)
+        self.journal_seq += 1
+        self.append_journal(encode_journal_pellet_timing(self.journal_seq, timing))
+
+    def append_journal(self, record):
+        """저널 레코드를 버퍼에 모았다가 LEARNING_JOURNAL_BATCH개마다 파일 끝에 추가합니다."""
+        self.journal_buffer.append(record)
+        if len(self.journal_buffer) >= LEARNING_JOURNAL_BATCH:
+            self.flush_journal()
+
+    def flush_journal(self, block=False):
+        """버퍼에 모인 저널 레코드를 저장 작업 스레드에 넘깁니다 (파일 추가와 fsync는 작업 스레드에서).
+
+        큐가 가득 차 있으면 기다리지 않고 버퍼에 남겨 두었다가 다음에 다시 넘깁니다 (block=True면 기다림).
+        """
+        if not self.journal_buffer:
+            return
+        if self.persistence.append_journal(self.journal_file, b''.join(self.journal_buffer), block=block,
+                                           log_file=self.learning_log_file, last_seq=self.journal_seq):
+            self.journal_buffer = []
+
+    def replay_journal(self):
+        """마지막 스냅샷 이후의 저널 레코드를 학습 상태에 다시 적용합니다. 적용한 개수 반환."""
+        return self.apply_journal_records(read_learning_journal(self.journal_file))
+
+    def save_snapshot(self):
+        """현재 상태 전체를 스냅샷 파일에 원자적으로 저장한 뒤 저널을 비웁니다.
+
+        게임 스레드에서는 상태를 공유(capture_state)만 하고, 딕셔너리 변환과 직렬화, 파일 쓰기는 저장 작업 스레드가 처리합니다.
+        저장 작업 큐가 가득 차서 스냅샷을 예약하지 못했으면 False (저널은 남아 있으므로 잃는 기록은 없음).
+        """
+        self.flush_journal()
+        return self.persistence.write_snapshot(self.data_file, self.journal_file, self.capture_state(),
+                                               self.export_learning_state)
+
+    def start_learning_log(self, log_file=None):
+        """학습 기록 로그에 이후 저널 레코드를 이어 쓰기 시작합니다 (기본값: data_file 옆의 로그).
+
+        로그의 마지막 순번이 지금 journal_seq와 같으면(지난 실행에서 이어지는 상태) 그대로 이어 쓰고,
+        아니면 현재 상태를 기준 스냅샷으로 로그를 새로 씁니다. 새로 쓸 때도 save_snapshot처럼 게임 스레드에서는
+        상태를 공유(capture_state)만 하고 변환과 쓰기는 저장 작업 스레드가 합니다.
+        불러오기/초기화/restore_state처럼 저널을 거치지 않고 상태가 바뀌면 로그는 끊기며(learning_log_file = None)
+        다시 시작해야 합니다.
+        """
+        log_file = log_file or self.data_file + LEARNING_LOG_EXTENSION
+        # 버퍼에 남은 레코드는 지금 상태에 이미 반영되어 있으므로 로그를 정하기 전에 먼저 내보냄
+        self.flush_journal(block=True)
+        self.persistence.flush(self.journal_file)
+        self.learning_log_file = log_file
+        if read_learning_log_tail(log_file) != self.journal_seq:
+            self.persistence.start_log(log_file, self.capture_state(), self.export_learning_state)
+        return log_file
+
+    def sync_learning_log(self):
+        """지금까지의 저널 레코드가 학습 기록 로그에 모두 써질 때까지 기다립니다."""
+        if self.learning_log_file is None:
+            return
+        self.flush_journal(block=True)
+        self.persistence.flush(self.learning_log_file)
+        self.persistence.flush(self.journal_file)
+
+    def apply_journal_records(self, records, until_seq=None):
+        """순번이 journal_seq보다 크고 until_seq 이하인 저널 레코드들을 학습 상태에 적용합니다. 적용한 개수 반환."""
+        applied = 0
+        for kind, seq, value in records:
+            if seq <= self.journal_seq:
+                continue # 이미 반영된 레코드
+            if until_seq is not None and seq > until_seq:
+                break
+            if kind == JOURNAL_MOVE:
+                self.apply_move_record(value)
+            elif kind == JOURNAL_PELLET_TIMING:
+                # 저장된 상태(capture_state)와 공유 중일 수 있으므로 record_power_pellet_timing처럼 먼저 떼어 냄
+                self.unshare_state()
+                self.power_pellet_timing.append(value)
+            self.journal_seq = seq
+            applied += 1
+        return applied
+
+    def close(self):
+        """종료 시 남은 저널 레코드만 기록하고 저장 작업이 끝날 때까지 기다립니다 (전체 파일을 다시 쓰지 않음)."""
+        self.flush_journal(block=True)
+        if self.owns_persistence:
+            self.persistence.stop()
+        else:
+            self.persistence.flush(self.journal_file)
+
+    def capture_state(self):
+        """게임 상태 저장(키프레임)용으로 학습 상태를 반환합니다 (파일 형식 변환 없이, 딕셔너리 순서까지 그대로).
+
+        복사하지 않고 공유한 뒤 다음 이동이 기록되기 전에 한 번 복사합니다 (copy-on-write).
+        """
+        self.state_shared = True
+        return ((self.move_count, self.learning_phase, self.journal_seq, self.decay_weight,
+                 self.move_history, self.corner_count, self.power_pellet_timing, self.score_milestones,
+                 self.transition_index, self.corner_transition_index, self.LEARNING_PHASE_THRESHOLDS),
+                (self.markov.counts, self.markov.tile, self.markov.context) if self.markov is not None else None)
+
+    def restore_state(self, state):
+        """capture_state로 저장한 학습 상태로 되돌립니다. 저장 파일에는 영향을 주지 않습니다."""
+        values, markov = state
+        self.learning_log_file = None
+        (self.move_count, self.learning_phase, self.journal_seq, self.decay_weight,
+         self.move_history, self.corner_count, self.power_pellet_timing, self.score_milestones,
+         self.transition_index, self.corner_transition_index, self.LEARNING_PHASE_THRESHOLDS) = values
+        if markov is not None and self.markov is not None:
+            self.markov.counts, self.markov.tile, self.markov.context = markov
+        self.state_shared = True
+        self.prediction_memo.clear()
+
+    def unshare_state(self):
+        """capture_state/restore_state로 공유 중인 학습 상태를 바꾸기 전에 복사해서 떼어 냅니다."""
+        if not self.state_shared:
+            return
+        # 기록 항목(이동 기록 딕셔너리, 시간, 튜플)은 추가된 뒤 바뀌지 않으므로 컨테이너만 복사하고,
+        # 전이 인덱스는 제자리에서 더해지는 [횟수, 밀집 횟수] 목록까지 복사
+        self.move_history = deque(self.move_history, maxlen=self.memory_size)
+        self.power_pellet_timing = deque(self.power_pellet_timing, maxlen=self.memory_size)
+        self.score_milestones = deque(self.score_milestones, maxlen=self.memory_size)
+        self.transition_index = {prev_pos: {next_pos: counts[:] for next_pos, counts in next_counts.items()}
+                                 for prev_pos, next_counts in self.transition_index.items()}
+        self.corner_transition_index = {prev_pos: {next_pos: counts[:] for next_pos, counts in next_counts.items()}
+                                        for prev_pos, next_counts in self.corner_transition_index.items()}
+        if self.markov is not None:
+            self.markov.counts = self.markov.counts.copy()
+        self.state_shared = False
+
+    def export_learning_state(self, state=None):
+        """저장용 학습 상태 딕셔너리를 만듭니다.
+
+        state(capture_state의 결과)를 주면 현재 상태 대신 그 상태를 변환합니다. 공유된 상태는 바뀌지 않으므로
+        저장 작업 스레드에서 불러도 안전합니다.
+        """
+        if state is None:
+            markov = (self.markov.counts, self.markov.tile, self.markov.context) if self.markov is not None else None
+            values = (self.move_count, self.learning_phase, self.journal_seq, self.decay_weight,
+                      self.move_history, self.corner_count, self.power_pellet_timing, self.score_milestones,
+                      self.transition_index, self.corner_transition_index, self.LEARNING_PHASE_THRESHOLDS)
+        else:
+            values, markov = state
+        (move_count, learning_phase, journal_seq, decay_weight, move_history, corner_count, power_pellet_timing,
+         score_milestones, transition_index, corner_transition_index, thresholds) = values
         data = {
-            'move_count': self.move_count,
-            'learning_phase': self.learning_phase,
-            'move_history': self.move_history,
-            'corner_count': self.corner_count,
-            'power_pellet_timing': self.power_pellet_timing,
-            'score_milestones': self.score_milestones,
+            'move_count': move_count,
+            'learning_phase': learning_phase,
+            'move_history': list(move_history),
+            'corner_count': corner_count,
+            'power_pellet_timing': list(power_pellet_timing),
+            'score_milestones': list(score_milestones),
+            # 잘려나간 오래된 이동까지 반영된 감쇠 누적 통계
+            'transition_stats': self.export_transition_stats(decay_weight, transition_index, corner_transition_index),
             # LEARNING_PHASE_THRESHOLDS는 고정 값이므로 저장/로드가 필수는 아니지만 일관성을 위해 포함
-            'LEARNING_PHASE_THRESHOLDS': self.LEARNING_PHASE_THRESHOLDS
+            'LEARNING_PHASE_THRESHOLDS': thresholds,
+            # 이 상태에 반영된 마지막 저널 레코드 순번
+            'journal_seq': journal_seq,
         }
+        if markov is not None and self.markov is not None:
+            data['markov_stats'] = self.markov.export_stats(markov)
+        return data
+
+    def import_learning_state(self, data):
+        """export_learning_state 형식(또는 이전 JSON 형식)의 딕셔너리로 객체 상태를 갱신합니다."""
+        self.learning_log_file = None
+        self.unshare_state()
+        self.prediction_memo.clear()
+        self.move_count = data.get('move_count', 0)
+        self.learning_phase = data.get('learning_phase', 0)
+        self.journal_seq = data.get('journal_seq', 0)
+        move_history = data.get('move_history', [])
+        # JSON은 튜플을 리스트로 바꾸므로 위치를 튜플로 되돌려 current_pos 비교가 맞도록 함
+        for move in move_history:
+            move['prev_pos'] = tuple(move['prev_pos'])
+            move['current_pos'] = tuple(move['current_pos'])
+        if 'transition_stats' in data:
+            self.import_transition_stats(data['transition_stats'])
+        else:
+            # 이전 형식(무제한 기록)은 잘라내기 전에 전체 기록으로 감쇠 통계를 만들어 장기 학습을 보존
+            self.rebuild_transition_index(move_history)
+        self.move_history = deque(move_history, maxlen=self.memory_size)
+        # 마르코프 통계가 없거나(이전 형식) 맵 크기가 달라졌으면 남아 있는 기록으로 다시 학습
+        if self.markov is not None and 'transition_stats' in data and not self.markov.import_stats(data.get('markov_stats')):
+            self.rebuild_markov()
+        self.corner_count = data.get('corner_count', 0)
+        self.power_pellet_timing = deque(data.get('power_pellet_timing', []), maxlen=self.memory_size)
+        self.score_milestones = deque(data.get('score_milestones', []), maxlen=self.memory_size)
+        # THRESHOLDS는 기본값을 유지하거나 로드된 값 사용 (여기서는 로드된 값 사용)
+        self.LEARNING_PHASE_THRESHOLDS = data.get('LEARNING_PHASE_THRESHOLDS', [0, 20, 50, 100, 200]) # 기본값은 기존값으로 설정
+
+        # 로드된 데이터 기반으로 learning_phase 재계산 (선택 사항)
+        # 현재는 로드된 learning_phase를 그대로 사용합니다.
+        # self.update_learning_phase() # 필요하다면 이런 함수 호출
+
+    def save_learning_data(self, filepath):
+        """현재 학습 데이터를 지정된 파일에 저장합니다. 확장자가 .json이면 JSON, 그 외에는 바이너리 형식."""
+        data = self.export_learning_state()
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+            if filepath.endswith('.json'):
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+            else:
+                write_learning_file(filepath, data)
             print(f"학습 데이터를 '{filepath}'에 성공적으로 저장했습니다.")
             return True
         except Exception as e:
@@ -153,25 +895,16 @@ class PlayerLearningSystem:
             return False
 
     def load_learning_data(self, filepath):
-        """지정된 파일에서 학습 데이터를 불러옵니다. 성공 시 True, 실패 시 False 반환."""
+        """지정된 파일(바이너리 또는 JSON)에서 학습 데이터를 불러옵니다. 성공 시 True, 실패 시 False 반환."""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if is_learning_binary_file(filepath):
+                data = read_learning_file(filepath)
+            else:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             
             # 불러온 데이터로 객체 상태 업데이트
-            self.move_count = data.get('move_count', 0)
-            self.learning_phase = data.get('learning_phase', 0)
-            self.move_history = data.get('move_history', [])
-            self.corner_count = data.get('corner_count', 0)
-            self.power_pellet_timing = data.get('power_pellet_timing', [])
-            self.score_milestones = data.get('score_milestones', [])
-            # THRESHOLDS는 기본값을 유지하거나 로드된 값 사용 (여기서는 로드된 값 사용)
-            self.LEARNING_PHASE_THRESHOLDS = data.get('LEARNING_PHASE_THRESHOLDS', [0, 20, 50, 100, 200]) # 기본값은 기존값으로 설정
-
-            # 로드된 데이터 기반으로 learning_phase 재계산 (선택 사항)
-            # 현재는 로드된 learning_phase를 그대로 사용합니다.
-            # self.update_learning_phase() # 필요하다면 이런 함수 호출
-
+            self.import_learning_state(data)
             return True
         except FileNotFoundError:
             # 파일이 없는 것은 정상적인 경우이므로 오류 메시지 출력 안 함
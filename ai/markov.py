@@ -0,0 +1,128 @@
+import numpy as np
+from game.constants import *
+
+class MarkovPredictor:
+    """플레이어 이동에 대한 k차 마르코프 예측기.
+
+    상태는 (현재 타일, 최근 k개 이동 방향)이며, 방향 문맥은 4진수 정수 하나로 표현합니다.
+    counts[타일 인덱스, 문맥, 다음 방향]은 맵의 이동 가능 타일 수로 크기가 정해지는 밀집 배열이고,
+    이동이 기록될 때마다 해당 칸 하나만 증가합니다 (감쇠 가중치는 PlayerLearningSystem과 공유).
+    여러 칸 앞 예측은 상태 확률 분포를 numpy 연산으로 한 번에 전파해서 구합니다.
+    """
+    def __init__(self, map_manager, order=LEARNING_MARKOV_ORDER):
+        self.map_manager = map_manager
+        self.order = order
+        self.neighbor_table = map_manager.neighbor_table
+        self.valid_moves = self.neighbor_table >= 0
+        self.tile_count = len(map_manager.walkable_tiles)
+        self.direction_count = len(DIRECTIONS)
+        self.context_count = self.direction_count ** order
+        self.counts = np.zeros((self.tile_count, self.context_count, self.direction_count))
+        # next_context[문맥, 방향]: 방향 하나를 더한 뒤의 문맥 (가장 오래된 방향은 밀려남)
+        contexts = np.arange(self.context_count)[:, None]
+        directions = np.arange(self.direction_count)[None, :]
+        self.next_context = (contexts * self.direction_count + directions) % self.context_count
+        self.reset()
+
+    def reset(self):
+        """모든 카운트와 현재 상태를 지웁니다."""
+        self.counts.fill(0.0)
+        self.tile = -1
+        self.context = 0
+
+    def update(self, prev_pos, current_pos, weight, direction=-1):
+        """이동 하나를 (이전 타일, 문맥, 방향) 카운트에 반영하고 현재 상태를 옮깁니다.
+
+        인접하지 않은 이동(터널 순간이동 등)은 카운트하지 않고 direction으로 문맥만 갱신합니다.
+        """
+        prev_tile = self.map_manager.get_tile_index(prev_pos[0], prev_pos[1])
+        current_tile = self.map_manager.get_tile_index(current_pos[0], current_pos[1])
+        if prev_tile >= 0 and current_tile >= 0:
+            moves = np.flatnonzero(self.neighbor_table[prev_tile] == current_tile)
+            if len(moves):
+                direction = int(moves[0])
+                self.counts[prev_tile, self.context, direction] += weight
+        if direction >= 0:
+            self.context = int(self.next_context[self.context, direction])
+        self.tile = current_tile
+
+    def scale(self, factor):
+        """감쇠 가중치를 되돌릴 때 모든 카운트에 같은 배율을 곱합니다."""
+        self.counts *= factor
+
+    def transition_probs(self, tiles, contexts):
+        """상태 배열들의 다음 방향 확률 [상태 수, 4]를 반환합니다.
+
+        본 적 없는 문맥은 그 타일의 문맥 무관(0차) 통계로, 그것도 없으면 갈 수 있는 방향 균등 분포로 대신합니다.
+        """
+        rows = self.counts[tiles, contexts]
+        totals = rows.sum(axis=1)
+        missing = totals <= 0
+        if missing.any():
+            missing_tiles = tiles[missing]
+            fallback = self.counts[missing_tiles].sum(axis=1)
+            empty = fallback.sum(axis=1) <= 0
+            fallback[empty] = self.valid_moves[missing_tiles[empty]]
+            rows[missing] = fallback
+            totals = rows.sum(axis=1)
+        return rows / np.maximum(totals, 1e-12)[:, None]
+
+    def predict_ahead(self, steps, tile=None, context=None):
+        """steps번 이동한 뒤 플레이어가 있을 타일의 확률 분포(길이 = 이동 가능 타일 수)를 반환합니다.
+
+        tile, context를 생략하면 마지막으로 기록된 플레이어 상태에서 시작합니다.
+        상태 분포는 확률이 0이 아닌 상태만 들고 다니므로 비용은 도달 가능한 상태 수에 비례합니다.
+        """
+        tile = self.tile if tile is None else tile
+        context = self.context if context is None else context
+        if tile < 0:
+            return np.zeros(self.tile_count)
+        tiles = np.array([tile])
+        contexts = np.array([context])
+        probs = np.ones(1)
+        for _ in range(steps):
+            move_probs = self.transition_probs(tiles, contexts) * probs[:, None]
+            next_tiles = self.neighbor_table[tiles]
+            mask = (next_tiles >= 0) & (move_probs > 0)
+            if not mask.any():
+                break
+            states = next_tiles[mask].astype(np.int64) * self.context_count + self.next_context[contexts][mask]
+            # 같은 상태로 모이는 확률을 합침
+            support, inverse = np.unique(states, return_inverse=True)
+            probs = np.bincount(inverse, weights=move_probs[mask])
+            tiles, contexts = np.divmod(support, self.context_count)
+        return np.bincount(tiles, weights=probs, minlength=self.tile_count)
+
+    def most_likely_position(self, steps=1):
+        """steps번 이동한 뒤 가장 가능성이 높은 (x, y) 위치. 기록된 상태가 없으면 None."""
+        if self.tile < 0:
+            return None
+        distribution = self.predict_ahead(steps)
+        return self.map_manager.walkable_tiles[int(np.argmax(distribution))]
+
+    def export_stats(self, state=None):
+        """카운트(0이 아닌 칸만)와 현재 상태를 JSON으로 저장 가능한 형태로 변환합니다.
+
+        state로 (counts, tile, context)를 주면 현재 상태 대신 그 상태를 변환합니다.
+        """
+        counts, tile, context = state if state is not None else (self.counts, self.tile, self.context)
+        flat = counts.ravel()
+        index = np.flatnonzero(flat)
+        return {
+            'order': self.order,
+            'shape': list(counts.shape),
+            'tile': tile,
+            'context': context,
+            'index': index.tolist(),
+            'count': flat[index].tolist(),
+        }
+
+    def import_stats(self, stats):
+        """export_stats 형식의 통계를 복원합니다. 차수나 맵 크기가 다르면 False."""
+        if not stats or stats.get('order') != self.order or list(stats.get('shape', [])) != list(self.counts.shape):
+            return False
+        self.reset()
+        self.counts.flat[np.asarray(stats['index'], dtype=np.int64)] = stats['count']
+        self.tile = stats.get('tile', -1)
+        self.context = stats.get('context', 0)
+        return True
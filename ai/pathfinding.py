@@ -1,17 +1,28 @@
 import heapq
 import math
-from collections import defaultdict
+from collections import deque, OrderedDict
 
 class PathFinder:
-    def __init__(self, map_manager):
+    def __init__(self, map_manager, cache_max_size=1000):
         self.map_manager = map_manager
-        self.cache = {}  # 경로 캐시
-        self.cache_max_size = 1000
+        self.cache = OrderedDict()  # 경로 캐시 (LRU 순서: 오래 안 쓴 항목이 앞)
+        self.cache_max_size = cache_max_size
+        self.cache_map_version = map_manager.map_version
+        self.cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        # 틱마다 한 번 계산하는 고스트 거리 필드 (고스트 배치가 같으면 재사용)
+        self.ghost_field_key = None
+        self.ghost_field = []
+        # 같은 목표를 쫓는 고스트들이 함께 읽는 흐름 필드
+        self.flow_field = FlowField(map_manager)
     
     def heuristic(self, pos1, pos2):
         """휴리스틱 함수 - 맨하탄 거리"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
     
+    def maze_distance(self, pos1, pos2):
+        """미리 계산된 테이블에서 실제 미로 거리 조회 (도달 불가 시 -1)"""
+        return self.map_manager.get_maze_distance(pos1, pos2)
+    
     def get_neighbors(self, pos):
         """인접한 유효한 위치들 반환"""
         x, y = pos
@@ -19,72 +30,157 @@ class PathFinder:
         
         for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
             new_x, new_y = x + dx, y + dy
-            if self.map_manager.is_valid_position(new_x, new_y):
+            if self.map_manager.is_valid_move(new_x, new_y):
                 neighbors.append((new_x, new_y))
         
         return neighbors
     
+    def create_planner(self):
+        """같은 맵을 쓰는 고스트 전용 증분 경로 계획기 생성"""
+        return IncrementalPlanner(self.map_manager)
+    
+    def check_map_version(self):
+        """맵(벽 구조)이 바뀌었으면 캐시를 비웁니다."""
+        if self.cache_map_version != self.map_manager.map_version:
+            self.cache.clear()
+            self.cache_map_version = self.map_manager.map_version
+            self.cache_stats['invalidations'] += 1
+    
     def a_star(self, start, goal, avoid_positions=None):
-        """A* 알고리즘으로 최단 경로 찾기"""
-        if avoid_positions is None:
-            avoid_positions = set()
-            
-        # 캐시 확인
-        cache_key = (start, goal, tuple(sorted(avoid_positions)))
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        """A* 알고리즘으로 최단 경로 찾기 (start 포함 경로, 없으면 [])"""
+        self.check_map_version()
+        start, goal = tuple(start), tuple(goal)
+        
+        # 캐시 확인 - frozenset은 해시를 기억하므로 같은 집합을 넘기면 정렬/재해시 비용이 없음
+        if avoid_positions and not isinstance(avoid_positions, frozenset):
+            avoid_positions = frozenset(avoid_positions)
+        cache_key = (start, goal, avoid_positions or None)
+        cached_path = self.cache.get(cache_key)
+        if cached_path is not None:
+            self.cache.move_to_end(cache_key)
+            self.cache_stats['hits'] += 1
+            return list(cached_path)
+        self.cache_stats['misses'] += 1
         
+        path = self.search(start, goal, avoid_positions or frozenset())
+        self.cache[cache_key] = tuple(path)
+        if len(self.cache) > self.cache_max_size:
+            self.cache.popitem(last=False)
+            self.cache_stats['evictions'] += 1
+        return path
+    
+    def search(self, start, goal, avoid_positions):
+        """캐시를 거치지 않는 실제 경로 탐색"""
         if start == goal:
             return [start]
         
-        open_set = []
-        heapq.heappush(open_set, (0, start))
+        # 피해야 할 위치가 없으면 다음 칸 테이블만 따라가면 최단 경로
+        if not avoid_positions:
+            table_path = self.map_manager.get_table_path(start, goal)
+            return [start] + table_path if table_path else []
         
-        came_from = {}
-        g_score = defaultdict(lambda: float('inf'))
-        g_score[start] = 0
+        # 피해야 할 위치가 있으면 교차로 그래프 위에서 탐색
+        return self.find_junction_path(start, goal, avoid_positions)
+    
+    def find_junction_path(self, start, goal, avoid_positions=frozenset()):
+        """교차로 그래프(복도 압축) 위의 A*로 최단 경로 찾기 (start 포함 경로, 없으면 [])
+        
+        start와 goal은 속한 복도의 양 끝 교차로에 연결(snap)하고, 피해야 할 타일이 있는
+        복도 구간은 지나가지 않습니다. 타일 단위 대신 교차로 단위로 확장하므로 탐색이 훨씬 작습니다.
+        """
+        map_manager = self.map_manager
+        start, goal = tuple(start), tuple(goal)
+        start_index = map_manager.get_tile_index(*start)
+        goal_index = map_manager.get_tile_index(*goal)
+        if start_index < 0 or goal_index < 0 or map_manager.distance_table[start_index, goal_index] < 0:
+            return []
+        if start_index == goal_index:
+            return [start]
+        avoid = {map_manager.get_tile_index(x, y) for x, y in avoid_positions}
+        if goal_index in avoid:
+            return []
+        avoid.discard(start_index)
         
-        f_score = defaultdict(lambda: float('inf'))
-        f_score[start] = self.heuristic(start, goal)
+        corridors = map_manager.corridors
+        walkable_tiles = map_manager.walkable_tiles
+        # 피해야 할 타일이 내부에 있는 복도는 통째로 막힘
+        blocked_corridors = {map_manager.corridor_of_tile[i][0] for i in avoid if i in map_manager.corridor_of_tile}
         
-        visited = set()
+        best_cost = math.inf
+        best_route = None  # (마지막 교차로 또는 None, 교차로 이후 타일 리스트)
+        
+        # start와 goal이 같은 복도 안에 있으면 복도를 따라 바로 가는 경로
+        start_corridor = map_manager.corridor_of_tile.get(start_index)
+        goal_corridor = map_manager.corridor_of_tile.get(goal_index)
+        if start_corridor and goal_corridor and start_corridor[0] == goal_corridor[0]:
+            tiles = corridors[start_corridor[0]][2]
+            k1, k2 = start_corridor[1], goal_corridor[1]
+            segment = tiles[k1 + 1:k2 + 1] if k2 > k1 else tiles[k1 - 1:k2 - 1 if k2 > 0 else None:-1]
+            if not avoid.intersection(segment):
+                best_cost = len(segment)
+                best_route = (None, segment)
+        
+        # goal 쪽 연결 구간: 교차로 -> goal 방향 타일 리스트
+        goal_entries = {}
+        for node, segment in map_manager.snap_to_junctions(goal_index):
+            inward = segment[-2::-1] + [goal_index] if segment else []
+            if not avoid.intersection(inward[:-1]) and (node not in avoid or not segment):
+                goal_entries[node] = inward
+        
+        distance_row = map_manager.distance_table[:, goal_index].tolist()
+        g_score = {}
+        came_from = {}
+        open_set = []
+        for node, segment in map_manager.snap_to_junctions(start_index):
+            if avoid.intersection(segment):
+                continue
+            cost = len(segment)
+            if cost < g_score.get(node, math.inf):
+                g_score[node] = cost
+                came_from[node] = (None, segment)
+                heapq.heappush(open_set, (cost + distance_row[node], cost, node))
         
+        closed = set()
         while open_set:
-            current = heapq.heappop(open_set)[1]
-            
-            if current in visited:
+            f, cost, node = heapq.heappop(open_set)
+            if f >= best_cost:
+                break
+            if node in closed:
                 continue
-                
-            visited.add(current)
+            closed.add(node)
             
-            if current == goal:
-                # 경로 재구성
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start)
-                path.reverse()
-                
-                # 캐시에 저장
-                if len(self.cache) < self.cache_max_size:
-                    self.cache[cache_key] = path
-                
-                return path
+            if node in goal_entries and cost + len(goal_entries[node]) < best_cost:
+                best_cost = cost + len(goal_entries[node])
+                best_route = (node, goal_entries[node])
             
-            for neighbor in self.get_neighbors(current):
-                if neighbor in visited or neighbor in avoid_positions:
+            for neighbor, length, cid, forward in map_manager.junction_edges[node]:
+                if cid in blocked_corridors or neighbor in avoid or neighbor in closed:
                     continue
-                
-                tentative_g_score = g_score[current] + 1
-                
-                if tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = g_score[neighbor] + self.heuristic(neighbor, goal)
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
+                tentative = cost + length
+                if tentative < g_score.get(neighbor, math.inf):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = (node, cid, forward)
+                    heapq.heappush(open_set, (tentative + distance_row[neighbor], tentative, neighbor))
         
-        return []  # 경로를 찾을 수 없음
+        if best_route is None:
+            return []  # 경로를 찾을 수 없음
+        
+        # 경로 재구성: 교차로를 거슬러 올라가며 복도 타일을 펼침
+        node, tail = best_route
+        pieces = [tail]
+        while node is not None:
+            entry = came_from[node]
+            if entry[0] is None:
+                pieces.append(entry[1])
+                break
+            prev, cid, forward = entry
+            a, b, tiles = corridors[cid]
+            pieces.append((tiles + [b]) if forward else (tiles[::-1] + [a]))
+            node = prev
+        path = [start]
+        for piece in reversed(pieces):
+            path.extend(walkable_tiles[i] for i in piece)
+        return path
     
     def find_path_avoiding_ghosts(self, start, goal, ghost_positions, safety_radius=2):
         """고스트를 피해서 경로 찾기"""
@@ -96,74 +192,185 @@ class PathFinder:
             for dx in range(-safety_radius, safety_radius + 1):
                 for dy in range(-safety_radius, safety_radius + 1):
                     avoid_x, avoid_y = gx + dx, gy + dy
-                    if self.map_manager.is_valid_position(avoid_x, avoid_y):
+                    if self.map_manager.is_valid_move(avoid_x, avoid_y):
                         avoid_positions.add((avoid_x, avoid_y))
         
-        return self.a_star(start, goal, avoid_positions)
+        return self.a_star(start, goal, frozenset(avoid_positions))
+    
+    def get_ghost_distance_field(self, ghost_positions):
+        """모든 고스트를 시작점으로 한 다중 출발 BFS로 타일별 가장 가까운 고스트까지의 미로 거리를 구합니다.
+
+        타일 인덱스 순서의 리스트를 반환하며 도달 불가 타일은 -1입니다.
+        같은 고스트 배치에 대해서는 (한 틱 안에서) 다시 계산하지 않습니다.
+        """
+        key = (self.map_manager.map_version, tuple(tuple(pos) for pos in ghost_positions))
+        if self.ghost_field_key == key:
+            return self.ghost_field
+        
+        adjacency = self.map_manager.adjacency
+        field = [-1] * len(adjacency)
+        queue = deque()
+        for ghost_pos in ghost_positions:
+            index = self.map_manager.get_tile_index(*ghost_pos)
+            if index >= 0 and field[index] < 0:
+                field[index] = 0
+                queue.append(index)
+        while queue:
+            current = queue.popleft()
+            next_distance = field[current] + 1
+            for neighbor in adjacency[current]:
+                if field[neighbor] < 0:
+                    field[neighbor] = next_distance
+                    queue.append(neighbor)
+        
+        self.ghost_field_key = key
+        self.ghost_field = field
+        return field
     
     def find_escape_route(self, player_pos, ghost_positions, max_distance=10):
-        """고스트들로부터 가장 멀리 도망갈 수 있는 경로 찾기"""
-        best_pos = player_pos
+        """고스트들로부터 가장 멀리 도망갈 수 있는 경로 찾기 (player_pos 포함 경로)
+        
+        플레이어에서 시작한 BFS 한 번으로 max_distance 미만 거리의 타일 중 가장 가까운 고스트와의
+        미로 거리가 가장 먼 타일을 고르고, 경로는 BFS 부모 포인터에서 바로 복원합니다.
+        고스트가 플레이어보다 먼저 도착하는 타일은 지나가지 않습니다.
+        """
+        player_pos = tuple(player_pos)
+        start_index = self.map_manager.get_tile_index(*player_pos)
+        if start_index < 0 or not ghost_positions:
+            return [player_pos]
+        ghost_field = self.get_ghost_distance_field(ghost_positions)
+        adjacency = self.map_manager.adjacency
+        
+        best_index = start_index
         max_min_distance = 0
         
-        # BFS로 일정 거리 내의 모든 위치 탐색
-        queue = [(player_pos, 0)]
-        visited = {player_pos}
+        parents = {start_index: None}
+        queue = deque([(start_index, 0)])
         
         while queue:
-            current_pos, distance = queue.pop(0)
+            current, distance = queue.popleft()
             
             if distance >= max_distance:
                 continue
             
-            # 현재 위치에서 모든 고스트까지의 최소 거리 계산
-            min_ghost_distance = min(
-                self.heuristic(current_pos, ghost_pos) 
-                for ghost_pos in ghost_positions
-            )
+            # 도달할 수 없는 고스트만 있으면 필드 값은 -1 → 충분히 먼 것으로 취급
+            min_ghost_distance = ghost_field[current]
+            if min_ghost_distance < 0:
+                min_ghost_distance = len(adjacency)
             
             if min_ghost_distance > max_min_distance:
                 max_min_distance = min_ghost_distance
-                best_pos = current_pos
+                best_index = current
             
-            # 인접 위치들을 큐에 추가
-            for neighbor in self.get_neighbors(current_pos):
-                if neighbor not in visited:
-                    visited.add(neighbor)
+            # 고스트보다 먼저 도착할 수 있는 인접 타일만 큐에 추가
+            for neighbor in adjacency[current]:
+                if neighbor not in parents and (ghost_field[neighbor] < 0 or ghost_field[neighbor] > distance + 1):
+                    parents[neighbor] = current
                     queue.append((neighbor, distance + 1))
         
-        return self.a_star(player_pos, best_pos)
+        walkable_tiles = self.map_manager.walkable_tiles
+        path = []
+        index = best_index
+        while index is not None:
+            path.append(walkable_tiles[index])
+            index = parents[index]
+        path.reverse()
+        return path
     
-    def find_pellet_path(self, start, pellet_positions, ghost_positions):
-        """가장 안전한 펠릿으로의 경로 찾기"""
-        best_pellet = None
+    def find_pellet_path(self, start, pellet_positions=None, ghost_positions=(), max_distance=None):
+        """가장 안전한 펠릿으로의 경로 찾기 (start 포함 경로, 없으면 [])
+        
+        pellet_positions를 생략하면 MapManager의 펠릿 인덱스를 사용합니다.
+        start에서 BFS 한 번으로 펠릿들을 가까운 순서로 만나며 점수를 매기고,
+        남은 어떤 펠릿도 현재 최고 점수를 넘을 수 없는 거리에 이르면 탐색을 멈춥니다.
+        """
+        start = tuple(start)
+        start_index = self.map_manager.get_tile_index(*start)
+        if start_index < 0:
+            return []
+        if pellet_positions is None:
+            pellet_positions = self.map_manager.pellet_positions
+            # 반경 안에 펠릿이 하나도 없으면 칸 단위 BFS 없이 비트보드 확산 몇 번으로 바로 포기
+            if max_distance is not None and self.nearest_pellet_distance(start, max_distance) < 0:
+                return []
+        elif not isinstance(pellet_positions, (set, frozenset)):
+            pellet_positions = {tuple(pos) for pos in pellet_positions}
+        if not pellet_positions:
+            return []
+        
+        # 고스트들로부터의 안전도 = 가장 가까운 고스트까지의 미로 거리 (고스트가 없거나 닿지 않으면 10)
+        no_ghost_distance = 10
+        ghost_field = self.get_ghost_distance_field(ghost_positions) if ghost_positions else None
+        max_safety = max(max(ghost_field), no_ghost_distance) if ghost_field else no_ghost_distance
+        
+        adjacency = self.map_manager.adjacency
+        walkable_tiles = self.map_manager.walkable_tiles
+        best_index = None
         best_score = float('-inf')
         
-        for pellet_pos in pellet_positions:
-            # 펠릿까지의 거리
-            distance_to_pellet = self.heuristic(start, pellet_pos)
+        parents = {start_index: None}
+        queue = deque([(start_index, 0)])
+        
+        while queue:
+            current, distance_to_pellet = queue.popleft()
             
-            # 고스트들로부터의 안전도
-            min_ghost_distance = min(
-                self.heuristic(pellet_pos, ghost_pos) 
-                for ghost_pos in ghost_positions
-            ) if ghost_positions else 10
+            # 이 거리 이상에서는 가장 안전한 펠릿이라도 최고 점수를 넘을 수 없음
+            if max_safety - distance_to_pellet * 0.5 <= best_score:
+                break
             
-            # 점수 계산 (가깝고 안전한 펠릿이 높은 점수)
-            score = min_ghost_distance - distance_to_pellet * 0.5
+            if walkable_tiles[current] in pellet_positions:
+                min_ghost_distance = ghost_field[current] if ghost_field else no_ghost_distance
+                if min_ghost_distance < 0:
+                    min_ghost_distance = no_ghost_distance
+                
+                # 점수 계산 (가깝고 안전한 펠릿이 높은 점수)
+                score = min_ghost_distance - distance_to_pellet * 0.5
+                
+                if score > best_score:
+                    best_score = score
+                    best_index = current
             
-            if score > best_score:
-                best_score = score
-                best_pellet = pellet_pos
+            if max_distance is not None and distance_to_pellet >= max_distance:
+                continue
+            for neighbor in adjacency[current]:
+                if neighbor not in parents:
+                    parents[neighbor] = current
+                    queue.append((neighbor, distance_to_pellet + 1))
         
-        if best_pellet:
-            return self.a_star(start, best_pellet)
-        return []
+        if best_index is None:
+            return []
+        path = []
+        index = best_index
+        while index is not None:
+            path.append(walkable_tiles[index])
+            index = parents[index]
+        path.reverse()
+        return path
+    
+    def nearest_pellet_distance(self, start, max_distance=None):
+        """start에서 가장 가까운 남은 펠릿(파워 펠릿 포함)까지의 미로 거리 (max_distance 안에 없으면 -1).
+
+        맵의 펠릿 비트보드에서 한 겹씩 퍼져 나가는 비트보드 BFS를 사용합니다.
+        """
+        map_manager = self.map_manager
+        bitboards = map_manager.bitboards
+        if not map_manager.is_valid_move(*start):
+            return -1
+        return bitboards.distance(bitboards.bit(*start), map_manager.pellet_bits | map_manager.power_pellet_bits, max_distance)
     
     def clear_cache(self):
         """경로 캐시 초기화"""
         self.cache.clear()
     
+    def get_cache_stats(self):
+        """모니터링용 캐시 통계 (적중/실패/축출/무효화 횟수, 크기, 적중률)"""
+        stats = dict(self.cache_stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['size'] = len(self.cache)
+        stats['capacity'] = self.cache_max_size
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+    
     def get_direction_to_next_position(self, current_pos, next_pos):
         """현재 위치에서 다음 위치로의 방향 반환"""
         if not next_pos:
@@ -183,40 +390,229 @@ class PathFinder:
         
         return None
 
-def a_star(start, goal, game_map):
-    # A* 알고리즘 구현
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-    came_from = {}
-    g_score = {start: 0}
-    while open_set:
-        _, current = heapq.heappop(open_set)
-        if current == goal:
-            # 경로 복원
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            path.reverse()
-            return path
-        for neighbor in get_neighbors(current, game_map):
-            tentative_g = g_score[current] + 1
-            if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g
-                f_score = tentative_g + heuristic(neighbor, goal)
-                heapq.heappush(open_set, (f_score, neighbor))
-    return []
+class FlowField:
+    """하나의 목표 타일을 향한 맵 전체의 다음 칸 필드 (목표에서 시작한 역방향 BFS 결과)"""
+    def __init__(self, map_manager):
+        self.map_manager = map_manager
+        self.target = None
+        self.map_version = None
+        self.next_hops = []
+        self.distances = []
+    
+    def set_target(self, target):
+        """목표 타일(또는 맵)이 바뀐 경우에만 필드를 다시 계산합니다. 다시 계산했으면 True 반환"""
+        if target == self.target and self.map_version == self.map_manager.map_version:
+            return False
+        self.target = target
+        self.map_version = self.map_manager.map_version
+        target_index = self.map_manager.get_tile_index(*target)
+        if target_index < 0:
+            self.next_hops = []
+            self.distances = []
+            return True
+        # 목표에서의 역방향 BFS 결과는 다음 칸/거리 테이블의 한 열과 같습니다.
+        # 고스트들이 여러 번 읽으므로 파이썬 리스트로 한 번만 꺼내 둡니다.
+        self.next_hops = self.map_manager.next_hop_table[:, target_index].tolist()
+        self.distances = self.map_manager.distance_table[:, target_index].tolist()
+        return True
+    
+    def get_distance(self, pos):
+        """pos에서 목표까지의 미로 거리 (도달 불가 시 -1)"""
+        index = self.map_manager.get_tile_index(*pos)
+        if index < 0 or not self.distances:
+            return -1
+        return self.distances[index]
+    
+    def get_path(self, pos):
+        """pos(제외)에서 목표(포함)까지 필드를 따라가는 경로. 도달 불가 시 []"""
+        index = self.map_manager.get_tile_index(*pos)
+        if index < 0 or not self.distances or self.distances[index] <= 0:
+            return []
+        walkable_tiles = self.map_manager.walkable_tiles
+        next_hops = self.next_hops
+        path = []
+        for _ in range(self.distances[index]):
+            index = next_hops[index]
+            path.append(walkable_tiles[index])
+        return path
+
+class IncrementalPlanner:
+    """D* Lite 기반 증분 경로 계획기 - 고스트마다 하나씩 두고 탐색 상태를 재사용합니다.
+
+    탐색은 목표에서 시작 위치 방향으로 진행되므로, 시작 위치(고스트)가 움직이거나
+    막힌 타일 집합이 바뀌어도 바뀐 부분만 복구합니다. 목표가 바뀌면 새로 탐색합니다.
+    """
+    def __init__(self, map_manager):
+        self.map_manager = map_manager
+        self.goal = None
+        self.map_version = None
+        self.start = None
+        self.last_start = None
+        self.blocked = set()
+        self.km = 0
+        self.g = {}
+        self.rhs = {}
+        self.open_set = []
+        self.open_keys = {}
+        self.h_row = []
+        # 탐색 상태를 저장된 상태(capture_state)와 공유 중이면 True - 바꾸기 전에 복사 (copy-on-write)
+        self.shared = False
+        self.stats = {'searches': 0, 'repairs': 0, 'expansions': 0}
+    
+    def cost(self, u, v):
+        """인접한 두 타일 사이의 이동 비용 (막힌 타일이면 무한대)"""
+        if u in self.blocked or v in self.blocked:
+            return math.inf
+        return 1
+    
+    def calculate_key(self, s):
+        g_rhs = min(self.g.get(s, math.inf), self.rhs.get(s, math.inf))
+        return (g_rhs + self.h_row[s] + self.km, g_rhs)
+    
+    def update_vertex(self, u):
+        adjacency = self.map_manager.adjacency
+        if u != self.goal:
+            best = math.inf
+            for s in adjacency[u]:
+                value = self.cost(u, s) + self.g.get(s, math.inf)
+                if value < best:
+                    best = value
+            self.rhs[u] = best
+        if self.g.get(u, math.inf) != self.rhs.get(u, math.inf):
+            key = self.calculate_key(u)
+            self.open_keys[u] = key
+            heapq.heappush(self.open_set, (key, u))
+        else:
+            self.open_keys.pop(u, None)
+    
+    def top_key(self):
+        """open 집합의 최소 키 (오래된 항목은 버림)"""
+        while self.open_set:
+            key, u = self.open_set[0]
+            if self.open_keys.get(u) == key:
+                return key
+            heapq.heappop(self.open_set)
+        return (math.inf, math.inf)
+    
+    def compute_shortest_path(self):
+        adjacency = self.map_manager.adjacency
+        start = self.start
+        while (self.top_key() < self.calculate_key(start)
+               or self.rhs.get(start, math.inf) != self.g.get(start, math.inf)):
+            if not self.open_set:
+                break
+            k_old, u = heapq.heappop(self.open_set)
+            del self.open_keys[u]
+            self.stats['expansions'] += 1
+            k_new = self.calculate_key(u)
+            if k_old < k_new:
+                self.open_keys[u] = k_new
+                heapq.heappush(self.open_set, (k_new, u))
+            elif self.g.get(u, math.inf) > self.rhs.get(u, math.inf):
+                self.g[u] = self.rhs[u]
+                for s in adjacency[u]:
+                    self.update_vertex(s)
+            else:
+                self.g[u] = math.inf
+                self.update_vertex(u)
+                for s in adjacency[u]:
+                    self.update_vertex(s)
+    
+    def set_h_row(self, start):
+        # 시작 위치 기준 휴리스틱 = 장애물 없는 미로 거리 (도달 불가 타일은 무한대)
+        self.h_row = [d if d >= 0 else math.inf for d in self.map_manager.distance_table[start].tolist()]
+    
+    def reset(self, start, goal, blocked):
+        """새 목표로 탐색 상태를 초기화합니다."""
+        self.goal = goal
+        self.map_version = self.map_manager.map_version
+        self.start = start
+        self.last_start = start
+        self.blocked = blocked
+        self.km = 0
+        self.g = {}
+        self.rhs = {goal: 0}
+        self.open_set = []
+        self.open_keys = {}
+        self.set_h_row(start)
+        key = self.calculate_key(goal)
+        self.open_keys[goal] = key
+        heapq.heappush(self.open_set, (key, goal))
+        self.stats['searches'] += 1
+    
+    def plan(self, start, goal, blocked_positions=()):
+        """start(제외)에서 goal(포함)까지의 경로를 반환합니다. 없으면 []"""
+        map_manager = self.map_manager
+        start_index = map_manager.get_tile_index(*start)
+        goal_index = map_manager.get_tile_index(*goal)
+        if start_index < 0 or goal_index < 0 or start_index == goal_index:
+            return []
+        blocked = {map_manager.get_tile_index(x, y) for x, y in blocked_positions}
+        blocked.discard(-1)
+        blocked.discard(start_index)
+        blocked.discard(goal_index)
+        if self.shared:
+            self.g = dict(self.g)
+            self.rhs = dict(self.rhs)
+            self.open_set = list(self.open_set)
+            self.open_keys = dict(self.open_keys)
+            self.shared = False
+        
+        if (goal_index != self.goal or self.map_version != map_manager.map_version
+                or self.h_row[start_index] == math.inf):
+            self.reset(start_index, goal_index, blocked)
+        else:
+            if start_index != self.start:
+                # 시작 위치가 움직인 만큼 km을 늘려 기존 open 키를 그대로 재사용
+                self.km += self.h_row[start_index]
+                self.start = start_index
+                self.last_start = start_index
+                self.set_h_row(start_index)
+            changed = blocked ^ self.blocked
+            if changed:
+                # 막힘 상태가 바뀐 타일과 그 이웃만 갱신
+                self.blocked = blocked
+                adjacency = map_manager.adjacency
+                for v in changed:
+                    self.update_vertex(v)
+                    for u in adjacency[v]:
+                        self.update_vertex(u)
+                self.stats['repairs'] += 1
+        self.compute_shortest_path()
+        return self.extract_path()
+    
+    def capture_state(self):
+        """탐색 상태를 반환합니다 (경로의 동점 선택이 탐색 이력에 의존하므로 재현에 필요).
+
+        복사하지 않고 공유한 뒤 다음 plan()에서 바꾸기 전에 복사합니다 (copy-on-write).
+        blocked와 h_row는 바꿔 끼우기만 하므로 항상 공유해도 됩니다.
+        """
+        self.shared = True
+        return (self.goal, self.map_version, self.start, self.last_start, self.blocked, self.km,
+                self.g, self.rhs, self.open_set, self.open_keys, self.h_row)
 
-def get_neighbors(pos, game_map):
-    x, y = pos
-    neighbors = []
-    for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
-        nx, ny = x+dx, y+dy
-        if 0 <= ny < len(game_map) and 0 <= nx < len(game_map[0]) and game_map[ny][nx] != 1:
-            neighbors.append((nx, ny))
-    return neighbors
+    def restore_state(self, state):
+        """capture_state로 저장한 탐색 상태로 되돌립니다."""
+        (self.goal, self.map_version, self.start, self.last_start, self.blocked, self.km,
+         self.g, self.rhs, self.open_set, self.open_keys, self.h_row) = state
+        self.shared = True
 
-def heuristic(a, b):
-    # 맨해튼 거리
-    return abs(a[0]-b[0]) + abs(a[1]-b[1])
\ No newline at end of file
+    def extract_path(self):
+        """g 값을 따라 시작 위치에서 목표까지 내려가며 경로를 만듭니다."""
+        if self.g.get(self.start, math.inf) == math.inf:
+            return []
+        adjacency = self.map_manager.adjacency
+        walkable_tiles = self.map_manager.walkable_tiles
+        path = []
+        current = self.start
+        while current != self.goal and len(path) < len(walkable_tiles):
+            best, best_value = None, math.inf
+            for s in adjacency[current]:
+                value = self.cost(current, s) + self.g.get(s, math.inf)
+                if value < best_value:
+                    best, best_value = s, value
+            if best is None:
+                return []
+            current = best
+            path.append(walkable_tiles[current])
+        return path
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from game.constants import *
+from ai.learning import PlayerLearningSystem, LearningPersistenceWorker
+
+class LearningProfileStore:
+    """플레이어 id별 학습 프로필(PlayerLearningSystem) 저장소.
+
+    메모리에는 최근에 사용한 max_resident개 프로필만 두고(LRU), 처음 접근할 때 파일에서 불러옵니다.
+    밀려나는 프로필은 바뀐 내용이 있을 때만 스냅샷으로 기록(write-back)합니다.
+    모든 프로필은 저장 작업 스레드 하나를 공유하므로 프로필 수와 관계없이 스레드는 하나입니다.
+    """
+    def __init__(self, profile_dir=LEARNING_PROFILE_DIR, max_resident=LEARNING_PROFILE_CACHE_SIZE, map_manager=None):
+        self.profile_dir = profile_dir
+        self.max_resident = max_resident
+        self.map_manager = map_manager
+        os.makedirs(profile_dir, exist_ok=True)
+        self.persistence = LearningPersistenceWorker()
+        # player_id -> [프로필, 불러올 때의 journal_seq] (앞쪽이 가장 오래전에 사용)
+        self.profiles = OrderedDict()
+        self.stats = {'hits': 0, 'loads': 0, 'evictions': 0, 'write_backs': 0}
+
+    def profile_path(self, player_id):
+        """프로필 스냅샷 파일 경로. 파일 이름에 쓸 수 없는 문자가 있는 id는 해시로 바꿉니다."""
+        name = str(player_id)
+        if not re.fullmatch(r'[A-Za-z0-9_-]{1,64}', name):
+            name = hashlib.sha1(name.encode('utf-8')).hexdigest()
+        return os.path.join(self.profile_dir, name + '.bin')
+
+    def get(self, player_id):
+        """플레이어의 학습 프로필을 반환합니다. 메모리에 없으면 불러오고, 넘치면 가장 오래된 프로필을 내보냅니다."""
+        entry = self.profiles.get(player_id)
+        if entry is not None:
+            self.profiles.move_to_end(player_id)
+            self.stats['hits'] += 1
+            return entry[0]
+
+        profile = PlayerLearningSystem(self.map_manager, data_file=self.profile_path(player_id),
+                                       legacy_file=None, persistence_worker=self.persistence)
+        self.profiles[player_id] = [profile, profile.journal_seq]
+        self.stats['loads'] += 1
+        while len(self.profiles) > self.max_resident:
+            self.evict(next(iter(self.profiles)))
+        return profile
+
+    def evict(self, player_id):
+        """프로필을 메모리에서 내보냅니다. 불러온 뒤 바뀌었으면 스냅샷 저장을 예약합니다.
+
+        버퍼에 남은 저널 레코드는 프로필과 함께 사라지지 않도록 큐에 자리가 날 때까지 기다려 넘기고,
+        스냅샷은 기다리지 않고 예약합니다 (큐가 가득 차 예약하지 못해도 저널로 복구되며 write_backs에는 세지 않음).
+        """
+        entry = self.profiles.pop(player_id, None)
+        if entry is None:
+            return
+        profile, loaded_seq = entry
+        profile.flush_journal(block=True)
+        if profile.journal_seq != loaded_seq and profile.save_snapshot():
+            self.stats['write_backs'] += 1
+        self.stats['evictions'] += 1
+
+    def close(self):
+        """모든 프로필을 기록하고 저장 작업이 끝날 때까지 기다린 뒤 작업 스레드를 종료합니다."""
+        for player_id in list(self.profiles):
+            self.evict(player_id)
+        self.persistence.stop()
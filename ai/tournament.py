@@ -0,0 +1,264 @@
+"""고스트 전략 토너먼트: 여러 고스트 구성을 스크립트/재생 플레이어와 헤드리스로 대전시켜 비교합니다.
+
+사용법:
+    python -m ai.tournament [--team aggressive,ambush,cooperative,predictive ...] [--speed 0.25 0.3]
+                            [--frightened 0.5] [--radius 8] [--player greedy random --replay 세션파일_또는_디렉터리]
+                            [--games 20] [--workers N] [--pretrained learning_pretrained.bin]
+
+구성(팀 x 속도 x 겁먹은 속도 배율 x 예측 반경)마다 플레이어 종류별로 games판씩 프로세스 풀에서 실행하고,
+점수/생존 시간의 평균과 95% 신뢰구간, 플레이어가 잡힌(목숨을 모두 잃은) 비율의 Wilson 95% 구간을 출력합니다.
+게임 자체는 결정적이므로 판마다 달라지는 것은 시드뿐입니다: 무작위/그리디 플레이어는 시드로 움직임이 달라지고,
+시드와 무관한 재생 플레이어는 구성마다 한 판만 실행하며 구간을 내지 않습니다.
+예측 고스트가 학습 예측을 쓰도록 판마다 임시 디렉터리의 새 학습 데이터로 시작합니다 (--pretrained로 시작점 지정).
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import math
+import os
+import random
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from game.constants import *
+from game.game_engine import GameEngine
+from game.map_manager import MapManager
+from ai.pathfinding import PathFinder
+from ai.ghost_types import DEFAULT_GHOST_SPEC
+from ai.learning import PlayerLearningSystem
+from ai.training import find_session_files, load_session_moves
+
+# 95% 신뢰구간의 z 값
+CONFIDENCE_Z = 1.96
+
+class RandomTurnPlayer:
+    """갈림길마다 무작위로 방향을 고르는 플레이어 (시드 고정)."""
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.last_pos = None
+
+    def __call__(self, engine):
+        player = engine.player
+        pos = player.get_pos()
+        if pos == self.last_pos:
+            return None
+        self.last_pos = pos
+        choices = [name for name, (dx, dy) in DIRECTIONS.items() if engine.map_manager.is_valid_move(pos[0] + dx, pos[1] + dy)]
+        # 갈림길이 아니고 지금 방향으로 계속 갈 수 있으면 그대로 진행
+        if player.direction in choices and len(choices) <= 2:
+            return None
+        return self.rng.choice(choices) if choices else None
+
+class GreedyPelletPlayer:
+    """고스트에서 먼 가까운 펠릿으로 향하는 플레이어 (PathFinder.find_pellet_path 사용).
+
+    시드를 주면 처음 1~TOURNAMENT_OPENING_TILES칸(시드로 정함)은 RandomTurnPlayer로 움직여 판마다 다른 국면에서
+    그리디를 시작합니다. 시드가 None이면 처음부터 그리디(항상 같은 게임).
+    """
+    def __init__(self, seed=None):
+        self.pathfinder = None
+        self.last_pos = None
+        self.opening = RandomTurnPlayer(seed) if seed is not None else None
+        self.opening_tiles = self.opening.rng.randint(1, TOURNAMENT_OPENING_TILES) if self.opening else 0
+
+    def __call__(self, engine):
+        player = engine.player
+        if self.opening_tiles > 0:
+            if player.get_pos() != self.opening.last_pos:
+                self.opening_tiles -= 1
+            return self.opening(engine)
+        pos = player.get_pos()
+        if pos == self.last_pos:
+            return None
+        self.last_pos = pos
+        if self.pathfinder is None:
+            self.pathfinder = PathFinder(engine.map_manager)
+        path = self.pathfinder.find_pellet_path(pos, ghost_positions=[g.get_pos() for g in engine.ghosts.ghosts])
+        if len(path) < 2:
+            return None
+        step = (path[1][0] - pos[0], path[1][1] - pos[1])
+        for name, delta in DIRECTIONS.items():
+            if delta == step:
+                return name
+        return None
+
+class SessionReplayPolicy:
+    """세션 파일에 기록된 이동 방향을 순서대로 다시 입력하는 플레이어 정책. 기록이 끝나면 마지막 방향을 유지합니다.
+
+    리플레이 파일을 재생하는 game.replay_player.ReplayPlayer와는 다릅니다 (게임이 아니라 입력만 다시 넣음).
+    """
+    def __init__(self, directions):
+        self.directions = directions
+        self.index = 0
+        self.last_pos = None
+
+    def __call__(self, engine):
+        pos = engine.player.get_pos()
+        if pos == self.last_pos or self.index >= len(self.directions):
+            return None
+        self.last_pos = pos
+        direction = self.directions[self.index]
+        self.index += 1
+        return direction
+
+def load_replay_directions(path):
+    """세션 파일의 이동 기록에서 방향 목록을 읽습니다."""
+    return [move['move_data'].get('direction') for move in load_session_moves(path)
+            if move['move_data'].get('direction') in DIRECTIONS]
+
+def create_player(player_spec, seed):
+    """플레이어 명세({'type': 'random' | 'greedy' | 'replay', 'file': 세션 파일})로 정책 함수를 만듭니다."""
+    kind = player_spec['type']
+    if kind == 'random':
+        return RandomTurnPlayer(seed)
+    if kind == 'greedy':
+        return GreedyPelletPlayer(seed)
+    if kind == 'replay':
+        return SessionReplayPolicy(load_replay_directions(player_spec['file']))
+    raise ValueError(f"알 수 없는 플레이어 종류: {kind}")
+
+def player_label(player_spec):
+    if player_spec['type'] == 'replay':
+        return f"replay:{player_spec['file']}"
+    return player_spec['type']
+
+def play_game(task):
+    """한 판을 헤드리스로 실행하고 결과 딕셔너리를 반환합니다 (작업 프로세스에서 실행).
+
+    task = (구성 인덱스, 고스트 구성, 플레이어 명세, 시드, 최대 틱 수, 사전 학습 모델 경로 또는 None)
+    게임마다 임시 디렉터리의 새 학습 데이터(사전 학습 모델이 있으면 그것, 없으면 기본 학습 데이터)로 시작해
+    예측 고스트가 그 판에서 학습한 예측을 사용합니다.
+    """
+    config_index, ghost_spec, player_spec, seed, max_steps, pretrained_file = task
+    learning_system = None
+    # 게임 로그(고스트 잡힘 등)는 판마다 여러 줄이 나오므로 숨김
+    with contextlib.redirect_stdout(io.StringIO()):
+        temp_dir = tempfile.mkdtemp(prefix='tournament_')
+        try:
+            learning_system = PlayerLearningSystem(MapManager(), data_file=os.path.join(temp_dir, LEARNING_DATA_FILE),
+                                                   legacy_file=None, pretrained_file=pretrained_file)
+            engine = GameEngine(headless=True, learning_system=learning_system, ghost_spec=ghost_spec)
+            engine.run_headless(max_steps, create_player(player_spec, seed))
+            result = {
+                'config': config_index,
+                'player': player_label(player_spec),
+                'score': engine.player.score,
+                'survival_time': engine.game_clock.now(),
+                'captured': engine.player.lives <= 0,
+                'cleared': engine.map_manager.all_pellets_collected(),
+            }
+        finally:
+            if learning_system:
+                learning_system.close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return result
+
+def mean_interval(values):
+    """평균과 95% 신뢰구간 반폭 (정규 근사). 한 판뿐이면 반폭은 None."""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return mean, None
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return mean, CONFIDENCE_Z * math.sqrt(variance / n)
+
+def wilson_interval(successes, n):
+    """비율의 Wilson 95% 신뢰구간 (하한, 상한). 0이나 1에 가까운 비율에서도 구간이 [0, 1]을 벗어나지 않음."""
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    z2 = CONFIDENCE_Z * CONFIDENCE_Z
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half = CONFIDENCE_Z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return max(0.0, center - half), min(1.0, center + half)
+
+def summarize(results, configs):
+    """결과를 (구성, 플레이어)별로 모아 점수/생존 시간 평균과 구간, 잡힘 비율과 Wilson 구간을 계산합니다."""
+    groups = {}
+    for result in results:
+        groups.setdefault((result['config'], result['player']), []).append(result)
+    summary = []
+    for (config_index, player), games in sorted(groups.items()):
+        captures = sum(game['captured'] for game in games)
+        summary.append({
+            'config': configs[config_index],
+            'player': player,
+            'games': len(games),
+            'score': mean_interval([game['score'] for game in games]),
+            'survival_time': mean_interval([game['survival_time'] for game in games]),
+            'capture_rate': captures / len(games),
+            'capture_interval': wilson_interval(captures, len(games)) if len(games) > 1 else None,
+            'clear_rate': sum(game['cleared'] for game in games) / len(games),
+        })
+    return summary
+
+def build_configs(teams, speeds=(None,), frightened_multipliers=(None,), prediction_radii=(None,)):
+    """팀(고스트 타입 이름 목록)과 조정값 후보들의 모든 조합으로 고스트 구성 목록을 만듭니다 (None은 기본값 유지)."""
+    configs = []
+    for team, speed, multiplier, radius in itertools.product(teams, speeds, frightened_multipliers, prediction_radii):
+        tunables = {name: value for name, value in (('speed', speed), ('frightened_speed_multiplier', multiplier),
+                                                    ('prediction_radius', radius)) if value is not None}
+        configs.append([dict(type=ghost_type, **tunables) for ghost_type in team])
+    return configs
+
+def run_tournament(configs, players, games=20, workers=None, max_steps=TOURNAMENT_MAX_STEPS, pretrained_file=None, seed=0):
+    """모든 (구성, 플레이어) 쌍을 games판씩 프로세스 풀에서 실행하고 요약 목록을 반환합니다.
+
+    시드는 판 번호로 정하므로 같은 구성의 플레이어들은 같은 시드들로 대전합니다 (구성 간 비교가 공정하도록).
+    재생 플레이어는 시드와 무관하게 항상 같은 게임이므로 한 판만 실행합니다.
+    """
+    tasks = [(config_index, config, player_spec, seed + game, max_steps, pretrained_file)
+             for config_index, config in enumerate(configs)
+             for player_spec in players
+             for game in range(1 if player_spec['type'] == 'replay' else games)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(play_game, tasks, chunksize=max(1, len(tasks) // 64)))
+    return summarize(results, configs)
+
+def format_config(config):
+    parts = []
+    for entry in config:
+        tunables = ','.join(f"{name}={value}" for name, value in entry.items() if name != 'type')
+        parts.append(f"{entry['type']}({tunables})" if tunables else entry['type'])
+    return ' '.join(parts)
+
+def print_summary(summary):
+    for row in summary:
+        score, score_half = row['score']
+        survival, survival_half = row['survival_time']
+        print(f"{format_config(row['config'])} vs {row['player']} ({row['games']}판)")
+        if row['capture_interval'] is None:
+            # 한 판뿐인 결정적 대전은 구간 없이 결과만
+            print(f"  점수 {score:.1f}, 생존 {survival:.1f}초, 잡힘 {'예' if row['capture_rate'] else '아니오'}, "
+                  f"클리어 {'예' if row['clear_rate'] else '아니오'}")
+            continue
+        low, high = row['capture_interval']
+        print(f"  점수 {score:.1f} ± {score_half:.1f}, 생존 {survival:.1f} ± {survival_half:.1f}초, "
+              f"잡힘 {row['capture_rate']:.0%} [{low:.0%}, {high:.0%}], 클리어 {row['clear_rate']:.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="고스트 구성들을 스크립트/재생 플레이어와 대전시켜 비교합니다.")
+    parser.add_argument('--team', action='append', default=None,
+                        help="쉼표로 구분한 고스트 타입 목록 (여러 번 지정 가능, 기본값: 기본 4종)")
+    parser.add_argument('--speed', type=float, nargs='+', default=[None], help="고스트 이동 간격(초) 후보")
+    parser.add_argument('--frightened', type=float, nargs='+', default=[None], help="겁먹은 상태 속도 배율 후보")
+    parser.add_argument('--radius', type=int, nargs='+', default=[None], help="학습 예측 반경(타일) 후보")
+    parser.add_argument('--player', nargs='+', choices=['random', 'greedy'], default=['greedy', 'random'],
+                        help="스크립트 플레이어 종류")
+    parser.add_argument('--replay', nargs='*', default=[], help="재생할 세션 파일 또는 디렉터리")
+    parser.add_argument('--games', type=int, default=20, help="(구성, 플레이어)마다 실행할 판 수")
+    parser.add_argument('--max-steps', type=int, default=TOURNAMENT_MAX_STEPS, help="한 판의 최대 틱 수")
+    parser.add_argument('--workers', type=int, default=None, help="작업 프로세스 수 (기본값: CPU 수)")
+    parser.add_argument('--pretrained', default=None, help="판마다 새 학습 데이터의 시작점으로 쓸 사전 학습 모델 파일 (기본값: 기본 학습 데이터)")
+    parser.add_argument('--seed', type=int, default=0, help="첫 판의 시드")
+    args = parser.parse_args()
+
+    teams = [team.split(',') for team in args.team] if args.team else [DEFAULT_GHOST_SPEC]
+    configs = build_configs(teams, args.speed, args.frightened, args.radius)
+    players = [{'type': kind} for kind in args.player]
+    players += [{'type': 'replay', 'file': path} for path in find_session_files(args.replay)]
+    print_summary(run_tournament(configs, players, args.games, args.workers, args.max_steps, args.pretrained, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""기록된 플레이 세션으로 사전 학습 모델을 만드는 오프라인 학습 파이프라인.
+
+사용법:
+    python -m ai.training 세션파일_또는_디렉터리 [...] [-o learning_pretrained.bin] [--workers N] [--heatmap heatmap.npy]
+
+입력은 학습 데이터 JSON(이전 형식 포함), 바이너리 스냅샷(.bin), 학습 저널(.journal)입니다.
+바이너리 스냅샷은 최근 이동 일부(move_history)만 들고 있으므로, 이동 기록 대신 저장된 누적 통계(transition_stats, markov_stats)를 씁니다.
+파일마다 프로세스 풀에서 numpy 전이 표(이전 타일 x 다음 타일), 마르코프 카운트, 방문 히트맵을 만들고(map),
+도착하는 대로 더해서 합친(reduce) 뒤 PlayerLearningSystem이 그대로 불러올 수 있는 바이너리 학습 파일로 저장합니다.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from game.constants import *
+from game.map_manager import MapManager
+from ai.learning import (JOURNAL_MOVE, DIRECTION_CODES, read_learning_journal, read_learning_file,
+                         is_learning_binary_file, write_learning_file)
+from ai.markov import MarkovPredictor
+
+SESSION_EXTENSIONS = ('.json', '.bin', '.journal')
+
+# 작업 프로세스마다 한 번 만드는 맵 (타일 인덱스와 이웃 표를 파일마다 다시 만들지 않도록)
+worker_map = None
+
+def init_worker():
+    global worker_map
+    worker_map = MapManager()
+
+def find_session_files(paths):
+    """인자로 받은 파일과 디렉터리(하위 포함)에서 세션 파일 경로를 순서대로 모읍니다."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(SESSION_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
+
+def load_session_moves(path):
+    """세션 파일 하나의 이동 기록 목록을 읽습니다 (형식은 확장자와 매직 바이트로 판단)."""
+    if path.endswith('.journal'):
+        return [value for kind, _, value in read_learning_journal(path) if kind == JOURNAL_MOVE]
+    if is_learning_binary_file(path):
+        return read_learning_file(path)['move_history']
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('move_history', [])
+
+def load_session(path):
+    """학습용으로 세션 파일 하나를 읽어 (이동 기록 목록, 학습 상태 또는 None)을 반환합니다.
+
+    바이너리 스냅샷은 이동 기록이 최근 일부뿐이므로 이동 기록 대신 불러온 학습 상태를 반환합니다.
+    """
+    if not path.endswith('.journal') and is_learning_binary_file(path):
+        return [], read_learning_file(path)
+    return load_session_moves(path), None
+
+def tile_indices(map_manager, positions):
+    """(x, y) 위치 배열 [n, 2]의 타일 인덱스 배열. 벽이거나 맵 밖이면 -1."""
+    xs, ys = positions[:, 0], positions[:, 1]
+    indices = np.full(len(positions), -1, dtype=np.int64)
+    inside = (xs >= 0) & (xs < map_manager.width) & (ys >= 0) & (ys < map_manager.height)
+    indices[inside] = map_manager.tile_index[ys[inside], xs[inside]]
+    return indices
+
+def train_session(path):
+    """세션 파일 하나의 부분 결과(map 단계)를 만듭니다. 읽기에 실패한 파일은 빈 결과."""
+    map_manager = worker_map
+    tile_count = len(map_manager.walkable_tiles)
+    markov = MarkovPredictor(map_manager)
+    try:
+        moves, state = load_session(path)
+    except Exception as e:
+        print(f"세션 파일 '{path}'을(를) 읽지 못했습니다: {e}")
+        moves, state = [], None
+    partial = {
+        'files': 1,
+        'moves': len(moves),
+        'corner_count': 0,
+        'transitions': np.zeros((4, tile_count * tile_count)),
+        'visits': np.zeros(tile_count, dtype=np.int64),
+        'markov': markov.counts,
+    }
+    if state is not None:
+        add_learning_state(partial, state, map_manager)
+        return partial
+    if not moves:
+        return partial
+
+    prev = tile_indices(map_manager, np.array([move['prev_pos'] for move in moves], dtype=np.int64).reshape(-1, 2))
+    current = tile_indices(map_manager, np.array([move['current_pos'] for move in moves], dtype=np.int64).reshape(-1, 2))
+    dense = np.array([move.get('nearby_ghosts', 0) >= 2 for move in moves])
+    corner = np.array([bool(move['move_data'].get('is_corner')) for move in moves])
+    valid = (prev >= 0) & (current >= 0)
+    pairs = prev * tile_count + current
+    # 전이 표 4종: 전체/코너링 이동 각각의 [고스트 밀집이 아닌 횟수, 밀집 횟수] (전이 인덱스와 같은 구분)
+    sparse = ~dense
+    for row, mask in enumerate((valid & sparse, valid & dense, valid & corner & sparse, valid & corner & dense)):
+        partial['transitions'][row] = np.bincount(pairs[mask], minlength=tile_count * tile_count)
+    partial['visits'] = np.bincount(current[current >= 0], minlength=tile_count)
+    partial['corner_count'] = int(corner.sum())
+
+    # 마르코프 문맥은 이동 순서에 의존하므로 파일 안에서는 차례대로 누적
+    for move in moves:
+        markov.update(move['prev_pos'], move['current_pos'], 1.0, DIRECTION_CODES.get(move['move_data'].get('direction'), -1))
+    return partial
+
+def add_learning_state(partial, data, map_manager):
+    """바이너리 스냅샷에 저장된 누적 통계(transition_stats, markov_stats)를 부분 결과에 넣습니다.
+
+    저장된 카운트는 감쇠 가중치 척도라서, 최근 이동일수록 무거운 분포 모양은 그대로 두고 전이 가중치의 합이
+    스냅샷의 move_count가 되도록 비율을 맞춥니다 (다른 세션과 이동 횟수만큼의 무게로 합쳐짐).
+    방문 횟수는 전이 표의 도착 타일별 합입니다. 전이 통계가 비어 있으면 부분 결과를 바꾸지 않습니다.
+    """
+    tile_count = len(map_manager.walkable_tiles)
+    transitions = np.zeros((4, tile_count, tile_count))
+    stats = data.get('transition_stats', {})
+    for row, key in ((0, 'all'), (2, 'corner')):
+        for px, py, nx, ny, count, dense_count in stats.get(key, []):
+            prev_tile = map_manager.get_tile_index(px, py)
+            next_tile = map_manager.get_tile_index(nx, ny)
+            if prev_tile >= 0 and next_tile >= 0:
+                transitions[row, prev_tile, next_tile] += count
+                transitions[row + 1, prev_tile, next_tile] += dense_count
+    weight = transitions[:2].sum()
+    if weight <= 0:
+        return
+    factor = data.get('move_count', 0) / weight
+    partial['moves'] = data.get('move_count', 0)
+    partial['corner_count'] = data.get('corner_count', 0)
+    partial['transitions'] = transitions.reshape(4, -1) * factor
+    partial['visits'] = np.rint(transitions[:2].sum(axis=(0, 1)) * factor).astype(np.int64)
+    markov = MarkovPredictor(map_manager)
+    if markov.import_stats(data.get('markov_stats')):
+        partial['markov'] = markov.counts * factor
+
+def merge_partials(total, partial):
+    """두 부분 결과를 더합니다 (reduce 단계)."""
+    if total is None:
+        return partial
+    for key, value in partial.items():
+        total[key] = total[key] + value
+    return total
+
+def build_pretrained_state(total, map_manager, decay=LEARNING_DECAY):
+    """합쳐진 결과를 PlayerLearningSystem이 불러오는 학습 상태 딕셔너리로 만듭니다.
+
+    실시간 학습은 감쇠 계수 decay로 최근 약 1 / (1 - decay)번의 이동만큼의 무게를 유지하므로,
+    사전 학습 카운트도 그 무게로 줄여서 새 플레이어의 실제 이동이 금방 반영되도록 합니다.
+    """
+    tile_count = len(map_manager.walkable_tiles)
+    scale = min(1.0, 1.0 / (1.0 - decay) / max(total['moves'], 1))
+    transitions = total['transitions'].reshape(4, tile_count, tile_count) * scale
+
+    def transition_rows(counts, dense_counts):
+        rows = []
+        for prev_tile, next_tile in zip(*np.nonzero(counts + dense_counts)):
+            prev_pos = map_manager.walkable_tiles[prev_tile]
+            next_pos = map_manager.walkable_tiles[next_tile]
+            rows.append([prev_pos[0], prev_pos[1], next_pos[0], next_pos[1],
+                         float(counts[prev_tile, next_tile]), float(dense_counts[prev_tile, next_tile])])
+        return rows
+
+    markov = MarkovPredictor(map_manager)
+    markov.counts[:] = total['markov'] * scale
+    move_count = int(total['moves'])
+    learning_phase = 0
+    for i, threshold in enumerate(LEARNING_PHASE_THRESHOLDS):
+        if move_count >= threshold:
+            learning_phase = i
+    return {
+        'move_count': move_count,
+        'learning_phase': learning_phase,
+        'move_history': [],
+        'corner_count': int(total['corner_count']),
+        'power_pellet_timing': [],
+        'score_milestones': [],
+        'transition_stats': {
+            'decay_weight': 1.0,
+            'all': transition_rows(transitions[0], transitions[1]),
+            'corner': transition_rows(transitions[2], transitions[3]),
+        },
+        'LEARNING_PHASE_THRESHOLDS': list(LEARNING_PHASE_THRESHOLDS),
+        'journal_seq': 0,
+        'markov_stats': markov.export_stats(),
+    }
+
+def build_heatmap(total, map_manager):
+    """타일별 방문 횟수를 맵 크기 [높이, 너비] 배열로 펼칩니다 (벽은 0)."""
+    heatmap = np.zeros((map_manager.height, map_manager.width), dtype=np.int64)
+    for tile, (x, y) in enumerate(map_manager.walkable_tiles):
+        heatmap[y, x] = total['visits'][tile]
+    return heatmap
+
+def train(paths, output=LEARNING_PRETRAINED_FILE, workers=None, heatmap_file=None):
+    """세션 파일들을 병렬로 학습해 사전 학습 모델을 저장하고 합쳐진 결과를 반환합니다."""
+    files = find_session_files(paths)
+    total = None
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        # 결과는 도착하는 대로 합쳐서 메모리에는 합계 하나만 유지
+        for partial in executor.map(train_session, files):
+            total = merge_partials(total, partial)
+    if total is None:
+        print("학습할 세션 파일이 없습니다.")
+        return None
+
+    map_manager = MapManager()
+    write_learning_file(output, build_pretrained_state(total, map_manager))
+    print(f"세션 {total['files']}개, 이동 {total['moves']}회로 사전 학습 모델을 '{output}'에 저장했습니다.")
+    if heatmap_file:
+        np.save(heatmap_file, build_heatmap(total, map_manager))
+        print(f"방문 히트맵을 '{heatmap_file}'에 저장했습니다.")
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="기록된 플레이 세션으로 사전 학습 모델을 만듭니다.")
+    parser.add_argument('paths', nargs='+', help="세션 파일(.json, .bin, .journal) 또는 디렉터리")
+    parser.add_argument('-o', '--output', default=LEARNING_PRETRAINED_FILE, help="사전 학습 모델 파일 경로")
+    parser.add_argument('--workers', type=int, default=None, help="작업 프로세스 수 (기본값: CPU 수)")
+    parser.add_argument('--heatmap', default=None, help="방문 히트맵을 저장할 .npy 경로")
+    args = parser.parse_args()
+    train(args.paths, args.output, args.workers, args.heatmap)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import numpy as np
+from game.constants import *
+from game.player import Player
+from ai.ghost_types import create_ghosts, AmbushGhost, CooperativeGhost
+
+class BatchSimulator:
+    """N개의 게임을 구조체-배열(struct-of-arrays) numpy 형태로 들고 한 틱씩 한꺼번에 진행하는 일괄 시뮬레이터.
+
+    게임별 상태는 모두 [게임 수] 또는 [게임 수, 고스트 수] 배열입니다 (펠릿은 [게임 수, 타일 수] 마스크).
+    규칙은 헤드리스 GameEngine.step()을 따릅니다.
+        - 플레이어: Player.update/move (다음 방향 우선, 막히면 현재 방향), MapManager.collect_pellet
+        - 고스트: Ghost.update의 리스폰 대기, 리스폰 직후 추격 유지, frightened 도망(맨해튼 거리), 타입별 추격 타겟
+        - 충돌, 목숨, 일시정지, 게임 종료: GameEngine.update
+    시간은 SimulationClock과 같이 정수 밀리초로 진행하고 타이머 비교는 같은 초 단위 실수로 해서 엔진과 판정이 일치합니다.
+    단순화한 부분: 고스트의 추격 경로는 next_hop_table의 최단 경로(다른 고스트를 막힌 칸으로 보지 않음)이고,
+    이 경로는 플레이어를 직접 쫓는 흐름 필드 경로와는 같지만, 증분 계획기 경로는 다른 고스트를 피하고 같은 길이의 다른 경로를 고를 수 있어서
+    틱마다 엔진과 똑같이 진행되는 것은 플레이어만 쫓는 고스트(aggressive)로 이루어진 팀입니다.
+    학습 예측과 탐색 고스트(LookaheadGhost)의 expectimax 탐색은 사용하지 않습니다 (탐색 고스트는 플레이어를 직접 쫓음). 겹침 회피를 위해 고스트 경로는 첫 칸(ghost_path_next)만 들고 있습니다.
+    고스트 계획 주기는 GhostManager와 같습니다 (update_frequency 프레임마다 엇갈려 계획, 상태 변화/경로 끝/끊김 시 즉시 계획).
+    계획하지 않는 프레임에는 마지막으로 계획한 타겟(ghost_goal)의 최단 경로를 계속 따라갑니다. 시간 예산은 적용하지 않습니다.
+    """
+    def __init__(self, map_manager, batch_size, step_ms=None, ghost_spec=None, update_frequency=AI_UPDATE_FREQUENCY):
+        self.map_manager = map_manager
+        self.batch_size = batch_size
+        self.step_ms = step_ms or round(1000 / FPS)
+        self.update_frequency = max(1, update_frequency)
+        self.neighbor_table = map_manager.neighbor_table.astype(np.int64)
+        self.next_hop_table = map_manager.next_hop_table.astype(np.int64)
+        self.tile_count = len(map_manager.walkable_tiles)
+        self.tile_x = np.array([x for x, _ in map_manager.walkable_tiles], dtype=np.int64)
+        self.tile_y = np.array([y for _, y in map_manager.walkable_tiles], dtype=np.int64)
+        self.direction_dx = np.array([dx for dx, _ in DIRECTIONS.values()], dtype=np.int64)
+        self.direction_dy = np.array([dy for _, dy in DIRECTIONS.values()], dtype=np.int64)
+        self.start_direction = list(DIRECTIONS).index('RIGHT')
+
+        # 처음 펠릿 배치 (벽 구조와 함께 모든 게임이 공유)
+        tiles = [map_manager.original_map[y][x] for x, y in map_manager.walkable_tiles]
+        self.initial_pellets = np.array([tile == PELLET for tile in tiles])
+        self.initial_power_pellets = np.array([tile == POWER_PELLET for tile in tiles])
+
+        # 속도, 지속 시간 등은 실제 Player/Ghost 객체의 값을 그대로 읽어서 사용
+        player = Player(map_manager.player_start_x, map_manager.player_start_y)
+        self.player_speed = player.speed
+        self.power_duration = player.power_duration
+        self.start_lives = player.lives
+        self.player_start = map_manager.get_tile_index(map_manager.player_start_x, map_manager.player_start_y)
+        ghosts = create_ghosts(None, map_manager, spec=ghost_spec)
+        self.ghost_count = len(ghosts)
+        self.ghost_spawn = np.array([map_manager.get_tile_index(g.init_x, g.init_y) for g in ghosts], dtype=np.int64)
+        self.ghost_speed = np.array([g.speed for g in ghosts])
+        self.ghost_frightened_speed = np.array([g.speed / g.frightened_speed_multiplier for g in ghosts])
+        self.ghost_respawn_delay = np.array([g.respawn_delay for g in ghosts])
+        self.ghost_post_respawn = np.array([g.post_respawn_chase_duration for g in ghosts])
+        # 고스트 타입별 추격 타겟 규칙 (get_chase_target과 같은 규칙)
+        self.ghost_target_rule = ['ambush' if isinstance(g, AmbushGhost) else 'cooperative' if isinstance(g, CooperativeGhost) else 'player'
+                                  for g in ghosts]
+        self.reset()
+
+    def reset(self):
+        """모든 게임을 새 게임 상태로 되돌립니다 (헤드리스 GameEngine 생성 직후와 같은 상태)."""
+        size, ghosts = self.batch_size, self.ghost_count
+        self.time_ms = 0
+        self.pellets = np.tile(self.initial_pellets, (size, 1))
+        self.power_pellets = np.tile(self.initial_power_pellets, (size, 1))
+        self.pellets_remaining = np.full(size, int(self.initial_pellets.sum() + self.initial_power_pellets.sum()), dtype=np.int64)
+        self.player_tile = np.full(size, self.player_start, dtype=np.int64)
+        self.player_direction = np.full(size, self.start_direction, dtype=np.int64)
+        self.player_next_direction = np.full(size, self.start_direction, dtype=np.int64)
+        self.player_last_move = np.zeros(size)
+        self.powered = np.zeros(size, dtype=bool)
+        self.power_time = np.zeros(size)
+        self.score = np.zeros(size, dtype=np.int64)
+        self.lives = np.full(size, self.start_lives, dtype=np.int64)
+        self.paused = np.zeros(size, dtype=bool)
+        self.pause_time = np.zeros(size)
+        self.done = np.zeros(size, dtype=bool)
+        self.ticks_survived = np.zeros(size, dtype=np.int64)
+        self.ghost_tile = np.tile(self.ghost_spawn, (size, 1))
+        # 고스트 경로의 첫 칸 (Ghost.path[0], 경로가 없으면 -1) - 다른 고스트의 회피 판정에 사용
+        self.ghost_path_next = np.full((size, ghosts), -1, dtype=np.int64)
+        # 마지막으로 계획한 추격 타겟 타일 (-1이면 없음)과 그때의 상태 (GHOST_MODE_* 인덱스, -1이면 계획 전)
+        self.ghost_goal = np.full((size, ghosts), -1, dtype=np.int64)
+        self.ghost_plan_mode = np.full((size, ghosts), -1, dtype=np.int64)
+        # GhostManager.frame: 마지막 리셋 이후 고스트를 업데이트한 프레임 수 (계획 차례 계산용)
+        self.ghost_frame = np.zeros(size, dtype=np.int64)
+        self.ghost_frightened = np.zeros((size, ghosts), dtype=bool)
+        self.ghost_last_move = np.zeros((size, ghosts))
+        self.ghost_respawn_time = np.zeros((size, ghosts))
+        self.ghost_post_respawn_end = np.zeros((size, ghosts))
+
+    def step(self, directions=None):
+        """모든 게임을 한 틱 진행합니다. directions는 게임별 다음 방향 인덱스 배열(-1이면 유지). 진행 중인 게임 마스크 반환."""
+        self.time_ms += self.step_ms
+        now = self.time_ms / 1000.0
+        if directions is not None:
+            directions = np.asarray(directions)
+            change = directions >= 0
+            self.player_next_direction[change] = directions[change]
+
+        live = ~self.done
+        # 목숨을 잃은 뒤 1초 동안은 게임 진행을 멈춤
+        waiting = live & self.paused & (now - self.pause_time < 1.0)
+        self.paused &= waiting
+        active = live & ~waiting
+        self.update_player(active, now)
+        self.update_ghosts(active, now)
+        self.resolve_collisions(active, now)
+        self.ticks_survived[live] += 1
+        return ~self.done
+
+    def update_player(self, active, now):
+        """Player.update/move와 collect_pellet을 모든 게임에 적용합니다."""
+        self.powered[active & self.powered & (now - self.power_time > self.power_duration)] = False
+        games = np.flatnonzero(active & (now - self.player_last_move >= self.player_speed))
+        if not len(games):
+            return
+        tiles = self.player_tile[games]
+        next_directions = self.player_next_direction[games]
+        turned = self.neighbor_table[tiles, next_directions]
+        forward = self.neighbor_table[tiles, self.player_direction[games]]
+        can_turn = turned >= 0
+        tiles = np.where(can_turn, turned, np.where(forward >= 0, forward, tiles))
+        self.player_direction[games] = np.where(can_turn, next_directions, self.player_direction[games])
+        self.player_tile[games] = tiles
+        self.player_last_move[games] = now
+
+        pellet = self.pellets[games, tiles]
+        power = self.power_pellets[games, tiles]
+        self.pellets[games, tiles] = False
+        self.power_pellets[games, tiles] = False
+        self.score[games] += np.where(power, POWER_PELLET_SCORE, np.where(pellet, PELLET_SCORE, 0))
+        self.pellets_remaining[games] -= pellet | power
+        self.powered[games[power]] = True
+        self.power_time[games[power]] = now
+
+    def chase_targets(self, ghost, games):
+        """get_chase_target과 같은 규칙으로 추격 타겟 타일 인덱스를 구합니다."""
+        player_tiles = self.player_tile[games]
+        rule = self.ghost_target_rule[ghost]
+        if rule == 'player':
+            return player_tiles
+        px, py = self.tile_x[player_tiles], self.tile_y[player_tiles]
+        if rule == 'ambush':
+            # 플레이어 진행 방향 2칸 앞
+            tx = px + 2 * self.direction_dx[self.player_direction[games]]
+            ty = py + 2 * self.direction_dy[self.player_direction[games]]
+        else:
+            # 다른 고스트 평균 위치와 플레이어 위치의 중간 + 오프셋
+            others = [g for g in range(self.ghost_count) if g != ghost]
+            other_tiles = self.ghost_tile[games][:, others]
+            avg_x = self.tile_x[other_tiles].mean(axis=1)
+            avg_y = self.tile_y[other_tiles].mean(axis=1)
+            tx = ((px + avg_x) / 2.0).astype(np.int64) + 1
+            ty = ((py + avg_y) / 2.0).astype(np.int64) + 1
+        inside = (tx >= 0) & (tx < self.map_manager.width) & (ty >= 0) & (ty < self.map_manager.height)
+        targets = np.full(len(games), -1, dtype=np.int64)
+        targets[inside] = self.map_manager.tile_index[ty[inside], tx[inside]]
+        # 맵 밖이거나 벽이면 플레이어 현재 위치
+        return np.where(targets >= 0, targets, player_tiles)
+
+    def flee_tiles(self, ghost, games):
+        """frightened 고스트의 도망 칸: 플레이어와의 맨해튼 거리가 현재보다 가장 멀어지는 첫 인접 칸 (없으면 -1)."""
+        tiles = self.ghost_tile[games, ghost]
+        player_tiles = self.player_tile[games]
+        px, py = self.tile_x[player_tiles], self.tile_y[player_tiles]
+        best = np.full(len(games), -1, dtype=np.int64)
+        best_distance = np.abs(self.tile_x[tiles] - px) + np.abs(self.tile_y[tiles] - py)
+        for direction in range(len(DIRECTIONS)):
+            neighbors = self.neighbor_table[tiles, direction]
+            distance = np.abs(self.tile_x[neighbors] - px) + np.abs(self.tile_y[neighbors] - py)
+            better = (neighbors >= 0) & (distance > best_distance)
+            best[better] = neighbors[better]
+            best_distance[better] = distance[better]
+        return best
+
+    def update_ghosts(self, active, now):
+        """GhostManager.update를 고스트 순서대로 모든 게임에 적용합니다 (앞 고스트의 이동이 뒤 고스트의 회피에 반영됨)."""
+        self.ghost_frame[active] += 1
+        for ghost in range(self.ghost_count):
+            updating = active & (now - self.ghost_respawn_time[:, ghost] >= self.ghost_respawn_delay[ghost])
+            # 리스폰 직후 추격 유지 구간은 경로를 새로 만들지 않으므로 (리셋 때 비워진 경로) 움직이지 않음
+            post_respawn = updating & (now < self.ghost_post_respawn_end[:, ghost])
+            frightened = updating & ~post_respawn & self.powered
+            chasing = updating & ~post_respawn & ~self.powered
+            self.ghost_frightened[updating, ghost] = frightened[updating]
+
+            # 계획 차례이거나 needs_replan (상태가 바뀜, 경로 끝, 비켜나서 경로가 끊김)인 게임만 다시 계획
+            mode = np.where(post_respawn, 0, np.where(frightened, 1, 2))
+            tiles = self.ghost_tile[:, ghost]
+            next_tiles = self.ghost_path_next[:, ghost].copy()
+            safe_next = np.maximum(next_tiles, 0)
+            connected = (next_tiles >= 0) & (np.abs(self.tile_x[safe_next] - self.tile_x[tiles]) + np.abs(self.tile_y[safe_next] - self.tile_y[tiles]) == 1)
+            slot = (self.ghost_frame + ghost) % self.update_frequency == 0
+            replan = updating & (slot | (mode != self.ghost_plan_mode[:, ghost]) | ~connected)
+            self.ghost_plan_mode[replan, ghost] = mode[replan]
+
+            # 이번 틱의 경로 첫 칸 (리스폰 직후 구간과 계획하지 않는 게임은 이전 경로 유지)
+            goals = self.ghost_goal[:, ghost]
+            games = np.flatnonzero(chasing & replan)
+            if len(games):
+                tiles = self.ghost_tile[games, ghost]
+                goals[games] = self.chase_targets(ghost, games)
+                next_tiles[games] = np.where(goals[games] == tiles, -1, self.next_hop_table[tiles, goals[games]])
+            games = np.flatnonzero(frightened & replan)
+            if len(games):
+                goals[games] = -1
+                next_tiles[games] = self.flee_tiles(ghost, games)
+            self.ghost_path_next[updating, ghost] = next_tiles[updating]
+
+            speed = np.where(frightened, self.ghost_frightened_speed[ghost], self.ghost_speed[ghost])
+            moving = updating & (now - self.ghost_last_move[:, ghost] >= speed)
+            self.ghost_last_move[moving, ghost] = now
+            games = np.flatnonzero(moving & (next_tiles >= 0))
+            if not len(games):
+                continue
+            targets = next_tiles[games]
+            others = [g for g in range(self.ghost_count) if g != ghost]
+            other_tiles = self.ghost_tile[games][:, others]
+            # 다른 고스트가 서 있거나 다음에 가려는 칸이면 막힘
+            blocked = ((other_tiles == targets[:, None]) | (self.ghost_path_next[games][:, others] == targets[:, None])).any(axis=1)
+            moved, arrived = games[~blocked], targets[~blocked]
+            self.ghost_tile[moved, ghost] = arrived
+            # 경로의 다음 칸으로 넘어감 (도망 경로는 한 칸짜리라 비게 됨)
+            moved_goals = goals[moved]
+            self.ghost_path_next[moved, ghost] = np.where((moved_goals < 0) | (moved_goals == arrived), -1,
+                                                         self.next_hop_table[arrived, np.maximum(moved_goals, 0)])
+            # 막혔으면 원래 칸과 다른 고스트가 선 칸을 뺀 첫 번째 인접 칸으로 비켜남
+            games, targets, other_tiles = games[blocked], targets[blocked], other_tiles[blocked]
+            tiles = self.ghost_tile[games, ghost]
+            for direction in reversed(range(len(DIRECTIONS))):
+                neighbors = self.neighbor_table[tiles, direction]
+                free = (neighbors >= 0) & (neighbors != targets) & ~(other_tiles == neighbors[:, None]).any(axis=1)
+                self.ghost_tile[games[free], ghost] = neighbors[free]
+
+    def reset_ghosts(self, games, ghosts, now):
+        """Ghost.reset: 스폰 위치로 돌아가 리스폰 대기를 시작합니다."""
+        for ghost in ghosts:
+            self.ghost_tile[games, ghost] = self.ghost_spawn[ghost]
+            self.ghost_path_next[games, ghost] = -1
+            self.ghost_goal[games, ghost] = -1
+            self.ghost_plan_mode[games, ghost] = -1
+            self.ghost_frightened[games, ghost] = False
+            self.ghost_last_move[games, ghost] = now
+            self.ghost_respawn_time[games, ghost] = now
+            self.ghost_post_respawn_end[games, ghost] = now + self.ghost_respawn_delay[ghost] + self.ghost_post_respawn[ghost]
+
+    def resolve_collisions(self, active, now):
+        """GameEngine.update의 고스트 충돌, 목숨, 게임 종료 판정을 적용합니다."""
+        checking = active.copy()
+        for ghost in range(self.ghost_count):
+            ready = now - self.ghost_respawn_time[:, ghost] >= self.ghost_respawn_delay[ghost]
+            touching = checking & ready & (self.ghost_tile[:, ghost] == self.player_tile)
+            eaten = np.flatnonzero(touching & self.ghost_frightened[:, ghost])
+            hit = np.flatnonzero(touching & ~self.ghost_frightened[:, ghost])
+            if len(eaten):
+                self.score[eaten] += GHOST_BASE_SCORE
+                self.reset_ghosts(eaten, [ghost], now)
+            if len(hit):
+                self.lives[hit] -= 1
+                self.player_tile[hit] = self.player_start
+                self.player_direction[hit] = self.start_direction
+                self.player_next_direction[hit] = self.start_direction
+                self.powered[hit] = False
+                self.paused[hit] = True
+                self.pause_time[hit] = now
+                self.done[hit[self.lives[hit] <= 0]] = True
+                self.reset_ghosts(hit, range(self.ghost_count), now)
+                self.ghost_frame[hit] = 0
+                # 목숨을 잃은 게임은 이번 틱의 나머지 판정을 건너뜀
+                checking[hit] = False
+        self.done |= checking & (self.pellets_remaining == 0)
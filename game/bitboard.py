@@ -0,0 +1,109 @@
+"""비트보드: 맵의 타일 집합(벽, 펠릿, 파워 펠릿, 엔티티 위치)을 파이썬 정수 하나의 비트로 나타냅니다.
+
+타일 (x, y)는 비트 y * stride + x이며 stride는 맵 너비 + 1입니다. 각 행 끝의 한 칸(x == 너비)은 항상 비어 있는
+경계 열이라서, 비트를 한 칸 옮겨도 다음 행으로 넘어가지 않습니다. 그래서 이웃 생성은 시프트 네 번과 이동 가능 마스크와의
+AND로 끝나고, 집합 연산은 &, |, ~, 개수는 popcount입니다.
+상태가 정수 몇 개뿐이므로 복사와 해시도 값싸서 탐색(상태 저장/비교)에 쓰기 좋습니다. 반대로 한 칸만 조회하는 일은
+리스트 인덱싱이 더 빠르므로 MapManager.is_wall/is_valid_move는 current_map을 그대로 사용합니다.
+"""
+from game.constants import *
+
+def popcount(bits):
+    """켜진 비트 수"""
+    return bits.bit_count()
+
+class BitboardLayout:
+    """한 맵의 비트 배치와 벽 구조(바뀌지 않는 부분)를 담고 비트보드 연산을 제공합니다."""
+    def __init__(self, grid):
+        self.height = len(grid)
+        self.width = len(grid[0])
+        self.stride = self.width + 1
+        self.walls = 0
+        self.walkable = 0
+        for y, row in enumerate(grid):
+            for x, tile in enumerate(row):
+                if tile == WALL:
+                    self.walls |= self.bit(x, y)
+                else:
+                    self.walkable |= self.bit(x, y)
+        # DIRECTIONS 순서의 방향별 비트 이동량 (양수면 왼쪽 시프트)
+        self.direction_shifts = [dy * self.stride + dx for dx, dy in DIRECTIONS.values()]
+
+    def bit(self, x, y):
+        """타일 하나의 비트"""
+        return 1 << (y * self.stride + x)
+
+    def index_of(self, x, y):
+        return y * self.stride + x
+
+    def position_of(self, index):
+        """비트 번호 -> 타일 좌표"""
+        return index % self.stride, index // self.stride
+
+    def from_positions(self, positions):
+        """좌표 목록 -> 비트보드"""
+        bits = 0
+        for x, y in positions:
+            bits |= 1 << (y * self.stride + x)
+        return bits
+
+    def from_tiles(self, grid, *tiles):
+        """맵(2차원 리스트)에서 주어진 타일 값들이 있는 칸의 비트보드"""
+        bits = 0
+        for y, row in enumerate(grid):
+            for x, tile in enumerate(row):
+                if tile in tiles:
+                    bits |= 1 << (y * self.stride + x)
+        return bits
+
+    def positions(self, bits):
+        """비트보드의 켜진 칸 좌표 목록 (비트 번호 순서)"""
+        positions = []
+        stride = self.stride
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            positions.append((index % stride, index // stride))
+            bits ^= low
+        return positions
+
+    def contains(self, bits, x, y):
+        return (bits >> (y * self.stride + x)) & 1 == 1
+
+    def shift(self, bits, direction_index):
+        """모든 칸을 한 방향으로 한 칸 옮긴 뒤 벽과 맵 밖을 지운 비트보드"""
+        amount = self.direction_shifts[direction_index]
+        moved = bits << amount if amount > 0 else bits >> -amount
+        return moved & self.walkable
+
+    def neighbors(self, bits):
+        """bits의 칸들에서 한 번에 갈 수 있는 칸들 (시프트 네 번)"""
+        stride = self.stride
+        return ((bits << 1) | (bits >> 1) | (bits << stride) | (bits >> stride)) & self.walkable
+
+    def expand(self, bits, steps):
+        """bits의 칸들에서 steps번 이하로 이동해 닿는 칸들 (bits 포함)"""
+        for _ in range(steps):
+            grown = bits | self.neighbors(bits)
+            if grown == bits:
+                break
+            bits = grown
+        return bits
+
+    def distance(self, start_bits, target_bits, max_distance=None):
+        """start_bits의 어떤 칸에서 target_bits의 가장 가까운 칸까지의 미로 거리 (닿지 않으면 -1).
+
+        한 번에 한 겹씩 퍼져 나가는 BFS로, 겹 하나가 시프트 몇 번이라 칸마다 큐를 다루는 BFS보다 훨씬 적게 돕니다.
+        """
+        reached = start_bits & self.walkable
+        frontier = reached
+        distance = 0
+        while frontier:
+            if frontier & target_bits:
+                return distance
+            if max_distance is not None and distance >= max_distance:
+                break
+            frontier = self.neighbors(frontier) & ~reached
+            reached |= frontier
+            distance += 1
+        return -1
@@ -0,0 +1,25 @@
+import time
+
+class RealClock:
+    """실제 시간 시계 (라이브 플레이용). now()는 time.time()과 같은 초 단위 값입니다."""
+    def now(self):
+        return time.time()
+
+    def advance(self, ms):
+        """실제 시계는 스스로 흐르므로 아무것도 하지 않습니다."""
+        pass
+
+class SimulationClock:
+    """헤드리스 시뮬레이션용 시계.
+
+    시간은 advance()로만 흐르므로 한 프레임(틱) 안에서는 멈춰 있고, 실제 시간과 관계없이 원하는 만큼 빠르게 진행할 수 있습니다.
+    누적은 정수 밀리초로 해서 오래 돌려도 부동소수점 오차가 쌓이지 않습니다.
+    """
+    def __init__(self, start_ms=0):
+        self.time_ms = start_ms
+
+    def now(self):
+        return self.time_ms / 1000.0
+
+    def advance(self, ms):
+        self.time_ms += ms
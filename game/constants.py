@@ -44,7 +44,35 @@ POWER_PELLET_DURATION = 300  # 프레임 단위 (5초)
 
 # AI 설정
 AI_UPDATE_FREQUENCY = 4  # 매 4프레임마다 AI 업데이트 (15fps)
+GHOST_PLAN_BUDGET_US = 2000  # 한 프레임에서 고스트 경로 계획에 쓰는 시간 예산 (마이크로초, 넘으면 남은 고스트는 다음 프레임으로)
 LEARNING_MEMORY_SIZE = 200  # 최근 이동 200개만 기억
+LEARNING_DECAY = 0.999  # 이동 1회마다 누적 전이 통계에 곱해지는 감쇠율 (반감기 약 700 이동)
+LEARNING_DATA_FILE = 'learning_data.bin'  # 학습 데이터 파일 (바이너리 열 지향 형식)
+LEGACY_LEARNING_DATA_FILE = 'learning_data.json'  # 이전 JSON 형식 (있으면 자동 변환)
+LEARNING_LOG_EXTENSION = '.learnlog'  # 학습 데이터 파일 이름 뒤에 붙는 학습 기록 로그 (리플레이의 시작 학습 상태를 참조)
+LEARNING_JOURNAL_BATCH = 16  # 학습 저널을 이 개수만큼 모아서 파일에 추가
+LEARNING_SNAPSHOT_INTERVAL = 500  # 이 이동 횟수마다 압축 스냅샷을 저장하고 저널을 비움
+LEARNING_PERSISTENCE_QUEUE_SIZE = 64  # 학습 데이터 저장 작업 스레드의 대기 작업 수 상한
+LEARNING_MARKOV_ORDER = 2  # 마르코프 예측기가 문맥으로 보는 최근 이동 방향 수 (k)
+LEARNING_MARKOV_LOOKAHEAD = 2  # 학습 단계 2 이상에서 고스트가 예측하는 플레이어의 몇 칸 앞 위치
+LEARNING_PROFILE_DIR = 'learning_profiles'  # 플레이어별 학습 프로필 파일을 두는 디렉터리
+LEARNING_PROFILE_CACHE_SIZE = 64  # 메모리에 동시에 올려 두는 학습 프로필 수 (LRU)
+LEARNING_PRETRAINED_FILE = 'learning_pretrained.bin'  # 저장된 학습 데이터가 없을 때 시작점으로 쓰는 사전 학습 모델 (python -m ai.training으로 생성)
+TOURNAMENT_MAX_STEPS = 20000  # 토너먼트 한 판의 최대 틱 수 (python -m ai.tournament)
+TOURNAMENT_OPENING_TILES = 12  # 토너먼트 그리디 플레이어가 판마다(시드별로) 처음 1~12칸을 무작위로 움직여 다른 국면에서 시작
+EXPECTIMAX_MAX_DEPTH = 6  # 탐색 고스트(lookahead)의 반복 심화 최대 깊이 (1 = 고스트와 플레이어가 한 칸씩)
+EXPECTIMAX_NODE_BUDGET = 500  # 탐색 한 번의 노드 예산 (넘으면 마지막으로 끝낸 깊이의 결과 사용, 시간 제한이 없을 때도 결정적)
+EXPECTIMAX_TABLE_SIZE = 20000  # 전치 테이블 최대 항목 수 (LRU)
+EXPECTIMAX_MIN_PROBABILITY = 0.05  # 이보다 확률이 작은 플레이어 이동은 탐색하지 않음
+EXPECTIMAX_CAPTURE_VALUE = 1000  # 플레이어를 잡는 상태의 가치
+EXPECTIMAX_POWER_PELLET_PENALTY = 500  # 플레이어가 파워 펠릿을 먹는 상태의 감점
+EXPECTIMAX_NEAREST_WEIGHT = 10  # 평가에서 가장 가까운 고스트 거리의 가중치 (나머지 고스트 거리는 1)
+EXPECTIMAX_ZOBRIST_SEED = 20240501  # Zobrist 해시 키 생성 시드
+REPLAY_RECORDING = True  # 라이브 게임마다 리플레이 기록 (python -m game.replay_player로 재생)
+REPLAY_DIR = 'replays'  # 리플레이 파일을 저장하는 디렉터리
+REPLAY_FILE_EXTENSION = '.replay'
+REPLAY_KEYFRAME_INTERVAL = 600  # 리플레이 재생 중 키프레임(상태 복사)을 남기는 틱 간격 (탐색 시 여기서부터 다시 시뮬레이션)
+LEARNING_PHASE_THRESHOLDS = [0, 5, 15, 30, 50, 100, 200, 500, 1000, 2000, 5000, 10000]  # 학습 단계 변화 기준 (이동 횟수)
 LEARNING_PHASES = {
     0: "기본 AI",           # 0-20 이동
     1: "패턴 인식 시작",     # 21-50 이동  
@@ -58,6 +86,7 @@ GHOST_AGGRESSIVE = "aggressive"
 GHOST_AMBUSH = "ambush"
 GHOST_COOPERATIVE = "cooperative"
 GHOST_PREDICTIVE = "predictive"
+GHOST_LOOKAHEAD = "lookahead"  # expectimax 탐색 고스트 (기본 구성에는 없음, --team으로 선택)
 
 # 고스트 상태
 GHOST_CHASE = "chase"
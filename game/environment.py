@@ -0,0 +1,102 @@
+import math
+import numpy as np
+from game.constants import *
+from game.game_engine import GameEngine
+
+class PacManEnv:
+    """헤드리스 게임 엔진을 감싼 Gym 형식 환경 (reset/step).
+
+    관찰은 미리 할당한 numpy 배열 딕셔너리이며 매 스텝 같은 배열을 제자리에서 갱신해서 돌려줍니다.
+    (다음 step() 호출 시 내용이 바뀌므로 보관하려면 복사해야 합니다.)
+        grid: [높이, 너비] int8 - MapManager.current_map의 타일 값 (벽, 펠릿, 파워 펠릿 등)
+        player: [2] int16 - 플레이어 (x, y)
+        ghosts: [고스트 수, 2] int16 - 고스트 (x, y)
+        frightened: [고스트 수] bool - 고스트가 frightened 상태인지
+    행동은 DIRECTIONS 순서의 방향 인덱스(0: UP, 1: DOWN, 2: LEFT, 3: RIGHT)이며 None이면 방향을 바꾸지 않습니다.
+    """
+    def __init__(self, learning_system=None, ticks_per_step=None, max_steps=10000, death_penalty=100):
+        self.engine = GameEngine(headless=True, learning_system=learning_system)
+        self.actions = list(DIRECTIONS)
+        self.max_steps = max_steps
+        self.death_penalty = death_penalty
+        # 한 스텝 = 플레이어가 한 칸 움직이는 데 걸리는 틱 수 (기본값)
+        self.ticks_per_step = ticks_per_step or math.ceil(self.engine.player.speed * 1000 / self.engine.step_ms)
+
+        map_manager = self.engine.map_manager
+        ghost_count = len(self.engine.ghosts.ghosts)
+        self.grid = np.zeros((map_manager.height, map_manager.width), dtype=np.int8)
+        self.player_pos = np.zeros(2, dtype=np.int16)
+        self.ghost_pos = np.zeros((ghost_count, 2), dtype=np.int16)
+        self.frightened = np.zeros(ghost_count, dtype=bool)
+        self.observation = {
+            'grid': self.grid,
+            'player': self.player_pos,
+            'ghosts': self.ghost_pos,
+            'frightened': self.frightened,
+        }
+        self.info = {'score': 0, 'lives': 0, 'steps': 0}
+        self.steps = 0
+        # grid에 마지막으로 반영한 펠릿 변경 기록 노드 (MapManager.pellet_log)
+        self.grid_log = None
+
+    def reset(self):
+        """새 게임을 시작하고 첫 관찰을 반환합니다."""
+        self.engine.initialize_new_game()
+        self.grid[:] = self.engine.map_manager.current_map
+        self.grid_log = self.engine.map_manager.pellet_log
+        self.steps = 0
+        self.update_observation()
+        return self.observation
+
+    def step(self, action):
+        """행동 하나를 ticks_per_step틱 동안 적용하고 (관찰, 보상, 종료 여부, 정보)를 반환합니다.
+
+        보상은 점수 증가량에서 잃은 목숨마다 death_penalty를 뺀 값입니다.
+        """
+        engine = self.engine
+        player = engine.player
+        score, lives = player.score, player.lives
+        direction = self.actions[action] if action is not None else None
+        for _ in range(self.ticks_per_step):
+            if not engine.step(direction):
+                break
+        self.sync_grid()
+        self.steps += 1
+        self.update_observation()
+        reward = (player.score - score) - self.death_penalty * (lives - player.lives)
+        done = not engine.running or self.steps >= self.max_steps
+        return self.observation, reward, done, self.info
+
+    def sync_grid(self):
+        """마지막으로 반영한 뒤 바뀐 타일만 grid에 다시 읽어 옵니다.
+
+        타일은 펠릿 수집(과 그 되돌리기)으로만 바뀌므로, 펠릿 변경 기록에서 두 노드 사이의 칸들만 보면 됩니다
+        (MapManager.restore_state와 같은 방식). 한 스텝에 여러 칸을 먹거나 먹은 틱에 죽어도 빠지지 않습니다.
+        """
+        map_manager = self.engine.map_manager
+        current, seen = map_manager.pellet_log, self.grid_log
+        while current is not seen:
+            current_depth = current[4] if current else 0
+            seen_depth = seen[4] if seen else 0
+            if current_depth >= seen_depth:
+                x, y = current[0], current[1]
+                self.grid[y, x] = map_manager.current_map[y][x]
+                current = current[3]
+            if seen_depth >= current_depth and seen is not None:
+                x, y = seen[0], seen[1]
+                self.grid[y, x] = map_manager.current_map[y][x]
+                seen = seen[3]
+        self.grid_log = map_manager.pellet_log
+
+    def update_observation(self):
+        """엔티티 위치와 상태를 관찰 배열에 제자리로 기록합니다."""
+        player = self.engine.player
+        self.player_pos[0] = player.x
+        self.player_pos[1] = player.y
+        for i, ghost in enumerate(self.engine.ghosts.ghosts):
+            self.ghost_pos[i, 0] = ghost.x
+            self.ghost_pos[i, 1] = ghost.y
+            self.frightened[i] = ghost.state == 'frightened'
+        self.info['score'] = player.score
+        self.info['lives'] = player.lives
+        self.info['steps'] = self.steps
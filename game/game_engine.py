@@ -5,13 +5,31 @@ from game.player import Player
 from ai.ghost_ai import GhostManager
 from ai.learning import PlayerLearningSystem
 import time
+import os
+import random
 from game.collision import CollisionDetector
+from game.clock import SimulationClock
+from game.replay import ReplayRecorder
 
 class GameEngine:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("AI Pac-Man")
+    def __init__(self, headless=False, game_clock=None, learning_system=None, ghost_spec=None):
+        """headless=True이면 화면, 스프라이트, 학습 데이터 파일 없이 게임 로직만 실행합니다.
+
+        게임 시간은 SimulationClock으로 프레임(advance)마다 주어진 밀리초만큼만 흐릅니다.
+        라이브 게임은 실제 프레임 시간만큼, 헤드리스 모드는 step()마다 고정 간격만큼 진행하므로
+        라이브 게임은 리플레이로 그대로 재현되고 헤드리스 모드는 실제 시간보다 빠르게 시뮬레이션할 수 있습니다.
+        학습 시스템은 learning_system으로 넘긴 경우에만 사용합니다.
+        ghost_spec은 create_ghosts의 고스트 구성입니다 (생략하면 기본 4종).
+        """
+        self.headless = headless
+        if not headless:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("AI Pac-Man")
         self.clock = pygame.time.Clock()
+        # 게임 로직이 쓰는 시계 (플레이어/고스트 이동, 리스폰, 파워업, 일시정지 타이머)
+        self.game_clock = game_clock or SimulationClock()
+        # 고정 시간 간격 (step()의 한 틱, 밀리초)
+        self.step_ms = round(1000 / FPS)
         self.running = True
         self.fps = FPS
         self.paused = False
@@ -19,21 +37,34 @@ class GameEngine:
 
         # 게임 구성요소 초기화
         self.map_manager = MapManager()
-        self.learning_system = PlayerLearningSystem()
-        self.player = Player(self.map_manager.player_start_x, self.map_manager.player_start_y, self.learning_system)
-        self.ghosts = GhostManager(self.learning_system, self.map_manager)
+        # 고스트 구성 (리플레이 헤더에 기록)
+        self.ghost_spec = ghost_spec
+        if learning_system is None and not headless:
+            learning_system = PlayerLearningSystem(self.map_manager)
+        self.learning_system = learning_system
+        self.player = Player(self.map_manager.player_start_x, self.map_manager.player_start_y, self.learning_system, self.game_clock)
+        # 헤드리스 모드는 재현 가능하도록 고스트 계획 시간 예산을 쓰지 않음 (계획 주기 AI_UPDATE_FREQUENCY는 동일)
+        self.ghosts = GhostManager(self.learning_system, self.map_manager, self.game_clock, ghost_spec,
+                                   plan_budget_us=None if headless else GHOST_PLAN_BUDGET_US)
         self.score = 0
         self.map_manager.player = self.player
         self.collision_detector = CollisionDetector(self.map_manager)
+        # 게임 로직의 난수 시드 (리플레이 헤더에 기록)와 리플레이 기록기
+        self.seed = 0
+        self.replay_recorder = None
 
     def initialize_new_game(self):
-        # 학습 데이터 및 게임 상태 초기화
-        self.learning_system.reset_learning_data()
+        # 게임 상태 초기화 - 학습 데이터는 메모리에 있는 상태를 그대로 이어서 사용 (디스크에서 다시 읽지 않음)
         self.map_manager.reset()
         self.player.reset(self.map_manager.player_start_x, self.map_manager.player_start_y)
+        # Player.reset은 목숨을 잃을 때도 쓰이므로 점수와 목숨은 여기서 따로 초기화
+        self.player.score = 0
+        self.player.lives = 3
         self.ghosts.reset()
         self.map_manager.player = self.player
         self.score = 0
+        self.running = True
+        self.paused = False
         self.collision_detector = CollisionDetector(self.map_manager)
 
     def handle_events(self):
@@ -46,7 +77,7 @@ class GameEngine:
     def update(self):
         if self.paused:
             # 일시정지 중이면 update 건너뜀
-            if time.time() - self.pause_time >= 1.0:
+            if self.game_clock.now() - self.pause_time >= 1.0:
                 self.paused = False
             else:
                 return
@@ -60,7 +91,7 @@ class GameEngine:
 
         for ghost in self.ghosts.ghosts:
             # 리스폰 대기 중인 고스트는 충돌 처리하지 않음
-            if time.time() - ghost.respawn_time < ghost.respawn_delay:
+            if self.game_clock.now() - ghost.respawn_time < ghost.respawn_delay:
                 continue
 
             ghost_pixel_pos = (ghost.x * TILE_SIZE + TILE_SIZE // 2, ghost.y * TILE_SIZE + TILE_SIZE // 2)
@@ -82,7 +113,7 @@ class GameEngine:
                     print(f"Player hit by ghost {ghost.color} (State: {getattr(ghost, 'state', 'N/A')}). Lives: {self.player.lives-1}") # 로그 추가
                     died = self.player.lose_life()
                     self.paused = True
-                    self.pause_time = time.time()
+                    self.pause_time = self.game_clock.now()
                     if died:
                         self.running = False # 게임 오버
                     self.ghosts.reset()  # 플레이어가 죽으면 모든 고스트 리셋
@@ -93,6 +124,107 @@ class GameEngine:
             print("All pellets collected! Game Over.") # 로그 추가
             self.running = False # 게임 종료
 
+    def advance(self, dt_ms, direction=None):
+        """한 프레임을 진행합니다: 입력 적용, 게임 시계를 dt_ms만큼 진행, 업데이트. 게임이 계속되면 True.
+
+        direction을 주면 키 입력 대신 플레이어의 다음 방향으로 사용합니다.
+        리플레이를 기록 중이면 이 프레임의 시간, 입력, 예산 때문에 미룬 고스트 계획을 기록합니다.
+        """
+        if direction is not None:
+            self.player.next_direction = direction
+        self.game_clock.advance(dt_ms)
+        self.ghosts.deferred_mask = 0
+        self.update()
+        if self.replay_recorder:
+            self.replay_recorder.record_tick(dt_ms, direction, self.ghosts.deferred_mask)
+        return self.running
+
+    def step(self, direction=None):
+        """고정 시간 간격 한 틱을 진행합니다 (헤드리스 시뮬레이션용). 게임이 계속되면 True."""
+        return self.advance(self.step_ms, direction)
+
+    def start_recording(self, filepath=None, seed=None):
+        """리플레이 기록을 시작합니다. 새로 만든 엔진에서 첫 프레임 전에 호출해야 그대로 재현됩니다.
+
+        filepath를 생략하면 REPLAY_DIR에 시작 시각으로 이름을 붙입니다. 시드로 게임 로직의 난수를 초기화합니다.
+        """
+        if filepath is None:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            filepath = os.path.join(REPLAY_DIR, time.strftime('%Y%m%d-%H%M%S') + REPLAY_FILE_EXTENSION)
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        random.seed(self.seed)
+        # 시작 학습 상태는 스냅샷 대신 학습 기록 로그(기준 스냅샷 + 저널 레코드)의 경로와 journal_seq로 참조
+        learning_ref = None
+        if self.learning_system:
+            if self.learning_system.learning_log_file is None:
+                self.learning_system.start_learning_log()
+            else:
+                # 시작 상태까지의 레코드를 바로 큐에 넘겨 비정상 종료 시에도 로그에 남도록 함
+                self.learning_system.flush_journal(block=True)
+            log_path = os.path.relpath(self.learning_system.learning_log_file, os.path.dirname(os.path.abspath(filepath)))
+            learning_ref = (log_path, self.learning_system.journal_seq)
+        try:
+            self.replay_recorder = ReplayRecorder(filepath, self.map_manager, self.seed, learning_ref, self.ghost_spec)
+        except OSError as e:
+            print(f"리플레이 파일 '{filepath}'을(를) 만들지 못했습니다: {e}")
+
+    def stop_recording(self):
+        """리플레이 기록을 마치고 파일을 닫습니다 (참조하는 학습 기록 로그가 다 써질 때까지 기다림)."""
+        if self.replay_recorder:
+            self.replay_recorder.close()
+            self.replay_recorder = None
+            if self.learning_system:
+                self.learning_system.sync_learning_log()
+
+    def capture_state(self):
+        """엔진 전체 상태(시계, 난수, 맵, 플레이어, 고스트, 학습)의 스냅샷을 반환합니다 (리플레이 키프레임, 탐색 분기용).
+
+        큰 상태는 복사하지 않고 공유하며(copy-on-write) 맵은 펠릿 변경 기록의 노드만 가리키므로 스냅샷 비용은 상태 크기와 무관합니다.
+        """
+        return {
+            'time_ms': self.game_clock.time_ms,
+            'random': random.getstate(),
+            'engine': (self.running, self.paused, self.pause_time, self.score),
+            'map': self.map_manager.capture_state(),
+            'player': self.player.capture_state(),
+            'ghosts': self.ghosts.capture_state(),
+            'learning': self.learning_system.capture_state() if self.learning_system else None,
+        }
+
+    def restore_state(self, state):
+        """capture_state로 저장한 상태로 되돌립니다. 비용은 스냅샷 이후 바뀐 펠릿 수에 비례합니다.
+
+        같은 스냅샷으로 여러 번 되돌릴 수 있고, 나중에 찍은 스냅샷으로 다시 앞으로 갈 수도 있습니다.
+        """
+        self.game_clock.time_ms = state['time_ms']
+        random.setstate(state['random'])
+        self.running, self.paused, self.pause_time, self.score = state['engine']
+        self.map_manager.restore_state(state['map'])
+        self.player.restore_state(state['player'])
+        self.ghosts.restore_state(state['ghosts'])
+        if self.learning_system and state['learning'] is not None:
+            self.learning_system.restore_state(state['learning'])
+
+    def bitboard_state(self):
+        """보드 상태를 정수 몇 개로 나타낸 튜플 (남은 펠릿, 남은 파워 펠릿, 플레이어 위치, 고스트별 위치 비트보드).
+
+        같은 배치면 같은 값이므로 탐색에서 상태 비교/해시 키로 바로 쓸 수 있습니다 (시간, 점수 등은 포함하지 않음).
+        """
+        map_manager = self.map_manager
+        bitboards = map_manager.bitboards
+        return (map_manager.pellet_bits, map_manager.power_pellet_bits, bitboards.bit(self.player.x, self.player.y),
+                tuple(bitboards.bit(ghost.x, ghost.y) for ghost in self.ghosts.ghosts))
+
+    def run_headless(self, max_steps=100000, policy=None):
+        """게임이 끝나거나 max_steps틱이 될 때까지 step()을 반복하고 최종 점수를 반환합니다.
+
+        policy(engine)는 틱마다 플레이어의 다음 방향(또는 None)을 돌려주는 함수입니다.
+        """
+        for _ in range(max_steps):
+            if not self.step(policy(self) if policy else None):
+                break
+        return self.player.score
+
     def render(self):
         self.screen.fill(BLACK)
         self.map_manager.render(self.screen)
@@ -118,11 +250,18 @@ class GameEngine:
         self.render()
         pygame.display.flip()
         time.sleep(1)
+        if REPLAY_RECORDING:
+            self.start_recording()
+        self.clock.tick()
+        frame_ms = self.step_ms
         while self.running:
+            direction = self.player.next_direction
             self.handle_events()
-            self.update()
+            # 게임 시계는 지난 프레임에 실제로 걸린 시간만큼 진행 (바뀐 키 입력만 기록)
+            self.advance(frame_ms, self.player.next_direction if self.player.next_direction != direction else None)
             self.render()
-            self.clock.tick(self.fps)
+            frame_ms = self.clock.tick(self.fps)
+        self.stop_recording()
 
         # 게임 루프 종료 후 최종 점수 표시 및 학습 데이터 저장
         self.show_final_score()
@@ -148,14 +287,14 @@ class GameEngine:
         while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    # 게임 종료 전 학습 데이터 저장
-                    self.learning_system.save_learning_data('learning_data.json')
+                    # 게임 종료 전 남은 학습 저널 기록 (스냅샷은 주기적으로 저장됨)
+                    self.learning_system.close()
                     pygame.quit()
                     quit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
-                        # 게임 종료 전 학습 데이터 저장
-                        self.learning_system.save_learning_data('learning_data.json')
+                        # 게임 종료 전 남은 학습 저널 기록 (스냅샷은 주기적으로 저장됨)
+                        self.learning_system.close()
                         pygame.quit()
                         quit()
 
@@ -1,14 +1,20 @@
 # map_manager.py - 미로 맵 관리 시스템
 
 import pygame
-import copy
+from collections import deque
+import numpy as np
 from game.constants import *
+from game.bitboard import BitboardLayout, popcount
 import os
 
 class MapManager:
     def __init__(self):
         self.original_map = self.load_map_from_file(os.path.join('assets', 'map.txt'))
-        self.reset()
+        self.load_layout()
+        # 벽 구조가 바뀔 때마다 증가하는 맵 버전 (경로 캐시 무효화 기준)
+        self.map_version = 0
+        # 벽은 게임 중 바뀌지 않으므로 맵당 한 번만 거리/다음 칸 테이블을 만듭니다.
+        self.build_path_tables()
         self.player_start_x, self.player_start_y = self.player_spawn_point
 
     def load_map_from_file(self, filepath):
@@ -25,16 +31,68 @@ class MapManager:
             from game.constants import DEFAULT_MAP
             return DEFAULT_MAP
 
-    def reset(self):
-        self.current_map = copy.deepcopy(self.original_map)
+    def load_layout(self):
+        """원본 맵을 한 번 복사해 현재 맵으로 삼고 펠릿, 스폰 위치 등을 읽습니다 (맵을 불러올 때 한 번)."""
+        self.current_map = [row[:] for row in self.original_map]
+        # 펠릿 변경 기록: 수집할 때마다 (x, y, 이전 타일, 부모 기록, 깊이) 노드를 앞에 붙이는 연결 리스트
+        # 노드는 바뀌지 않으므로 상태 저장은 현재 노드를 가리키기만 하면 되고, 되돌릴 때는 두 노드 사이의 차이만 적용합니다.
+        self.pellet_log = None
         self.width = len(self.current_map[0])
         self.height = len(self.current_map)
-        self.pellets_remaining = sum(row.count(PELLET) + row.count(POWER_PELLET) for row in self.current_map)
+        # 비트보드 표현: 벽은 배치에, 남은 펠릿/파워 펠릿은 정수 비트로 (collect_pellet, restore_state에서 함께 갱신)
+        self.bitboards = BitboardLayout(self.original_map)
+        self.pellet_bits = self.bitboards.from_tiles(self.current_map, PELLET)
+        self.power_pellet_bits = self.bitboards.from_tiles(self.current_map, POWER_PELLET)
+        # 남은 펠릿(파워 펠릿 포함) 위치 인덱스 - collect_pellet에서 함께 갱신
+        self.pellet_positions = {(x, y) for y, row in enumerate(self.current_map) for x, v in enumerate(row) if v in (PELLET, POWER_PELLET)}
         self.power_pellets = [(x, y) for y, row in enumerate(self.current_map) for x, v in enumerate(row) if v == POWER_PELLET]
         self.ghost_spawn_points = [(x, y) for y, row in enumerate(self.current_map) for x, v in enumerate(row) if v == GHOST_SPAWN]
         self.player_spawn_point = next(((x, y) for y, row in enumerate(self.current_map) for x, v in enumerate(row) if v == PLAYER_SPAWN), (1, 1))
         self.player_start_x, self.player_start_y = self.player_spawn_point
 
+    @property
+    def pellets_remaining(self):
+        """남은 펠릿(파워 펠릿 포함) 수"""
+        return popcount(self.pellet_bits | self.power_pellet_bits)
+
+    def reset(self):
+        """맵을 처음 상태로 되돌립니다. 맵 전체를 다시 복사하지 않고 이번 게임에서 먹은 펠릿만 되돌립니다."""
+        self.restore_state(None)
+        self.player_start_x, self.player_start_y = self.player_spawn_point
+
+    def capture_state(self):
+        """현재 펠릿 상태를 나타내는 펠릿 변경 기록 노드를 반환합니다 (복사 없이 O(1))."""
+        return self.pellet_log
+
+    def restore_state(self, state):
+        """capture_state로 얻은 펠릿 상태로 되돌립니다 (None은 처음 상태).
+
+        현재 기록과 목표 기록의 공통 조상까지 현재 쪽 변경을 되돌리고 목표 쪽 변경을 다시 적용하므로,
+        비용은 두 상태 사이에 바뀐 펠릿 수에 비례합니다 (앞뒤 어느 쪽 상태로도 이동 가능).
+        """
+        current, target = self.pellet_log, state
+        redo = []
+        while current is not target:
+            current_depth = current[4] if current else 0
+            target_depth = target[4] if target else 0
+            if current_depth >= target_depth:
+                x, y, tile, current, _ = current
+                self.current_map[y][x] = tile
+                self.pellet_positions.add((x, y))
+                if tile == PELLET:
+                    self.pellet_bits |= self.bitboards.bit(x, y)
+                else:
+                    self.power_pellet_bits |= self.bitboards.bit(x, y)
+            if target_depth >= current_depth and target is not None:
+                redo.append(target)
+                target = target[3]
+        for x, y, _, _, _ in reversed(redo):
+            self.current_map[y][x] = EMPTY
+            self.pellet_positions.discard((x, y))
+            self.pellet_bits &= ~self.bitboards.bit(x, y)
+            self.power_pellet_bits &= ~self.bitboards.bit(x, y)
+        self.pellet_log = state
+
     def is_wall(self, x, y):
         if x < 0 or x >= self.width or y < 0 or y >= self.height:
             return True
@@ -47,14 +105,15 @@ class MapManager:
 
     def collect_pellet(self, x, y):
         tile = self.current_map[y][x]
-        if tile == PELLET:
+        if tile == PELLET or tile == POWER_PELLET:
             self.current_map[y][x] = EMPTY
-            self.pellets_remaining -= 1
-            return PELLET_SCORE
-        elif tile == POWER_PELLET:
-            self.current_map[y][x] = EMPTY
-            self.pellets_remaining -= 1
-            return POWER_PELLET_SCORE
+            self.pellet_positions.discard((x, y))
+            if tile == PELLET:
+                self.pellet_bits &= ~self.bitboards.bit(x, y)
+            else:
+                self.power_pellet_bits &= ~self.bitboards.bit(x, y)
+            self.pellet_log = (x, y, tile, self.pellet_log, self.pellet_log[4] + 1 if self.pellet_log else 1)
+            return PELLET_SCORE if tile == PELLET else POWER_PELLET_SCORE
         return 0
 
     def render(self, screen):
@@ -78,6 +137,174 @@ class MapManager:
                 valid_tiles.append((next_x, next_y))
         return valid_tiles
 
+    def build_path_tables(self):
+        """모든 이동 가능 타일 쌍의 최단 거리와 다음 칸 테이블을 BFS로 미리 계산합니다."""
+        grid = self.original_map
+        height, width = len(grid), len(grid[0])
+
+        # 타일 좌표 -> 테이블 인덱스 (벽은 -1)
+        self.tile_index = np.full((height, width), -1, dtype=np.int16)
+        self.walkable_tiles = []
+        for y, row in enumerate(grid):
+            for x, v in enumerate(row):
+                if v != WALL:
+                    self.tile_index[y, x] = len(self.walkable_tiles)
+                    self.walkable_tiles.append((x, y))
+        tile_count = len(self.walkable_tiles)
+
+        # 방향별 인접 타일 인덱스 (DIRECTIONS 순서, 벽이면 -1)
+        self.neighbor_table = np.full((tile_count, len(DIRECTIONS)), -1, dtype=np.int16)
+        adjacency = []
+        for i, (x, y) in enumerate(self.walkable_tiles):
+            neighbors = []
+            for d, (dx, dy) in enumerate(DIRECTIONS.values()):
+                nx, ny = x + dx, y + dy
+                if 0 <= ny < height and 0 <= nx < width and grid[ny][nx] != WALL:
+                    self.neighbor_table[i, d] = self.tile_index[ny, nx]
+                    neighbors.append(int(self.tile_index[ny, nx]))
+            adjacency.append(neighbors)
+        self.adjacency = adjacency
+
+        # distance_table[src, goal]: 미로 거리 (도달 불가 -1)
+        # next_hop_table[src, goal]: src에서 goal로 가기 위한 다음 칸 인덱스 (src == goal이면 자기 자신)
+        self.distance_table = np.full((tile_count, tile_count), -1, dtype=np.int16)
+        self.next_hop_table = np.full((tile_count, tile_count), -1, dtype=np.int16)
+        for goal in range(tile_count):
+            # goal에서 역방향 BFS: 먼저 발견한 부모가 곧 goal 쪽으로의 다음 칸
+            dist_col = [-1] * tile_count
+            hop_col = [-1] * tile_count
+            dist_col[goal] = 0
+            hop_col[goal] = goal
+            queue = deque([goal])
+            while queue:
+                current = queue.popleft()
+                next_dist = dist_col[current] + 1
+                for neighbor in adjacency[current]:
+                    if dist_col[neighbor] < 0:
+                        dist_col[neighbor] = next_dist
+                        hop_col[neighbor] = current
+                        queue.append(neighbor)
+            self.distance_table[:, goal] = dist_col
+            self.next_hop_table[:, goal] = hop_col
+        self.build_junction_graph()
+        self.map_version += 1
+
+    def build_junction_graph(self):
+        """교차로/막다른 길을 노드로, 그 사이 복도를 길이가 있는 간선으로 하는 압축 그래프를 만듭니다."""
+        adjacency = self.adjacency
+        # 이동 가능한 방향이 2개가 아닌 타일(교차로, 막다른 길)이 노드
+        self.intersection_tiles = {self.walkable_tiles[i] for i, n in enumerate(adjacency) if len(n) >= 3}
+        nodes = [i for i, n in enumerate(adjacency) if len(n) != 2]
+        node_set = set(nodes)
+
+        # corridors[cid] = (a, b, 내부 타일 인덱스 리스트 a→b 순서), 간선 길이는 len(내부) + 1
+        # junction_edges[node] = [(이웃 노드, 길이, cid, a→b 방향 여부), ...]
+        # corridor_of_tile[내부 타일] = (cid, 내부 리스트에서의 위치)
+        self.corridors = []
+        self.junction_edges = {}
+        self.corridor_of_tile = {}
+        direct_pairs = set()
+
+        def walk_corridors(node):
+            for first in adjacency[node]:
+                if first in self.corridor_of_tile:
+                    continue
+                if first in node_set:
+                    # 내부 타일 없이 바로 붙은 두 노드 (한 번만 추가)
+                    pair = (min(node, first), max(node, first))
+                    if pair in direct_pairs:
+                        continue
+                    direct_pairs.add(pair)
+                    add_corridor(node, first, [])
+                    continue
+                tiles = [first]
+                prev, current = node, first
+                while True:
+                    nxt = adjacency[current][0] if adjacency[current][0] != prev else adjacency[current][1]
+                    if nxt in node_set:
+                        break
+                    tiles.append(nxt)
+                    prev, current = current, nxt
+                add_corridor(node, nxt, tiles)
+
+        def add_corridor(a, b, tiles):
+            cid = len(self.corridors)
+            self.corridors.append((a, b, tiles))
+            for offset, tile in enumerate(tiles):
+                self.corridor_of_tile[tile] = (cid, offset)
+            length = len(tiles) + 1
+            self.junction_edges.setdefault(a, []).append((b, length, cid, True))
+            self.junction_edges.setdefault(b, []).append((a, length, cid, False))
+
+        for node in nodes:
+            self.junction_edges.setdefault(node, [])
+            walk_corridors(node)
+        # 노드가 하나도 없는 순환 복도는 임의의 타일을 노드로 삼아 처리
+        for i in range(len(adjacency)):
+            if i not in node_set and i not in self.corridor_of_tile:
+                node_set.add(i)
+                self.junction_edges.setdefault(i, [])
+                walk_corridors(i)
+        self.junction_nodes = node_set
+
+    def snap_to_junctions(self, tile):
+        """타일에서 속한 복도의 양 끝 노드까지의 구간을 반환합니다.
+
+        [(노드, tile(제외)부터 노드(포함)까지의 타일 인덱스 리스트), ...] 형식이며
+        타일 자체가 노드면 [(tile, [])]를 반환합니다.
+        """
+        if tile in self.junction_nodes:
+            return [(tile, [])]
+        cid, offset = self.corridor_of_tile[tile]
+        a, b, tiles = self.corridors[cid]
+        return [
+            (a, tiles[offset - 1::-1] + [a] if offset > 0 else [a]),
+            (b, tiles[offset + 1:] + [b]),
+        ]
+
+    def is_intersection(self, x, y):
+        """이동 가능한 방향이 3개 이상인 교차로 타일인지 확인합니다."""
+        return (x, y) in self.intersection_tiles
+
+    def get_tile_index(self, x, y):
+        """타일 좌표의 테이블 인덱스를 반환합니다. 벽이거나 맵 밖이면 -1."""
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return -1
+        return int(self.tile_index[y, x])
+
+    def get_maze_distance(self, start, goal):
+        """두 타일 사이의 미로 거리를 O(1)로 반환합니다. 도달할 수 없으면 -1."""
+        start_index = self.get_tile_index(*start)
+        goal_index = self.get_tile_index(*goal)
+        if start_index < 0 or goal_index < 0:
+            return -1
+        return int(self.distance_table[start_index, goal_index])
+
+    def get_next_step(self, start, goal):
+        """start에서 goal로 가는 최단 경로의 다음 칸을 O(1)로 반환합니다. 없으면 None."""
+        start_index = self.get_tile_index(*start)
+        goal_index = self.get_tile_index(*goal)
+        if start_index < 0 or goal_index < 0 or start_index == goal_index:
+            return None
+        next_index = self.next_hop_table[start_index, goal_index]
+        if next_index < 0:
+            return None
+        return self.walkable_tiles[next_index]
+
+    def get_table_path(self, start, goal):
+        """다음 칸 테이블을 따라 start(제외)부터 goal(포함)까지의 경로를 반환합니다. 없으면 []."""
+        start_index = self.get_tile_index(*start)
+        goal_index = self.get_tile_index(*goal)
+        if start_index < 0 or goal_index < 0 or self.distance_table[start_index, goal_index] <= 0:
+            return []
+        hops = self.next_hop_table[:, goal_index]
+        path = []
+        current = start_index
+        while current != goal_index:
+            current = int(hops[current])
+            path.append(self.walkable_tiles[current])
+        return path
+
     def get_spawn_positions(self):
         return {
             'player': self.player_spawn_point,
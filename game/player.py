@@ -1,10 +1,12 @@
 import pygame
-import time
 from game.constants import *
+from game.clock import RealClock
 import os
 
 class Player:
-    def __init__(self, x, y, learning_system=None):
+    def __init__(self, x, y, learning_system=None, clock=None):
+        # 시간 측정용 시계 (기본값은 실제 시간, 헤드리스 시뮬레이션에서는 SimulationClock 주입)
+        self.clock = clock or RealClock()
         self.start_x = x
         self.start_y = y
         self.x = x
@@ -12,7 +14,7 @@ class Player:
         self.direction = 'RIGHT'
         self.next_direction = 'RIGHT'
         self.speed = 0.1  # 타일당 이동 시간(초)
-        self.last_move_time = time.time()
+        self.last_move_time = self.clock.now()
         self.score = 0
         self.lives = 3
         self.powered_up = False
@@ -20,9 +22,15 @@ class Player:
         self.power_duration = 3 # 파워 펠릿 지속 시간 (초)
         self.move_history = []
         self.last_positions = []
+        # move_history/last_positions를 저장된 상태(capture_state)와 공유 중이면 True - 바꾸기 전에 복사 (copy-on-write)
+        self.history_shared = False
         self.learning_system = learning_system
-        self.last_pellet_time = time.time()
+        self.last_pellet_time = self.clock.now()
         self.frame_count = 0
+        # 스프라이트는 처음 그릴 때 불러옴 (화면 없이 실행하는 헤드리스 모드에서는 불러오지 않음)
+        self.player_imgs = None
+
+    def load_sprites(self):
         self.player_imgs = [
             pygame.image.load(os.path.join('assets', 'sprites', 'player_0.png')).convert_alpha(),
             pygame.image.load(os.path.join('assets', 'sprites', 'player_1.png')).convert_alpha()
@@ -33,7 +41,7 @@ class Player:
             self.next_direction = KEY_MAPPING[event.key]
 
     def update(self, map_manager, ghost_positions):
-        current_time = time.time()
+        current_time = self.clock.now()
         if self.powered_up and current_time - self.power_time > self.power_duration:
             self.powered_up = False
         if current_time - self.last_move_time >= self.speed:
@@ -62,11 +70,11 @@ class Player:
         self.score += score
         if score == POWER_PELLET_SCORE:
             self.powered_up = True
-            self.power_time = time.time()
+            self.power_time = self.clock.now()
             # 파워펠릿 먹은 타이밍 기록
             if self.learning_system:
-                self.learning_system.power_pellet_timing.append(time.time() - self.last_pellet_time)
-            self.last_pellet_time = time.time()
+                self.learning_system.record_power_pellet_timing(self.clock.now() - self.last_pellet_time)
+            self.last_pellet_time = self.clock.now()
         # 이동 데이터 분석
         if self.learning_system and moved:
             # 코너링 습관: 방향 전환 시점 기록
@@ -82,11 +90,15 @@ class Player:
             }, ghost_positions)
 
     def record_move(self, from_pos, to_pos):
+        if self.history_shared:
+            self.move_history = list(self.move_history)
+            self.last_positions = list(self.last_positions)
+            self.history_shared = False
         move_data = {
             'from': from_pos,
             'to': to_pos,
             'direction': self.direction,
-            'timestamp': time.time()
+            'timestamp': self.clock.now()
         }
         self.move_history.append(move_data)
         self.last_positions.append(to_pos)
@@ -105,6 +117,8 @@ class Player:
         self.powered_up = False
 
     def render(self, screen):
+        if self.player_imgs is None:
+            self.load_sprites()
         # 애니메이션: 프레임 카운터로 입 열고 닫기
         self.frame_count = (self.frame_count + 1) % 30
         img_idx = 0 if self.frame_count < 15 else 1
@@ -123,6 +137,18 @@ class Player:
         rotated_img = pygame.transform.rotate(player_img, angle)
         screen.blit(rotated_img, rect)
 
+    def capture_state(self):
+        """위치, 방향, 타이머, 점수 등의 상태를 반환합니다. 이동 기록 목록은 복사하지 않고 공유합니다 (copy-on-write)."""
+        self.history_shared = True
+        return (self.x, self.y, self.direction, self.next_direction, self.last_move_time, self.score, self.lives,
+                self.powered_up, self.power_time, self.last_pellet_time, self.move_history, self.last_positions)
+
+    def restore_state(self, state):
+        """capture_state로 저장한 상태로 되돌립니다."""
+        (self.x, self.y, self.direction, self.next_direction, self.last_move_time, self.score, self.lives,
+         self.powered_up, self.power_time, self.last_pellet_time, self.move_history, self.last_positions) = state
+        self.history_shared = True
+
     def lose_life(self):
         """생명 잃기"""
         self.lives -= 1
@@ -137,10 +163,11 @@ class Player:
         """파워업 남은 시간"""
         if not self.powered_up:
             return 0
-        elapsed = time.time() - self.power_time
+        elapsed = self.clock.now() - self.power_time
         return max(0, self.power_duration - elapsed)
 
     def clear_learning_data(self):
         """학습 데이터 초기화 (새 게임 시작 시)"""
-        self.move_history.clear()
-        self.last_positions.clear()
\ No newline at end of file
+        self.move_history = []
+        self.last_positions = []
+        self.history_shared = False
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""리플레이 파일 형식: 게임을 처음 상태와 프레임별 입력만으로 기록합니다.
+
+[헤더 34바이트] 매직 b'PMRP', 버전(uint16), 맵 해시(SHA-1 20바이트), 시드(uint64)
+[고스트 구성] 길이(uint16) + normalize_ghost_spec 결과의 JSON (UTF-8, 버전 2부터. 버전 1은 기본 구성)
+[본문] zlib 스트림:
+    시작 학습 상태 참조: 학습 기록 로그 경로 길이(varint) + 경로(UTF-8, 리플레이 파일 디렉터리 기준) + journal_seq(varint)
+    (학습 시스템이 없으면 길이 0. 버전 2까지는 바이너리 학습 파일 내용을 길이(varint)와 함께 그대로 넣었음)
+    프레임마다 varint 하나: (zigzag(이번 dt - 이전 dt) << 4) | (고스트 계획 미룸 여부 << 3) | (방향 인덱스 + 1, 입력 없으면 0)
+    미룸 여부가 1이면 미룬 고스트 비트마스크(varint)가 이어집니다.
+dt(밀리초)는 앞 프레임과의 차이로 기록하므로 프레임 시간이 일정하면 프레임당 1바이트이고, zlib으로 한 번 더 줄어듭니다.
+본문은 기록하는 동안 조금씩 써서 게임이 비정상 종료되어도 그때까지의 프레임은 읽을 수 있습니다.
+"""
+import hashlib
+import json
+import struct
+import zlib
+import numpy as np
+from game.constants import *
+from ai.ghost_types import normalize_ghost_spec
+from ai.learning import unpack_learning_file, decode_learning_columns
+
+REPLAY_MAGIC = b'PMRP'
+REPLAY_VERSION = 3
+REPLAY_HEADER = struct.Struct('<4sH20sQ')
+REPLAY_SPEC_LENGTH = struct.Struct('<H')
+REPLAY_DIRECTIONS = list(DIRECTIONS)
+# 압축기에 모아 둔 프레임 기록을 파일로 내보내는 간격 (프레임 수)
+REPLAY_FLUSH_TICKS = 600
+
+def map_hash(map_manager):
+    """맵(벽, 펠릿 배치 등 처음 상태)의 SHA-1 해시. 다른 맵에서 재생하는 것을 막는 데 사용합니다."""
+    original = np.array(map_manager.original_map, dtype=np.int8)
+    return hashlib.sha1(struct.pack('<HH', *original.shape) + original.tobytes()).digest()
+
+def encode_varint(value, out):
+    """0 이상의 정수를 7비트씩 나눠 out(bytearray)에 덧붙입니다."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varint(buffer, position):
+    """buffer[position]부터 varint 하나를 읽어 (값, 다음 위치)를 반환합니다."""
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+class ReplayRecorder:
+    """프레임별 입력을 리플레이 파일에 기록합니다."""
+    def __init__(self, filepath, map_manager, seed, learning_ref=None, ghost_spec=None):
+        """learning_ref는 시작 학습 상태를 담은 학습 기록 로그의 (경로, journal_seq)입니다 (학습 시스템이 없으면 None)."""
+        spec_bytes = json.dumps(normalize_ghost_spec(ghost_spec), separators=(',', ':')).encode('utf-8')
+        self.filepath = filepath
+        self.file = open(filepath, 'wb')
+        self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, map_hash(map_manager), seed))
+        self.file.write(REPLAY_SPEC_LENGTH.pack(len(spec_bytes)) + spec_bytes)
+        self.compressor = zlib.compressobj(9)
+        self.buffer = bytearray()
+        name_bytes = learning_ref[0].encode('utf-8') if learning_ref is not None else b''
+        encode_varint(len(name_bytes), self.buffer)
+        if name_bytes:
+            self.buffer += name_bytes
+            encode_varint(learning_ref[1], self.buffer)
+        self.previous_dt = 0
+        self.ticks = 0
+
+    def record_tick(self, dt_ms, direction=None, deferred_mask=0):
+        """한 프레임의 진행 시간(밀리초), 입력 방향(없으면 None), 예산 때문에 미룬 고스트 비트마스크를 기록합니다."""
+        delta = dt_ms - self.previous_dt
+        self.previous_dt = dt_ms
+        code = REPLAY_DIRECTIONS.index(direction) + 1 if direction is not None else 0
+        encode_varint(((delta << 1) ^ (delta >> 63)) << 4 | (8 if deferred_mask else 0) | code, self.buffer)
+        if deferred_mask:
+            encode_varint(deferred_mask, self.buffer)
+        self.ticks += 1
+        if self.ticks % REPLAY_FLUSH_TICKS == 0:
+            self.flush()
+
+    def flush(self):
+        """모아 둔 기록을 압축해서 파일에 씁니다 (읽을 수 있도록 압축 블록을 마무리)."""
+        self.file.write(self.compressor.compress(bytes(self.buffer)) + self.compressor.flush(zlib.Z_SYNC_FLUSH))
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.write(self.compressor.compress(bytes(self.buffer)) + self.compressor.flush())
+        self.buffer.clear()
+        self.file.close()
+
+def read_replay(filepath):
+    """리플레이 파일을 읽어 헤더 딕셔너리와 프레임 배열들을 반환합니다.
+
+    'learning_ref'는 시작 학습 상태를 담은 학습 기록 로그의 (경로, journal_seq)이고, 버전 2까지의 파일은 대신 'learning_state'에 상태가 들어 있습니다.
+    'ghost_spec'은 기록한 고스트 구성이며 (버전 1 파일은 기본 구성) 이 코드로 만들 수 없으면 ValueError를 발생시킵니다.
+    반환값의 'dt'는 프레임별 진행 시간(밀리초), 'direction'은 방향 인덱스(입력 없으면 -1), 'deferred'는 미룬 고스트 비트마스크입니다.
+    기록 중 끊긴 파일은 읽을 수 있는 데까지만 읽습니다.
+    """
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    if len(data) < REPLAY_HEADER.size:
+        raise ValueError("리플레이 파일이 아닙니다.")
+    magic, version, hash_bytes, seed = REPLAY_HEADER.unpack_from(data, 0)
+    if magic != REPLAY_MAGIC:
+        raise ValueError("리플레이 파일이 아닙니다.")
+    if version > REPLAY_VERSION:
+        raise ValueError(f"지원하지 않는 리플레이 파일 버전입니다: {version}")
+    position = REPLAY_HEADER.size
+    ghost_spec = None
+    if version >= 2:
+        (spec_length,) = REPLAY_SPEC_LENGTH.unpack_from(data, position)
+        position += REPLAY_SPEC_LENGTH.size
+        ghost_spec = json.loads(data[position:position + spec_length].decode('utf-8'))
+        position += spec_length
+    ghost_spec = normalize_ghost_spec(ghost_spec)
+    body = zlib.decompressobj().decompress(data[position:])
+
+    learning_length, position = decode_varint(body, 0)
+    learning_state = None
+    learning_ref = None
+    if learning_length and version >= 3:
+        name = body[position:position + learning_length].decode('utf-8')
+        seq, position = decode_varint(body, position + learning_length)
+        learning_ref = (name, seq)
+    else:
+        if learning_length:
+            learning_state = decode_learning_columns(*unpack_learning_file(body[position:position + learning_length]))
+        position += learning_length
+
+    dts, directions, deferred = [], [], []
+    dt = 0
+    end = len(body)
+    try:
+        while position < end:
+            value, position = decode_varint(body, position)
+            zigzag = value >> 4
+            dt += (zigzag >> 1) ^ -(zigzag & 1)
+            dts.append(dt)
+            directions.append((value & 7) - 1)
+            mask = 0
+            if value & 8:
+                mask, position = decode_varint(body, position)
+            deferred.append(mask)
+    except IndexError:
+        # 마지막 기록이 잘린 경우 (비정상 종료)
+        del dts[len(deferred):], directions[len(deferred):]
+    return {
+        'version': version,
+        'map_hash': hash_bytes,
+        'seed': seed,
+        'learning_state': learning_state,
+        'learning_ref': learning_ref,
+        'ghost_spec': ghost_spec,
+        'dt': np.array(dts, dtype=np.int64),
+        'direction': np.array(directions, dtype=np.int8),
+        'deferred': np.array(deferred, dtype=np.int64),
+    }
@@ -0,0 +1,138 @@
+"""리플레이 재생기: 기록된 게임을 화면 없이 다시 시뮬레이션합니다.
+
+사용법:
+    python -m game.replay_player 리플레이파일 [--seek 틱]
+"""
+import argparse
+import bisect
+import os
+import random
+import shutil
+import tempfile
+import time
+from game.constants import *
+from game.clock import SimulationClock
+from game.game_engine import GameEngine
+from game.map_manager import MapManager
+from game.replay import read_replay, map_hash, REPLAY_DIRECTIONS
+from ai.learning import PlayerLearningSystem, read_learning_file, read_learning_log, is_learning_binary_file
+
+def load_learning_log(replay_file, name, journal_seq):
+    """리플레이가 참조하는 학습 기록 로그를 읽어 (기준 학습 상태, journal_seq까지 적용할 저널 레코드)를 반환합니다.
+
+    name은 리플레이 파일 디렉터리 기준 경로입니다. 기록 로그가 없거나 journal_seq 시점의 상태를 만들 수 없으면
+    (학습 데이터를 처음부터 다시 시작해 로그를 새로 쓴 경우 등) ValueError. 단일 스냅샷 파일(레코드 없음)도 읽습니다.
+    """
+    path = os.path.join(os.path.dirname(replay_file), name)
+    try:
+        if is_learning_binary_file(path):
+            state, records = read_learning_file(path), []
+        else:
+            state, records = read_learning_log(path)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"리플레이의 학습 기록 로그 '{path}'을(를) 읽지 못했습니다: {e}")
+    base_seq = state['journal_seq']
+    records = [record for record in records if base_seq < record[1] <= journal_seq]
+    # 순번은 레코드마다 1씩 늘어나므로 빠진 레코드 없이 journal_seq까지 이어져야 함
+    if [record[1] for record in records] != list(range(base_seq + 1, journal_seq + 1)):
+        raise ValueError(f"학습 기록 로그 '{path}'에 리플레이를 기록할 때의 학습 상태까지의 기록이 없습니다.")
+    return state, records
+
+class ReplayPlayer:
+    """리플레이 파일을 헤드리스 엔진으로 결정적으로 다시 시뮬레이션합니다.
+
+    재생하면서 keyframe_interval틱마다 엔진 상태를 복사해 두고, seek()는 목표 틱 이전의 가장 가까운
+    키프레임으로 되돌린 뒤 그 뒤만 다시 시뮬레이션합니다.
+    """
+    def __init__(self, filepath, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        self.replay = read_replay(filepath)
+        self.keyframe_interval = keyframe_interval
+        self.temp_dir = None
+        map_manager = MapManager()
+        if map_hash(map_manager) != self.replay['map_hash']:
+            raise ValueError("리플레이를 기록한 맵과 현재 맵이 다릅니다.")
+        learning_state, learning_records = self.replay['learning_state'], []
+        if self.replay['learning_ref'] is not None:
+            learning_state, learning_records = load_learning_log(filepath, *self.replay['learning_ref'])
+        learning_system = None
+        if learning_state is not None:
+            # 재생 중 학습 기록이 실제 학습 데이터 파일에 섞이지 않도록 임시 디렉터리를 사용
+            self.temp_dir = tempfile.mkdtemp(prefix='replay_')
+            learning_system = PlayerLearningSystem(map_manager, data_file=os.path.join(self.temp_dir, LEARNING_DATA_FILE),
+                                                   legacy_file=None, pretrained_file=None)
+            learning_system.import_learning_state(learning_state)
+            learning_system.apply_journal_records(learning_records)
+        self.engine = GameEngine(headless=True, game_clock=SimulationClock(), learning_system=learning_system,
+                                 ghost_spec=self.replay['ghost_spec'])
+        self.engine.seed = self.replay['seed']
+        random.seed(self.engine.seed)
+        # 리플레이의 기록대로만 고스트 계획을 미룸 (실행 시간 예산은 사용하지 않음)
+        self.engine.ghosts.plan_budget_us = None
+        self.tick = 0
+        self.keyframe_ticks = [0]
+        self.keyframes = {0: self.engine.capture_state()}
+
+    @property
+    def length(self):
+        """기록된 틱 수"""
+        return len(self.replay['dt'])
+
+    def step(self):
+        """기록된 다음 틱 하나를 재생합니다. 재생할 틱이 남아 있으면 True."""
+        if self.tick >= self.length:
+            return False
+        direction = int(self.replay['direction'][self.tick])
+        self.engine.ghosts.replay_deferred = int(self.replay['deferred'][self.tick])
+        self.engine.advance(int(self.replay['dt'][self.tick]), REPLAY_DIRECTIONS[direction] if direction >= 0 else None)
+        self.tick += 1
+        if self.tick % self.keyframe_interval == 0 and self.tick not in self.keyframes:
+            self.keyframe_ticks.append(self.tick)
+            self.keyframes[self.tick] = self.engine.capture_state()
+        return self.tick < self.length
+
+    def seek(self, tick):
+        """지정한 틱 직후의 상태로 이동합니다 (앞뒤 모두 가능)."""
+        tick = max(0, min(tick, self.length))
+        keyframe = self.keyframe_ticks[bisect.bisect_right(self.keyframe_ticks, tick) - 1]
+        # 뒤로 가거나, 앞으로 가더라도 현재 위치보다 목표에 가까운 키프레임이 있으면 거기서부터 다시 시뮬레이션
+        if tick < self.tick or keyframe > self.tick:
+            self.engine.restore_state(self.keyframes[keyframe])
+            self.tick = keyframe
+        while self.tick < tick:
+            self.step()
+
+    def play(self):
+        """끝까지 재생하고 최종 점수를 반환합니다."""
+        while self.step():
+            pass
+        return self.engine.player.score
+
+    def close(self):
+        if self.engine.learning_system:
+            self.engine.learning_system.close()
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+def main():
+    parser = argparse.ArgumentParser(description="리플레이 파일을 화면 없이 다시 시뮬레이션합니다.")
+    parser.add_argument('replay', help="리플레이 파일 경로")
+    parser.add_argument('--seek', type=int, default=None, help="이 틱까지만 재생하고 상태를 출력")
+    args = parser.parse_args()
+    player = ReplayPlayer(args.replay)
+    try:
+        started = time.perf_counter()
+        if args.seek is None:
+            player.play()
+        else:
+            player.seek(args.seek)
+        elapsed = time.perf_counter() - started
+        engine = player.engine
+        game_time = engine.game_clock.now()
+        print(f"틱 {player.tick}/{player.length}, 게임 시간 {game_time:.1f}초, 점수 {engine.player.score}, 목숨 {engine.player.lives}")
+        print(f"재생 시간 {elapsed:.2f}초 (실제 속도의 {game_time / max(elapsed, 1e-9):.0f}배)")
+    finally:
+        player.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from game.map_manager import MapManager
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    # MapManager는 현재 디렉터리 기준으로 assets/map.txt를 읽음
+    monkeypatch.chdir(ROOT)
+
+@pytest.fixture
+def map_manager():
+    return MapManager()
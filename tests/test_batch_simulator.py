@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+
+from game.batch_simulator import BatchSimulator
+from game.constants import DIRECTIONS, GHOST_AGGRESSIVE, GHOST_BASE_SCORE
+from game.game_engine import GameEngine
+
+def engine_state(engine):
+    return (engine.player.score, engine.player.lives, (engine.player.x, engine.player.y),
+            [ghost.get_pos() for ghost in engine.ghosts.ghosts])
+
+def simulator_state(simulator, map_manager, game):
+    tiles = map_manager.walkable_tiles
+    return (int(simulator.score[game]), int(simulator.lives[game]), tiles[simulator.player_tile[game]],
+            [tiles[tile] for tile in simulator.ghost_tile[game]])
+
+def test_matches_headless_engine_every_tick():
+    # 흐름 필드로 플레이어를 직접 쫓는 고스트 팀은 경로 계획의 단순화가 적용되지 않으므로 틱마다 엔진과 같아야 함
+    spec = [GHOST_AGGRESSIVE] * 4
+    seeds = range(6)
+    engines = [GameEngine(headless=True, ghost_spec=spec) for _ in seeds]
+    simulator = BatchSimulator(engines[0].map_manager, len(seeds), ghost_spec=spec)
+    rngs = [random.Random(seed) for seed in seeds]
+    running = [True] * len(seeds)
+    names = list(DIRECTIONS)
+    deaths = ghosts_eaten = 0
+    for tick in range(3000):
+        directions = np.full(len(seeds), -1)
+        for game, engine in enumerate(engines):
+            if not running[game]:
+                continue
+            # 같은 정책: 틱마다 10% 확률로 무작위 방향 입력
+            if rngs[game].random() < 0.1:
+                directions[game] = rngs[game].randrange(len(names))
+            before = engine_state(engine)
+            running[game] = engine.step(names[directions[game]] if directions[game] >= 0 else None)
+            after = engine_state(engine)
+            deaths += before[1] - after[1]
+            ghosts_eaten += (after[0] - before[0]) // GHOST_BASE_SCORE
+        simulator.step(directions)
+        for game, engine in enumerate(engines):
+            if running[game] or simulator.done[game]:
+                assert simulator_state(simulator, engine.map_manager, game) == engine_state(engine), (game, tick)
+            assert simulator.done[game] == (not running[game]), (game, tick)
+        if not any(running):
+            break
+    assert not any(running)
+    # 목숨을 잃는 경우와 파워 펠릿으로 고스트를 잡는 경우까지 지나갔는지
+    assert deaths > 0 and ghosts_eaten > 0
@@ -0,0 +1,21 @@
+import random
+
+import numpy as np
+
+from game.environment import PacManEnv
+
+def test_grid_matches_current_map_every_step():
+    env = PacManEnv(max_steps=400)
+    rng = random.Random(0)
+    deaths = 0
+    for _ in range(3):
+        observation = env.reset()
+        done = False
+        while not done:
+            lives = env.engine.player.lives
+            observation, reward, done, info = env.step(rng.randrange(len(env.actions)))
+            deaths += lives - info['lives']
+            assert np.array_equal(observation['grid'], np.array(env.engine.map_manager.current_map, dtype=np.int8))
+            assert tuple(observation['player']) == (env.engine.player.x, env.engine.player.y)
+    # 펠릿을 먹은 틱에 죽는 경우처럼 플레이어 위치가 되돌아가는 스텝도 지나갔는지
+    assert deaths > 0
@@ -0,0 +1,75 @@
+from ai.expectimax import ExpectimaxSearch
+from ai.ghost_ai import GhostManager
+from game.clock import SimulationClock
+from game.constants import GHOST_AGGRESSIVE, GHOST_LOOKAHEAD
+
+def test_unreachable_ghost_stays_on_its_tile(map_manager):
+    search = ExpectimaxSearch(map_manager, max_depth=3)
+    keyed = []
+    original = search.ghost_key
+
+    def ghost_key(slot, tile):
+        keyed.append(tile)
+        return original(slot, tile)
+
+    search.ghost_key = ghost_key
+    index = map_manager.get_tile_index
+    player, hunter, stranded = index(1, 1), index(6, 1), index(1, 7)
+    # (1, 7)은 플레이어가 있는 영역과 이어지지 않은 칸
+    assert map_manager.distance_table[stranded, player] < 0
+    moves, depth = search.search(player, 0, (hunter, stranded), [0], map_manager.pellet_bits,
+                                 map_manager.power_pellet_bits)
+    assert depth == 3 and moves is not None
+    assert min(keyed) >= 0
+    assert stranded in keyed
+
+def search_state(map_manager):
+    index = map_manager.get_tile_index
+    return index(1, 1), 0, (index(6, 1), index(1, 5), index(9, 9)), [0, 1]
+
+def run_search(map_manager, **kwargs):
+    player, context, ghosts, searching = search_state(map_manager)
+    search = ExpectimaxSearch(map_manager, **kwargs)
+    result = search.search(player, context, ghosts, searching, map_manager.pellet_bits, map_manager.power_pellet_bits)
+    return search, result
+
+def test_search_is_deterministic(map_manager):
+    search, result = run_search(map_manager, max_depth=4)
+    assert result == run_search(map_manager, max_depth=4)[1]
+    # 전치 테이블이 채워진 상태로 다시 탐색해도 같은 결과
+    player, context, ghosts, searching = search_state(map_manager)
+    assert search.search(player, context, ghosts, searching, map_manager.pellet_bits,
+                         map_manager.power_pellet_bits) == result
+    assert search.stats['table_hits'] > 0
+
+def test_node_budget_keeps_last_completed_depth(map_manager):
+    search, (moves, depth) = run_search(map_manager, max_depth=8, node_budget=200)
+    assert search.stats['aborted'] == 1
+    assert 0 < depth < 8
+    # 예산 안에서 끝낸 깊이까지만 탐색한 결과와 같음
+    assert run_search(map_manager, max_depth=depth, node_budget=10 ** 9)[1] == (moves, depth)
+
+def test_one_ply_capture_is_chosen(map_manager):
+    index = map_manager.get_tile_index
+    player = index(1, 1)
+    search = ExpectimaxSearch(map_manager, max_depth=4)
+    for ghost in ((2, 1), (1, 2)):
+        moves, _ = search.search(player, 0, (index(*ghost),), [0], map_manager.pellet_bits, map_manager.power_pellet_bits)
+        assert moves == (player,)
+
+def test_team_shares_one_search_per_frame(map_manager):
+    clock = SimulationClock()
+    manager = GhostManager(None, map_manager, clock, spec=[GHOST_LOOKAHEAD, GHOST_AGGRESSIVE, GHOST_LOOKAHEAD],
+                           update_frequency=1, plan_budget_us=None)
+    lookahead = [0, 2]
+    assert all(manager.ghosts[i].search is manager.search for i in lookahead)
+    player_pos = map_manager.get_spawn_positions()['player']
+    clock.advance(600)
+    for frame in range(1, 6):
+        clock.advance(250)
+        manager.update(player_pos, map_manager, manager.ghosts)
+        # 두 탐색 고스트의 이동을 한 번의 탐색으로 정하고 각자 자기 몫으로 움직임
+        assert manager.search.stats['searches'] == frame
+        assert sorted(manager.joint_moves) == lookahead
+        for i in lookahead:
+            assert (manager.ghosts[i].x, manager.ghosts[i].y) == manager.joint_moves[i]
@@ -0,0 +1,58 @@
+from ai.tournament import RandomTurnPlayer
+from game.bitboard import popcount
+from game.constants import PELLET, POWER_PELLET
+from game.game_engine import GameEngine
+
+def engine_state(engine):
+    return (engine.player.score, engine.player.lives, engine.player.get_pos(), engine.player.direction,
+            engine.game_clock.now(), engine.bitboard_state(), [row[:] for row in engine.map_manager.current_map],
+            [(g.get_pos(), g.state) for g in engine.ghosts.ghosts])
+
+def run(engine, policy, ticks):
+    states = []
+    for _ in range(ticks):
+        engine.step(policy(engine))
+        states.append(engine_state(engine))
+    return states
+
+def test_restore_state_matches_capture():
+    engine = GameEngine(headless=True)
+    initial = engine.capture_state()
+    initial_state = engine_state(engine)
+    run(engine, RandomTurnPlayer(0), 300)
+    snapshot = engine.capture_state()
+    expected = engine_state(engine)
+    later = run(engine, RandomTurnPlayer(1), 300)
+
+    # 되돌린 뒤 같은 입력이면 같은 게임 (여러 번 되돌려도)
+    for _ in range(2):
+        engine.restore_state(snapshot)
+        assert engine_state(engine) == expected
+        assert run(engine, RandomTurnPlayer(1), 300) == later
+
+    # 처음 상태로 되돌린 뒤 다시 앞의 스냅샷으로
+    engine.restore_state(initial)
+    assert engine_state(engine) == initial_state
+    engine.restore_state(snapshot)
+    assert engine_state(engine) == expected
+
+def test_bitboards_match_grid_pellets():
+    engine = GameEngine(headless=True)
+    map_manager = engine.map_manager
+    policy = RandomTurnPlayer(2)
+    snapshots = []
+    for tick in range(1500):
+        if tick % 100 == 0:
+            snapshots.append(engine.capture_state())
+        if not engine.step(policy(engine)):
+            break
+    snapshots.append(engine.capture_state())
+    for snapshot in reversed(snapshots):
+        engine.restore_state(snapshot)
+        pellets = {(x, y) for y, row in enumerate(map_manager.current_map) for x, tile in enumerate(row) if tile == PELLET}
+        power_pellets = {(x, y) for y, row in enumerate(map_manager.current_map)
+                         for x, tile in enumerate(row) if tile == POWER_PELLET}
+        assert set(map_manager.bitboards.positions(map_manager.pellet_bits)) == pellets
+        assert set(map_manager.bitboards.positions(map_manager.power_pellet_bits)) == power_pellets
+        assert map_manager.pellets_remaining == len(pellets) + len(power_pellets)
+        assert popcount(map_manager.pellet_bits | map_manager.power_pellet_bits) == len(map_manager.pellet_positions)
@@ -0,0 +1,75 @@
+from ai.ghost_ai import GhostManager
+from game.clock import SimulationClock
+from game.constants import AI_UPDATE_FREQUENCY, GHOST_AGGRESSIVE
+
+def make_manager(map_manager, spec=None, **kwargs):
+    clock = SimulationClock()
+    manager = GhostManager(None, map_manager, clock, spec, **kwargs)
+    # 리스폰 대기 시간이 지난 뒤부터
+    clock.advance(600)
+    return manager, clock
+
+def record_plans(manager):
+    """고스트별로 계획한 프레임 번호를 모읍니다."""
+    planned = [[] for _ in manager.ghosts]
+    for index, ghost in enumerate(manager.ghosts):
+        def plan(*args, index=index, original=ghost.plan):
+            planned[index].append(manager.frame)
+            original(*args)
+        ghost.plan = plan
+    return planned
+
+def test_ghosts_plan_only_on_their_frames(map_manager):
+    manager, clock = make_manager(map_manager, plan_budget_us=None)
+    planned = record_plans(manager)
+    player_pos = map_manager.get_spawn_positions()['player']
+    manager.update(player_pos, map_manager, manager.ghosts)
+    for ghost in manager.ghosts:
+        # 바로 재계획할 이유(상태 변화, 경로 끝, 끊김)가 없으면 차례에만 계획
+        ghost.needs_replan = lambda: False
+    for _ in range(20):
+        clock.advance(16)
+        manager.update(player_pos, map_manager, manager.ghosts)
+    for index, frames in enumerate(planned):
+        assert frames[0] == 1
+        assert frames[1:] == [frame for frame in range(2, 22) if (frame + index) % AI_UPDATE_FREQUENCY == 0]
+
+def test_expired_budget_defers_remaining_ghosts(map_manager):
+    # 예산 0: 매 프레임 한 고스트만 계획하고 나머지는 미룸
+    manager, clock = make_manager(map_manager, update_frequency=1, plan_budget_us=0)
+    planned = record_plans(manager)
+    player_pos = map_manager.get_spawn_positions()['player']
+    for frame in range(1, 9):
+        clock.advance(16)
+        manager.update(player_pos, map_manager, manager.ghosts)
+        planners = [index for index, frames in enumerate(planned) if frame in frames]
+        assert len(planners) == 1
+        assert manager.deferred_mask == (1 << len(manager.ghosts)) - 1 & ~(1 << planners[0])
+    assert manager.stats['plans'] == 8 and manager.stats['deferred'] == 8 * (len(manager.ghosts) - 1)
+
+    # 예산이 없으면 미루지 않음
+    manager, clock = make_manager(map_manager, update_frequency=1, plan_budget_us=None)
+    clock.advance(16)
+    manager.update(player_pos, map_manager, manager.ghosts)
+    assert manager.deferred_mask == 0 and manager.stats['plans'] == len(manager.ghosts)
+
+def test_ghosts_follow_path_between_plans(map_manager):
+    manager, clock = make_manager(map_manager, spec=[GHOST_AGGRESSIVE], plan_budget_us=None)
+    planned = record_plans(manager)
+    ghost = manager.ghosts[0]
+    player_pos = map_manager.get_spawn_positions()['player']
+    followed = 0
+    for _ in range(60):
+        clock.advance(100)
+        path = list(ghost.path)
+        position = ghost.get_pos()
+        manager.update(player_pos, map_manager, manager.ghosts)
+        if manager.frame in planned[0]:
+            continue
+        # 계획하지 않은 프레임에는 이전 경로의 첫 칸으로 옮기고 나머지 경로를 그대로 둠
+        if ghost.get_pos() != position:
+            assert ghost.get_pos() == path[0] and ghost.path == path[1:]
+            followed += 1
+        else:
+            assert ghost.path == path
+    assert followed > 0
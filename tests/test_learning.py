@@ -0,0 +1,312 @@
+import math
+import random
+import shutil
+import threading
+
+from ai.learning import (PlayerLearningSystem, LearningPersistenceWorker, read_learning_file,
+                         write_learning_file)
+from ai.profile_store import LearningProfileStore
+
+def make_system(map_manager, tmp_path, worker=None):
+    return PlayerLearningSystem(map_manager, data_file=str(tmp_path / 'learning.bin'), legacy_file=None,
+                                pretrained_file=None, persistence_worker=worker)
+
+def random_walk(system, map_manager, steps, seed=0, crowded=False):
+    """맵 위를 무작위로 걸으며 이동을 학습시킵니다. crowded이면 가끔 고스트 둘을 플레이어 옆에 둡니다."""
+    rng = random.Random(seed)
+    pos = (1, 1)
+    for _ in range(steps):
+        x, y = pos
+        options = [(d, (x + dx, y + dy)) for d, (dx, dy) in
+                   (('UP', (0, -1)), ('DOWN', (0, 1)), ('LEFT', (-1, 0)), ('RIGHT', (1, 0)))
+                   if map_manager.is_valid_move(x + dx, y + dy)]
+        direction, next_pos = rng.choice(options)
+        move_data = {'direction': direction, 'is_corner': map_manager.is_intersection(*next_pos)}
+        ghosts = [next_pos, next_pos] if crowded and rng.random() < 0.3 else [(9, 9)]
+        system.analyze_player_move(pos, next_pos, move_data, ghost_positions=ghosts)
+        pos = next_pos
+
+def test_learning_file_round_trip(map_manager, tmp_path):
+    system = make_system(map_manager, tmp_path)
+    random_walk(system, map_manager, 120)
+    path = str(tmp_path / 'copy.bin')
+    assert system.save_learning_data(path)
+
+    other = tmp_path / 'other'
+    other.mkdir()
+    loaded = make_system(map_manager, other)
+    assert loaded.load_learning_data(path)
+    assert loaded.export_learning_state() == system.export_learning_state()
+    assert loaded.get_prediction((2, 1)) == system.get_prediction((2, 1))
+    system.close()
+    loaded.close()
+
+def test_journal_replay_after_crash(map_manager, tmp_path):
+    # 스냅샷 없이 저널만 남은 상태에서 종료된 경우
+    system = make_system(map_manager, tmp_path)
+    random_walk(system, map_manager, 150)
+    system.flush_journal(block=True)
+    system.persistence.flush(system.journal_file)
+    recovered = make_system(map_manager, tmp_path)
+    assert recovered.export_learning_state() == system.export_learning_state()
+    recovered.close()
+
+    # 스냅샷 이후의 저널이 남은 경우 (스냅샷 간격을 넘겨 한 번 저장됨)
+    random_walk(system, map_manager, 520, seed=1)
+    system.flush_journal(block=True)
+    system.persistence.flush(system.journal_file)
+    recovered = make_system(map_manager, tmp_path)
+    assert recovered.move_count == system.move_count
+    assert recovered.export_learning_state() == system.export_learning_state()
+    recovered.close()
+
+    # 스냅샷을 쓴 직후 저널을 비우기 전에 종료된 경우: 이미 반영된 레코드는 다시 적용하지 않음
+    random_walk(system, map_manager, 40, seed=2)
+    system.flush_journal(block=True)
+    system.persistence.flush(system.journal_file)
+    write_learning_file(system.data_file, system.export_learning_state())
+    recovered = make_system(map_manager, tmp_path)
+    assert recovered.export_learning_state() == system.export_learning_state()
+    recovered.close()
+    system.close()
+
+def test_snapshot_exports_captured_state(map_manager, tmp_path):
+    system = make_system(map_manager, tmp_path)
+    random_walk(system, map_manager, 60)
+    expected = system.export_learning_state()
+    system.save_snapshot()
+    # 저장 작업이 끝나기 전에 더 이동해도 스냅샷은 저장 시점의 상태
+    random_walk(system, map_manager, 30, seed=3)
+    system.persistence.flush(system.journal_file)
+    saved = read_learning_file(system.data_file)
+    assert saved['journal_seq'] == expected['journal_seq']
+    assert saved['move_count'] == expected['move_count']
+    system.close()
+
+def test_worker_coalesces_snapshots_and_never_blocks(map_manager, tmp_path):
+    system = make_system(map_manager, tmp_path)
+    states = []
+    for move_count in range(4):
+        state = system.export_learning_state()
+        state['move_count'] = move_count
+        states.append(state)
+    system.close()
+    worker = LearningPersistenceWorker(queue_size=2)
+    started = threading.Event()
+    release = threading.Event()
+    exported = []
+
+    def blocking_export(state):
+        started.set()
+        release.wait(5)
+        return state
+
+    def export(state):
+        exported.append(state['move_count'])
+        return state
+
+    first = str(tmp_path / 'first.bin')
+    second = str(tmp_path / 'second.bin')
+    assert worker.write_snapshot(first, first + '.journal', states[0], blocking_export)
+    assert started.wait(5)
+    # 처리되지 않은 스냅샷은 최신 상태로 바뀌기만 함
+    assert worker.write_snapshot(second, second + '.journal', states[1], export)
+    assert worker.write_snapshot(second, second + '.journal', states[2], export)
+    assert worker.append_journal(second + '.journal', b'')
+    # 큐가 가득 차면 기다리지 않고 거절
+    assert not worker.append_journal(second + '.journal', b'')
+    assert not worker.write_snapshot(str(tmp_path / 'third.bin'), str(tmp_path / 'third.bin.journal'),
+                                     states[3], export)
+    release.set()
+    worker.flush(second + '.journal')
+    assert exported == [2]
+    assert read_learning_file(second)['move_count'] == 2
+    worker.stop()
+
+def test_profile_store_lazy_load_and_lru(map_manager, tmp_path):
+    store = LearningProfileStore(str(tmp_path / 'profiles'), max_resident=2, map_manager=map_manager)
+    assert not store.profiles
+    first = store.get('alice')
+    assert store.get('alice') is first
+    assert store.stats['loads'] == 1 and store.stats['hits'] == 1
+    store.get('bob')
+    store.get('alice')
+    # 가장 오래전에 사용한 bob이 밀려남
+    store.get('carol')
+    assert list(store.profiles) == ['alice', 'carol']
+    assert store.stats['evictions'] == 1
+    # 바뀐 내용이 없는 프로필은 다시 쓰지 않음
+    assert store.stats['write_backs'] == 0
+    store.close()
+
+def test_profile_store_writes_back_and_reloads(map_manager, tmp_path):
+    store = LearningProfileStore(str(tmp_path / 'profiles'), max_resident=1, map_manager=map_manager)
+    profile = store.get('alice')
+    random_walk(store.get('alice'), map_manager, 70)
+    expected = profile.export_learning_state()
+    store.get('bob')
+    assert 'alice' not in store.profiles
+    assert store.stats['write_backs'] == 1
+    store.persistence.flush()
+    reloaded = store.get('alice')
+    assert reloaded is not profile
+    assert reloaded.export_learning_state() == expected
+    store.close()
+
+def test_profile_store_eviction_keeps_buffered_journal(map_manager, tmp_path):
+    store = LearningProfileStore(str(tmp_path / 'profiles'), max_resident=1, map_manager=map_manager)
+    store.persistence.stop()
+    store.persistence = LearningPersistenceWorker(queue_size=1)
+    profile = store.get('alice')
+    random_walk(profile, map_manager, 40)
+    store.persistence.flush()
+    expected = profile.export_learning_state()
+
+    # 저장 작업 스레드를 멈춰 두고 큐를 채운 상태에서 내보냄
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_export(state):
+        started.set()
+        release.wait(5)
+        return state
+
+    dummy = str(tmp_path / 'dummy.bin')
+    assert store.persistence.write_snapshot(dummy, dummy + '.journal', expected, blocking_export)
+    assert started.wait(5)
+    assert store.persistence.append_journal(dummy + '.journal', b'')
+    threading.Timer(0.2, release.set).start()
+    store.evict('alice')
+    store.close()
+
+    other = LearningProfileStore(str(tmp_path / 'profiles'), max_resident=1, map_manager=map_manager)
+    assert other.get('alice').export_learning_state() == expected
+    other.close()
+
+def test_legacy_migration_keeps_crashed_journal(map_manager, tmp_path):
+    # 이전 형식 파일에서 시작해 스냅샷 없이 저널만 남기고 종료된 세션
+    legacy_file = str(tmp_path / 'legacy.json')
+    (tmp_path / 'base').mkdir()
+    base = make_system(map_manager, tmp_path / 'base')
+    assert base.save_learning_data(legacy_file)
+    base.close()
+    crashed = make_system(map_manager, tmp_path)
+    random_walk(crashed, map_manager, 100)
+    crashed.flush_journal(block=True)
+    crashed.persistence.flush(crashed.journal_file)
+    expected = crashed.export_learning_state()
+
+    migrated = PlayerLearningSystem(map_manager, data_file=crashed.data_file, legacy_file=legacy_file,
+                                    pretrained_file=None)
+    assert migrated.export_learning_state() == expected
+    migrated.close()
+    reloaded = make_system(map_manager, tmp_path)
+    assert reloaded.export_learning_state() == expected
+    reloaded.close()
+    crashed.close()
+
+def test_replay_journal_does_not_touch_captured_state(map_manager, tmp_path):
+    source = make_system(map_manager, tmp_path)
+    for timing in (1.5, 2.5, 3.5):
+        source.record_power_pellet_timing(timing)
+    source.flush_journal(block=True)
+    source.persistence.flush(source.journal_file)
+
+    (tmp_path / 'other').mkdir()
+    target = make_system(map_manager, tmp_path / 'other')
+    captured = target.capture_state()
+    captured_timings = list(captured[0][6])
+    shutil.copyfile(source.journal_file, target.journal_file)
+    assert target.replay_journal() == 3
+    assert list(captured[0][6]) == captured_timings
+    assert list(target.power_pellet_timing)[-3:] == [1.5, 2.5, 3.5]
+    source.close()
+    target.close()
+
+def scan_scores(moves, current_pos, corner):
+    """인덱스 도입 전의 선형 탐색: move_history에서 current_pos에서 나간 이동의 점수 (고스트 밀집 이동은 0.2)."""
+    scores = {}
+    for move in moves:
+        if tuple(move['prev_pos']) == current_pos and (not corner or move['move_data'].get('is_corner')):
+            next_pos = tuple(move['current_pos'])
+            scores[next_pos] = scores.get(next_pos, 0.0) + (0.2 if move.get('nearby_ghosts', 0) >= 2 else 1.0)
+    return scores
+
+def test_indexed_prediction_matches_history_scan(map_manager, tmp_path):
+    # 감쇠 없이 모든 이동을 기억하면 인덱스 예측은 이동 기록 선형 탐색과 같아야 함
+    system = PlayerLearningSystem(map_manager, memory_size=10000, decay=1.0, data_file=str(tmp_path / 'learning.bin'),
+                                  legacy_file=None, pretrained_file=None)
+    random_walk(system, map_manager, 400, crowded=True)
+    assert system.move_count == len(system.move_history)
+    for phase, corner in ((0, False), (1, True)):
+        system.learning_phase = phase
+        for tile in map_manager.walkable_tiles:
+            scores = scan_scores(system.move_history, tile, corner)
+            predicted = system.compute_prediction(tile)
+            if not scores:
+                assert predicted == tile
+            else:
+                assert abs(scores[predicted] - max(scores.values())) < 1e-9
+    system.close()
+
+def test_bounded_history_and_decay_renormalisation(map_manager, tmp_path):
+    (tmp_path / 'small').mkdir()
+    full = PlayerLearningSystem(map_manager, memory_size=1000, decay=0.5, data_file=str(tmp_path / 'learning.bin'),
+                                legacy_file=None, pretrained_file=None)
+    small = PlayerLearningSystem(map_manager, memory_size=10, decay=0.5, data_file=str(tmp_path / 'small' / 'learning.bin'),
+                                 legacy_file=None, pretrained_file=None)
+    for system in (full, small):
+        random_walk(system, map_manager, 120)
+        for timing in range(30):
+            system.record_power_pellet_timing(float(timing))
+    # 최근 기록은 memory_size개만 보관
+    assert len(small.move_history) == len(small.power_pellet_timing) == len(small.score_milestones) == 10
+    assert list(small.move_history) == list(full.move_history)[-10:]
+
+    # 124번 이동하면 가중치가 2 ** 124가 되므로 중간에 1로 되돌려졌어야 하고, 값은 이동마다 decay를 곱한 합과 같음
+    assert 1.0 <= full.decay_weight <= 1e6
+    moves = list(full.move_history)
+    expected = {}
+    for age, move in enumerate(reversed(moves), 1):
+        key = (tuple(move['prev_pos']), tuple(move['current_pos']))
+        expected[key] = expected.get(key, 0.0) + 0.5 ** age
+    for system in (full, small):
+        actual = {(prev_pos, next_pos): sum(counts) / system.decay_weight
+                  for prev_pos, next_counts in system.transition_index.items() for next_pos, counts in next_counts.items()}
+        assert actual.keys() == expected.keys()
+        assert all(math.isclose(actual[key], value, rel_tol=1e-9) for key, value in expected.items())
+    full.close()
+    small.close()
+
+def test_prediction_memo_is_cleared(map_manager, tmp_path):
+    system = make_system(map_manager, tmp_path)
+    random_walk(system, map_manager, 40)
+    computed = []
+    compute = system.compute_prediction
+    system.compute_prediction = lambda pos: computed.append(pos) or compute(pos)
+    positions = [(1, 1), (6, 1), (1, 1)]
+
+    # 같은 틱의 같은 질의는 한 번만 계산
+    system.learning_phase = 0
+    assert system.get_predictions(positions) == [compute(pos) for pos in positions]
+    assert computed == [(1, 1), (6, 1)]
+    system.get_prediction((6, 1))
+    assert len(computed) == 2
+
+    # 이동이 기록되면 비움
+    system.analyze_player_move((1, 1), (2, 1), {'direction': 'RIGHT', 'is_corner': False})
+    assert not system.prediction_memo
+    system.get_prediction((6, 1))
+    assert len(computed) == 3
+
+    # 불러오기와 초기화에서도 비움
+    saved = str(tmp_path / 'saved.bin')
+    assert system.save_learning_data(saved)
+    system.get_prediction((1, 1))
+    assert system.prediction_memo
+    assert system.load_learning_data(saved)
+    assert not system.prediction_memo
+    system.get_prediction((1, 1))
+    system.reset_learning_data()
+    assert not system.prediction_memo
+    system.close()
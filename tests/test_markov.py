@@ -0,0 +1,62 @@
+import random
+
+import numpy as np
+
+from ai.markov import MarkovPredictor
+
+def train(map_manager, steps, seed=0):
+    markov = MarkovPredictor(map_manager)
+    rng = random.Random(seed)
+    tile = 0
+    for _ in range(steps):
+        direction = rng.choice([d for d, next_tile in enumerate(markov.neighbor_table[tile]) if next_tile >= 0])
+        next_tile = int(markov.neighbor_table[tile][direction])
+        markov.update(map_manager.walkable_tiles[tile], map_manager.walkable_tiles[next_tile], 1.0)
+        tile = next_tile
+    return markov
+
+def brute_force(markov, tile, context, steps):
+    """상태별 경로를 하나씩 펼쳐 더한 steps칸 뒤 타일 분포 (비교용)."""
+    distribution = np.zeros(markov.tile_count)
+    def expand(tile, context, probability, remaining):
+        if remaining == 0:
+            distribution[tile] += probability
+            return
+        probs = markov.transition_probs(np.array([tile]), np.array([context]))[0]
+        for direction, next_tile in enumerate(markov.neighbor_table[tile]):
+            if next_tile >= 0 and probs[direction] > 0:
+                expand(int(next_tile), int(markov.next_context[context, direction]), probability * probs[direction], remaining - 1)
+    expand(tile, context, 1.0, steps)
+    return distribution
+
+def test_predict_ahead_matches_counts(map_manager):
+    markov = train(map_manager, 3000)
+    rng = random.Random(1)
+    seen = list(zip(*np.nonzero(markov.counts.sum(axis=2))))
+    for tile, context in rng.sample(seen, 20):
+        tile, context = int(tile), int(context)
+        # 한 칸 뒤는 그 상태의 방향별 카운트 비율
+        counts = markov.counts[tile, context]
+        expected = np.zeros(markov.tile_count)
+        for direction, next_tile in enumerate(markov.neighbor_table[tile]):
+            if next_tile >= 0:
+                expected[next_tile] += counts[direction] / counts.sum()
+        assert np.allclose(markov.predict_ahead(1, tile, context), expected)
+        for steps in (2, 3, 4):
+            distribution = markov.predict_ahead(steps, tile, context)
+            assert np.isclose(distribution.sum(), 1.0)
+            assert np.allclose(distribution, brute_force(markov, tile, context, steps))
+
+def test_unseen_context_falls_back(map_manager):
+    markov = train(map_manager, 200)
+    totals = markov.counts.sum(axis=2)
+    tile, context = next((int(t), int(c)) for t, c in zip(*np.nonzero(totals == 0)) if totals[t].sum() > 0)
+    # 본 적 없는 문맥은 그 타일의 문맥 무관 통계
+    fallback = markov.counts[tile].sum(axis=0)
+    assert np.allclose(markov.transition_probs(np.array([tile]), np.array([context]))[0], fallback / fallback.sum())
+    # 한 번도 지나가지 않은 타일은 갈 수 있는 방향 균등 분포
+    unseen = next(t for t in range(markov.tile_count) if totals[t].sum() == 0)
+    distribution = markov.predict_ahead(1, unseen, 0)
+    neighbors = [n for n in markov.neighbor_table[unseen] if n >= 0]
+    assert np.isclose(distribution.sum(), 1.0)
+    assert np.allclose(distribution[neighbors], 1.0 / len(neighbors))
@@ -0,0 +1,186 @@
+import random
+
+from ai.pathfinding import PathFinder
+from game.constants import PELLET, POWER_PELLET
+
+def is_connected_path(map_manager, path):
+    return all(map_manager.is_valid_move(*pos) for pos in path) and all(
+        abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+
+def test_find_path_avoiding_ghosts(map_manager):
+    pathfinder = PathFinder(map_manager)
+    start, goal = map_manager.walkable_tiles[0], map_manager.walkable_tiles[-1]
+    ghost = map_manager.walkable_tiles[len(map_manager.walkable_tiles) // 2]
+    path = pathfinder.find_path_avoiding_ghosts(start, goal, [ghost], safety_radius=1)
+    assert path and path[0] == start and path[-1] == goal
+    assert is_connected_path(map_manager, path)
+    assert all(abs(x - ghost[0]) > 1 or abs(y - ghost[1]) > 1 for x, y in path[1:-1])
+
+def bfs_distance(map_manager, start, goal, blocked=frozenset()):
+    """비교용 타일 단위 BFS 거리 (닿지 않으면 None)"""
+    from collections import deque
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) == goal:
+            return distances[goal]
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if map_manager.is_valid_move(nx, ny) and (nx, ny) not in distances and (nx, ny) not in blocked:
+                distances[(nx, ny)] = distances[(x, y)] + 1
+                queue.append((nx, ny))
+    return None
+
+def sample_pairs(map_manager, count, seed=0):
+    rng = random.Random(seed)
+    tiles = map_manager.walkable_tiles
+    return [(rng.choice(tiles), rng.choice(tiles)) for _ in range(count)]
+
+def test_table_paths_match_bfs(map_manager):
+    pathfinder = PathFinder(map_manager)
+    for start, goal in sample_pairs(map_manager, 200):
+        expected = bfs_distance(map_manager, start, goal)
+        if expected is None:
+            # 맵에는 서로 이어지지 않은 구역도 있음
+            assert pathfinder.a_star(start, goal) == []
+            assert map_manager.get_table_path(start, goal) == []
+            continue
+        index = map_manager.get_tile_index
+        assert map_manager.distance_table[index(*start), index(*goal)] == expected
+        path = pathfinder.a_star(start, goal)
+        assert path[0] == start and path[-1] == goal
+        assert is_connected_path(map_manager, path)
+        assert len(path) - 1 == expected
+        assert [start] + map_manager.get_table_path(start, goal) == path or start == goal
+
+def test_junction_paths_match_bfs(map_manager):
+    pathfinder = PathFinder(map_manager)
+    for start, goal in sample_pairs(map_manager, 200):
+        expected = bfs_distance(map_manager, start, goal)
+        path = pathfinder.find_junction_path(start, goal)
+        if expected is None:
+            assert path == []
+            continue
+        assert path[0] == start and path[-1] == goal
+        assert is_connected_path(map_manager, path)
+        assert len(path) - 1 == expected
+
+def test_junction_path_avoids_positions(map_manager):
+    pathfinder = PathFinder(map_manager)
+    rng = random.Random(1)
+    for start, goal in sample_pairs(map_manager, 200, seed=1):
+        avoid = frozenset(rng.sample(map_manager.walkable_tiles, 3)) - {start, goal}
+        path = pathfinder.find_junction_path(start, goal, avoid)
+        expected = bfs_distance(map_manager, start, goal, avoid)
+        if expected is None:
+            assert path == [] or start == goal
+            continue
+        if path:
+            # 피할 칸이 있는 복도 구간 전체를 건너뛰므로 타일 BFS보다 짧을 수는 없음
+            assert path[0] == start and path[-1] == goal
+            assert is_connected_path(map_manager, path)
+            assert not avoid & set(path)
+            assert len(path) - 1 >= expected
+
+def test_incremental_planner_matches_bfs(map_manager):
+    pathfinder = PathFinder(map_manager)
+    planner = pathfinder.create_planner()
+    rng = random.Random(2)
+    tiles = map_manager.walkable_tiles
+    goal = rng.choice(tiles)
+    start = rng.choice(tiles)
+    for step in range(300):
+        if step % 50 == 0:
+            goal = rng.choice(tiles)
+        blocked = frozenset(rng.sample(tiles, 2)) - {start, goal}
+        path = planner.plan(start, goal, blocked)
+        expected = bfs_distance(map_manager, start, goal, blocked)
+        if start == goal or expected is None:
+            assert path == []
+        else:
+            assert len(path) == expected
+            assert path[-1] == goal
+            assert is_connected_path(map_manager, [start] + path)
+            assert not blocked & set(path)
+        # 시작 위치(고스트)를 경로를 따라 한 칸씩, 가끔은 무작위 칸으로 옮김
+        start = path[0] if path and rng.random() < 0.8 else rng.choice(tiles)
+
+def test_flow_field_matches_bfs_from_player(map_manager):
+    field = PathFinder(map_manager).flow_field
+    rng = random.Random(3)
+    for target in rng.sample(map_manager.walkable_tiles, 5):
+        assert field.set_target(target)
+        # 플레이어가 같은 타일에 있는 동안은 다시 계산하지 않음
+        assert not field.set_target(target)
+        for tile in map_manager.walkable_tiles:
+            expected = bfs_distance(map_manager, tile, target)
+            path = field.get_path(tile)
+            if expected is None:
+                assert field.get_distance(tile) == -1 and path == []
+                continue
+            assert field.get_distance(tile) == expected
+            assert len(path) == expected
+            if path:
+                assert path[-1] == target
+                assert is_connected_path(map_manager, [tile] + path)
+
+def test_ghost_distance_field_and_escape_routes(map_manager):
+    pathfinder = PathFinder(map_manager)
+    rng = random.Random(4)
+    tiles = map_manager.walkable_tiles
+    for _ in range(8):
+        ghosts = rng.sample(tiles, 3)
+        field = pathfinder.get_ghost_distance_field(ghosts)
+        for index, tile in enumerate(tiles):
+            distances = [d for d in (bfs_distance(map_manager, ghost, tile) for ghost in ghosts) if d is not None]
+            assert field[index] == (min(distances) if distances else -1)
+
+        player = rng.choice([tile for tile in tiles if tile not in ghosts])
+        route = pathfinder.find_escape_route(player, ghosts, max_distance=10)
+        assert route[0] == player and len(route) <= 10
+        assert is_connected_path(map_manager, route)
+        for step, tile in enumerate(route[1:], 1):
+            # 고스트가 있거나 고스트가 먼저(같이) 도착하는 칸은 지나가지 않음
+            assert tile not in ghosts
+            distance = field[map_manager.get_tile_index(*tile)]
+            assert distance < 0 or distance > step
+
+def grid_pellets(map_manager):
+    return {(x, y) for y, row in enumerate(map_manager.current_map) for x, tile in enumerate(row)
+            if tile in (PELLET, POWER_PELLET)}
+
+def test_pellet_index_and_pellet_path(map_manager):
+    pathfinder = PathFinder(map_manager)
+    rng = random.Random(5)
+    tiles = map_manager.walkable_tiles
+    initial = grid_pellets(map_manager)
+    assert map_manager.pellet_positions == initial
+    for _ in range(6):
+        for x, y in rng.sample(tiles, 25):
+            map_manager.collect_pellet(x, y)
+            assert map_manager.pellet_positions == grid_pellets(map_manager)
+
+        start = rng.choice(tiles)
+        ghosts = rng.sample(tiles, 2)
+        # 전수 비교: 펠릿마다 (가장 가까운 고스트 거리 - 펠릿까지 거리 / 2)의 최댓값
+        best = None
+        for pellet in map_manager.pellet_positions:
+            distance = bfs_distance(map_manager, start, pellet)
+            if distance is None:
+                continue
+            ghost_distances = [d for d in (bfs_distance(map_manager, ghost, pellet) for ghost in ghosts) if d is not None]
+            score = (min(ghost_distances) if ghost_distances else 10) - distance * 0.5
+            best = score if best is None else max(best, score)
+        path = pathfinder.find_pellet_path(start, ghost_positions=ghosts)
+        if best is None:
+            assert path == []
+            continue
+        assert path[0] == start and path[-1] in map_manager.pellet_positions
+        assert is_connected_path(map_manager, path)
+        end = path[-1]
+        assert len(path) - 1 == bfs_distance(map_manager, start, end)
+        ghost_distances = [d for d in (bfs_distance(map_manager, ghost, end) for ghost in ghosts) if d is not None]
+        assert (min(ghost_distances) if ghost_distances else 10) - (len(path) - 1) * 0.5 == best
+
+    map_manager.reset()
+    assert map_manager.pellet_positions == grid_pellets(map_manager) == initial
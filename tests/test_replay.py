@@ -0,0 +1,148 @@
+import json
+import os
+import struct
+import threading
+
+import pytest
+
+from ai.learning import PlayerLearningSystem
+from ai.tournament import RandomTurnPlayer
+from game.constants import LEARNING_LOG_EXTENSION
+from game.game_engine import GameEngine
+from game.map_manager import MapManager
+from game.replay import read_replay, REPLAY_HEADER, REPLAY_MAGIC, REPLAY_SPEC_LENGTH, REPLAY_VERSION, map_hash
+from game.replay_player import ReplayPlayer
+
+# 로그 헤더(16바이트) + 기준 스냅샷 앞부분
+REPLAY_LOG_PREFIX = 4096
+
+CUSTOM_SPEC = ['lookahead', {'type': 'ambush', 'speed': 0.2}, 'cooperative',
+               {'type': 'predictive', 'prediction_radius': 3, 'frightened_speed_multiplier': 0.7}]
+
+def engine_state(engine):
+    return (engine.player.score, engine.player.lives, engine.player.get_pos(), engine.game_clock.now(),
+            [(type(g).__name__, g.get_pos(), g.state) for g in engine.ghosts.ghosts])
+
+def make_learning_system(tmp_path):
+    return PlayerLearningSystem(MapManager(), data_file=str(tmp_path / 'learning.bin'),
+                                legacy_file=None, pretrained_file=None)
+
+def record_game(learning_system, path, ghost_spec=None, ticks=1500, seed=7, policy_seed=3):
+    """새 엔진으로 한 판을 기록하고 틱마다의 상태를 반환합니다 (학습 시스템은 판 사이에 이어서 사용)."""
+    engine = GameEngine(headless=True, learning_system=learning_system, ghost_spec=ghost_spec)
+    engine.start_recording(path, seed=seed)
+    states = []
+    policy = RandomTurnPlayer(policy_seed)
+    for _ in range(ticks):
+        running = engine.step(policy(engine))
+        states.append(engine_state(engine))
+        if not running:
+            break
+    engine.stop_recording()
+    return states
+
+def record(tmp_path, ghost_spec, ticks=1500):
+    learning_system = make_learning_system(tmp_path)
+    path = str(tmp_path / 'game.pmr')
+    states = record_game(learning_system, path, ghost_spec, ticks)
+    learning_system.close()
+    return path, states
+
+def replay_states(path, count):
+    player = ReplayPlayer(path)
+    try:
+        states = []
+        for _ in range(count):
+            player.step()
+            states.append(engine_state(player.engine))
+        return states
+    finally:
+        player.close()
+
+@pytest.mark.parametrize('ghost_spec', [None, CUSTOM_SPEC])
+def test_replay_is_deterministic(tmp_path, ghost_spec):
+    path, states = record(tmp_path, ghost_spec)
+    player = ReplayPlayer(path, keyframe_interval=200)
+    try:
+        assert [type(g).__name__ for g in player.engine.ghosts.ghosts] == [name for name, _, _ in states[0][4]]
+        for expected in states:
+            player.step()
+            assert engine_state(player.engine) == expected
+        # 키프레임으로 되돌아가도 같은 상태
+        player.seek(len(states) // 3)
+        assert engine_state(player.engine) == states[len(states) // 3 - 1]
+    finally:
+        player.close()
+
+def test_replay_header_keeps_ghost_spec(tmp_path):
+    path, _ = record(tmp_path, CUSTOM_SPEC, ticks=10)
+    spec = read_replay(path)['ghost_spec']
+    assert [entry['type'] for entry in spec] == ['lookahead', 'ambush', 'cooperative', 'predictive']
+    assert spec[1]['speed'] == 0.2
+    assert spec[3]['prediction_radius'] == 3
+
+def test_replay_refuses_unknown_ghost_spec(tmp_path):
+    spec_bytes = json.dumps([{'type': 'teleporting'}]).encode('utf-8')
+    path = str(tmp_path / 'unknown.pmr')
+    with open(path, 'wb') as f:
+        f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, map_hash(MapManager()), 0))
+        f.write(REPLAY_SPEC_LENGTH.pack(len(spec_bytes)) + spec_bytes)
+    with pytest.raises(ValueError):
+        ReplayPlayer(path)
+
+def test_start_learning_state_is_exported_off_the_game_thread(tmp_path, monkeypatch):
+    threads = []
+    original = PlayerLearningSystem.export_learning_state
+
+    def export_learning_state(self, state=None):
+        threads.append(threading.current_thread())
+        return original(self, state)
+
+    monkeypatch.setattr(PlayerLearningSystem, 'export_learning_state', export_learning_state)
+    path, _ = record(tmp_path, None, ticks=50)
+    assert threads and threading.main_thread() not in threads
+    assert read_replay(path)['learning_ref'][0] == 'learning.bin' + LEARNING_LOG_EXTENSION
+
+def test_replays_share_one_learning_log(tmp_path):
+    learning_system = make_learning_system(tmp_path)
+    games = []
+    for game in range(3):
+        path = str(tmp_path / f'game{game}.pmr')
+        games.append((path, record_game(learning_system, path, ticks=800, seed=game, policy_seed=game)))
+    log_file = learning_system.learning_log_file
+    learning_system.close()
+
+    # 다음 실행: 불러온 상태가 로그의 끝과 이어지므로 기준 스냅샷을 다시 쓰지 않고 이어 씀
+    with open(log_file, 'rb') as f:
+        base = f.read(REPLAY_LOG_PREFIX)
+    learning_system = make_learning_system(tmp_path)
+    path = str(tmp_path / 'next_run.pmr')
+    games.append((path, record_game(learning_system, path, ticks=800, seed=9, policy_seed=9)))
+    assert learning_system.learning_log_file == log_file
+    learning_system.close()
+    with open(log_file, 'rb') as f:
+        prefix = f.read(REPLAY_LOG_PREFIX)
+    # 헤더의 마지막 순번(8~16바이트)만 바뀜
+    assert prefix[:8] == base[:8] and prefix[16:] == base[16:]
+
+    for path, states in games:
+        # 리플레이에는 학습 상태가 들어 있지 않음 (입력만)
+        assert os.path.getsize(path) < 2000
+        assert replay_states(path, len(states)) == states
+
+def test_replay_refuses_rewritten_learning_log(tmp_path):
+    learning_system = make_learning_system(tmp_path)
+    record_game(learning_system, str(tmp_path / 'first.pmr'), ticks=300)
+    path = str(tmp_path / 'second.pmr')
+    record_game(learning_system, path, ticks=300)
+    assert read_replay(path)['learning_ref'][1] > 0
+    learning_system.close()
+    # 학습 데이터를 처음부터 다시 시작하면 로그의 기준 스냅샷이 새로 써짐
+    for name in ('learning.bin', 'learning.bin.journal'):
+        if os.path.exists(str(tmp_path / name)):
+            os.remove(str(tmp_path / name))
+    learning_system = make_learning_system(tmp_path)
+    learning_system.start_learning_log()
+    learning_system.close()
+    with pytest.raises(ValueError):
+        ReplayPlayer(path)
@@ -0,0 +1,25 @@
+from ai import tournament
+from ai.ghost_types import DEFAULT_GHOST_SPEC
+
+def play(configs, config_index, player_spec, seed):
+    return tournament.play_game((config_index, configs[config_index], player_spec, seed, 3000, None))
+
+def test_seed_varies_greedy_games():
+    configs = tournament.build_configs([DEFAULT_GHOST_SPEC])
+    results = [play(configs, 0, {'type': 'greedy'}, seed) for seed in range(4)]
+    assert len({(r['score'], r['survival_time']) for r in results}) > 1
+    # 같은 시드는 같은 게임
+    assert play(configs, 0, {'type': 'greedy'}, 2) == results[2]
+
+def test_prediction_radius_uses_fresh_learning_system():
+    configs = tournament.build_configs([DEFAULT_GHOST_SPEC], prediction_radii=(2, 12))
+    near = [play(configs, 0, {'type': 'greedy'}, seed) for seed in range(3)]
+    far = [play(configs, 1, {'type': 'greedy'}, seed) for seed in range(3)]
+    assert [(r['score'], r['survival_time']) for r in near] != [(r['score'], r['survival_time']) for r in far]
+
+def test_single_game_summary_has_no_interval():
+    configs = tournament.build_configs([DEFAULT_GHOST_SPEC])
+    summary = tournament.summarize([play(configs, 0, {'type': 'greedy'}, None)], configs)
+    assert summary[0]['games'] == 1
+    assert summary[0]['score'][1] is None
+    assert summary[0]['capture_interval'] is None
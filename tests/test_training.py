@@ -0,0 +1,36 @@
+import numpy as np
+
+from ai import training
+from ai.learning import PlayerLearningSystem
+
+def test_binary_session_uses_stored_stats(map_manager, tmp_path):
+    system = PlayerLearningSystem(map_manager, data_file=str(tmp_path / 'session.bin'), legacy_file=None,
+                                  pretrained_file=None)
+    # 윗줄 복도를 왕복하며 이동 기록 한도(MAX_LEARNING_HISTORY)보다 많이 이동
+    route = [(x, 1) for x in range(1, 7)] + [(x, 1) for x in range(5, 1, -1)]
+    for step in range(260):
+        prev_pos, next_pos = route[step % len(route)], route[(step + 1) % len(route)]
+        direction = 'RIGHT' if next_pos[0] > prev_pos[0] else 'LEFT'
+        system.analyze_player_move(prev_pos, next_pos, {'direction': direction, 'is_corner': False})
+    assert system.save_learning_data(system.data_file)
+    state = system.export_learning_state()
+    system.close()
+    move_count = state['move_count']
+    assert len(state['move_history']) < move_count
+
+    training.init_worker()
+    partial = training.train_session(str(tmp_path / 'session.bin'))
+    assert partial['moves'] == move_count
+    assert np.isclose(partial['transitions'][:2].sum(), move_count)
+    assert partial['visits'].sum() == move_count
+
+    # 저장된 감쇠 카운트와 같은 분포
+    tile_count = len(map_manager.walkable_tiles)
+    stored = np.zeros(tile_count * tile_count)
+    for px, py, nx, ny, count, dense_count in state['transition_stats']['all']:
+        stored[map_manager.get_tile_index(px, py) * tile_count + map_manager.get_tile_index(nx, ny)] += count + dense_count
+    merged = partial['transitions'][0] + partial['transitions'][1]
+    assert np.allclose(merged / merged.sum(), stored / stored.sum())
+    markov_counts = np.zeros(partial['markov'].size)
+    markov_counts[state['markov_stats']['index']] = state['markov_stats']['count']
+    assert np.allclose(partial['markov'].ravel() / partial['markov'].sum(), markov_counts / markov_counts.sum())